@@ -0,0 +1,74 @@
+"""
+Hundreds of simulated terminals selling through one AsyncStoreService.
+Reports sale throughput and p50/p99 latency, with the writer grouping
+queued sales into one commit and with one commit per sale.
+
+Run with: python -m benchmarks.bench_async_service [--terminals 200]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.async_service import AsyncStoreService
+from smart_stock_management.services.store_manager import StoreManager
+
+
+async def terminal(
+    service: AsyncStoreService,
+    rng: random.Random,
+    sales: int,
+    products: int,
+    latencies: list,
+) -> None:
+    for _ in range(sales):
+        # browse a little between sales, as a cashier scanning items would
+        await service.get_product_by_id(rng.randint(1, products))
+
+        start = time.perf_counter()
+        await service.process_sale(rng.randint(1, products), 1)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(terminals: int, sales: int, products: int, max_batch: int):
+    latencies: list = []
+
+    async with AsyncStoreService(StoreManager(), max_batch=max_batch) as service:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            terminal(service, random.Random(seed), sales, products, latencies)
+            for seed in range(terminals)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return latencies, elapsed, service.batches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terminals", type=int, default=200)
+    parser.add_argument("--sales", type=int, default=20)
+    parser.add_argument("--products", type=int, default=1_000)
+    args = parser.parse_args()
+
+    total = args.terminals * args.sales
+    print(f"{args.terminals} terminals x {args.sales} sales")
+
+    for label, max_batch in (("one commit per sale", 1), ("group commit", 256)):
+        with temporary_database(products=args.products):
+            latencies, elapsed, batches = asyncio.run(
+                run(args.terminals, args.sales, args.products, max_batch)
+            )
+
+        cuts = statistics.quantiles(latencies, n=100)
+        print(
+            f"{label:<20}: {total / elapsed:8.0f} sales/s, "
+            f"p50 {cuts[49] * 1_000:7.2f} ms, p99 {cuts[98] * 1_000:7.2f} ms, "
+            f"{total / batches:6.1f} sales/commit"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Checkout throughput: per-line process_sale versus process_basket.
+
+Run with: python -m benchmarks.bench_basket
+"""
+import random
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+BASKETS = 1_000
+LINES_PER_BASKET = 20
+PRODUCTS = 5_000
+
+
+def make_baskets(seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        [(rng.randint(1, PRODUCTS), rng.randint(1, 3)) for _ in range(LINES_PER_BASKET)]
+        for _ in range(BASKETS)
+    ]
+
+
+def main() -> None:
+    baskets = make_baskets()
+
+    with temporary_database(products=PRODUCTS):
+        manager = StoreManager()
+
+        start = time.perf_counter()
+        for basket in baskets:
+            for product_id, quantity in basket:
+                manager.process_sale(product_id, quantity)
+        per_line = time.perf_counter() - start
+
+    with temporary_database(products=PRODUCTS):
+        manager = StoreManager()
+
+        start = time.perf_counter()
+        for basket in baskets:
+            manager.process_basket(basket)
+        batched = time.perf_counter() - start
+
+    print(f"{BASKETS} baskets x {LINES_PER_BASKET} lines")
+    print(f"per-line process_sale : {per_line:8.2f} s ({BASKETS / per_line:8.1f} baskets/sec)")
+    print(f"process_basket        : {batched:8.2f} s ({BASKETS / batched:8.1f} baskets/sec)")
+    print(f"speed-up              : {per_line / batched:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
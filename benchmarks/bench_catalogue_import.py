@@ -0,0 +1,87 @@
+"""
+Bulk product import and export throughput, compared with one
+add_product call per row.
+
+Run with: python -m benchmarks.bench_catalogue_import [--products 200000]
+"""
+import argparse
+import csv
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+# every 1000th row is invalid, to exercise the rejects path
+BAD_ROW_EVERY = 1_000
+
+
+def write_catalogue(path: Path, count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        if path.suffix == ".csv":
+            writer = csv.writer(target)
+            writer.writerow(("name", "price", "stock_quantity", "low_stock_threshold"))
+
+        for index in range(1, count + 1):
+            price = -1 if index % BAD_ROW_EVERY == 0 else round(rng.uniform(1, 1_000), 2)
+            row = (f"Imported {index}", price, rng.randint(0, 500), "")
+
+            if path.suffix == ".csv":
+                writer.writerow(row)
+            else:
+                record = dict(zip(("name", "price", "stock_quantity"), row))
+                target.write(json.dumps(record) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--one-by-one", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=0) as db_path:
+        manager = StoreManager()
+        start = time.perf_counter()
+        for index in range(args.one_by_one):
+            manager.add_product(f"Single {index}", 9.99, 10)
+        elapsed = time.perf_counter() - start
+        print(f"add_product, one per row : {args.one_by_one / elapsed:10.0f} rows/s")
+
+    for suffix in (".csv", ".jsonl"):
+        with temporary_database(products=0) as db_path:
+            source = db_path.with_name(f"catalogue{suffix}")
+            rejects = db_path.with_name("rejects.jsonl")
+            exported = db_path.with_name(f"export{suffix}")
+            write_catalogue(source, args.products)
+
+            manager = StoreManager()
+            start = time.perf_counter()
+            report = manager.import_products(source, rejects_path=rejects)
+            elapsed = time.perf_counter() - start
+            print(
+                f"import {suffix:<6}            : {args.products / elapsed:10.0f} rows/s "
+                f"({report.imported} imported, {report.rejected} rejected)"
+            )
+
+            start = time.perf_counter()
+            written = manager.export_products(exported)
+            elapsed = time.perf_counter() - start
+
+            # traced in a second run, since tracemalloc slows everything down
+            tracemalloc.start()
+            manager.export_products(exported)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"export {suffix:<6}            : {written / elapsed:10.0f} rows/s "
+                f"(peak {peak / 1_048_576:.1f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
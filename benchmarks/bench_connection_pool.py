@@ -0,0 +1,53 @@
+"""
+Sales per second with connect-per-call versus the pooled connections.
+
+Run with: python -m benchmarks.bench_connection_pool
+"""
+import itertools
+import sqlite3
+
+from benchmarks.common import measure, temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+SALES = 2_000
+PRODUCTS = 100
+
+
+def main() -> None:
+    with temporary_database(products=PRODUCTS) as db_path:
+        product_ids = itertools.cycle(range(1, PRODUCTS + 1))
+
+        def connect_per_call_sale() -> None:
+            # the pre-pool code path: one connection and one commit per statement
+            product_id = next(product_ids)
+            connection = sqlite3.connect(db_path)
+            connection.execute(
+                "UPDATE Products SET stock_quantity = stock_quantity - 1 WHERE id = ?",
+                (product_id,),
+            )
+            connection.commit()
+            connection.close()
+
+            connection = sqlite3.connect(db_path)
+            connection.execute(
+                "INSERT INTO SalesLog (product_id, quantity_sold) VALUES (?, 1)",
+                (product_id,),
+            )
+            connection.commit()
+            connection.close()
+
+        manager = StoreManager()
+
+        def pooled_sale() -> None:
+            manager.process_sale(next(product_ids), 1)
+
+        before = measure(connect_per_call_sale, SALES)
+        after = measure(pooled_sale, SALES)
+
+    print(f"connect-per-call : {before:10.1f} sales/sec")
+    print(f"pooled           : {after:10.1f} sales/sec")
+    print(f"speed-up         : {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
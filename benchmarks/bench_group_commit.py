@@ -0,0 +1,46 @@
+"""
+Sale throughput of one till committing every sale against group commit.
+Strict group commit only gains with several callers waiting at once; for a
+single till it should stay close to committing every sale.
+
+Run with: python -m benchmarks.bench_group_commit [--sales 20000]
+"""
+import argparse
+import itertools
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.sales_writer import SalesWriter
+from smart_stock_management.services.store_manager import StoreManager
+
+PRODUCTS = 100
+
+
+def run(label: str, sales: int, sales_writer=None) -> None:
+    with temporary_database(products=PRODUCTS):
+        manager = StoreManager(sales_writer=sales_writer)
+        product_ids = itertools.cycle(range(1, PRODUCTS + 1))
+
+        start = time.perf_counter()
+        for _ in range(sales):
+            manager.process_sale(next(product_ids), 1)
+        manager.close()
+        elapsed = time.perf_counter() - start
+
+        assert len(manager.get_all_sales()) == sales
+
+    print(f"{label:<30}: {sales / elapsed:10.0f} sales/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=20_000)
+    args = parser.parse_args()
+
+    run("commit per sale", args.sales)
+    run("group commit, relaxed, 50 ms", args.sales, SalesWriter(durability="relaxed"))
+    run("group commit, strict", args.sales, SalesWriter(durability="strict"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Requests per second against the HTTP API over kept-alive connections,
+for product lookups and for sales.
+
+Run with: python -m benchmarks.bench_http_api [--clients 16]
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.http_api import StoreAPIServer
+from smart_stock_management.services.store_manager import StoreManager
+
+
+def client(port: int, request, count: int, seed: int, errors: list) -> None:
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+
+    for _ in range(count):
+        method, path, body = request(rng)
+        connection.request(
+            method, path, body=body, headers={"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        response.read()
+        if response.status >= 400:
+            errors.append(response.status)
+
+    connection.close()
+
+
+def run(port: int, label: str, request, clients: int, count: int) -> None:
+    errors: list = []
+    threads = [
+        threading.Thread(target=client, args=(port, request, count, seed, errors))
+        for seed in range(clients)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<22}: {clients * count / elapsed:8.0f} requests/s"
+        f"  ({len(errors)} errors)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    products = args.products
+
+    def lookup(rng):
+        return "GET", f"/products/{rng.randint(1, products)}", None
+
+    def sale(rng):
+        body = {"product_id": rng.randint(1, products), "quantity": 1}
+        return "POST", "/sales", json.dumps(body)
+
+    def listing(rng):
+        return "GET", f"/products?sort=price&offset={rng.randint(0, products - 50)}", None
+
+    with temporary_database(products=products):
+        server = StoreAPIServer(("127.0.0.1", 0), StoreManager())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        print(f"{args.clients} keep-alive clients x {args.requests} requests")
+        try:
+            run(port, "GET /products/{id}", lookup, args.clients, args.requests)
+            run(port, "GET /products (page)", listing, args.clients, args.requests)
+            run(port, "POST /sales", sale, args.clients, args.requests)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Low-stock listing: full catalogue scan versus the maintained index.
+
+Run with: python -m benchmarks.bench_low_stock
+"""
+import random
+
+from benchmarks.common import measure, temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+PRODUCTS = 200_000
+LOW_PRODUCTS = 50
+CALLS = 200
+
+
+def main() -> None:
+    with temporary_database(products=PRODUCTS, stock=100, profile="fast"):
+        manager = StoreManager()
+
+        rng = random.Random(5)
+        for product_id in rng.sample(range(1, PRODUCTS + 1), LOW_PRODUCTS):
+            manager.update_product(product_id, stock_quantity=1)
+
+        def linear_scan():
+            return [
+                product
+                for product in manager._products.values()
+                if manager.is_low_stock(product)
+            ]
+
+        assert len(linear_scan()) == len(manager.get_low_stock_products()) == LOW_PRODUCTS
+
+        scan = measure(linear_scan, CALLS)
+        indexed = measure(manager.get_low_stock_products, CALLS)
+
+    print(f"{PRODUCTS} products, {LOW_PRODUCTS} low")
+    print(f"linear scan : {1_000 / scan:10.3f} ms/call")
+    print(f"index       : {1_000 / indexed:10.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
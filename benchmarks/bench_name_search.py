@@ -0,0 +1,102 @@
+"""
+Product name search: a LIKE '%x%' scan versus the full-text index, and
+in-memory type-ahead versus the same prefix query in SQL.
+
+Run with: python -m benchmarks.bench_name_search [--products 1000000]
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.common import SEED_BATCH_SIZE, measure, temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+CALLS = 200
+
+BRANDS = ("Amul", "Britannia", "Cadbury", "Dabur", "Haldiram", "Nestle", "Parle", "Tata")
+ITEMS = (
+    "Milk", "Chocolate", "Biscuits", "Butter", "Cheese", "Coffee", "Tea",
+    "Honey", "Noodles", "Cornflakes", "Bread", "Yoghurt", "Juice", "Namkeen",
+)
+SIZES = ("100g", "200g", "500g", "1kg", "250ml", "500ml", "1l")
+
+# what a cashier types, from one letter up to two words
+QUERIES = ("c", "ch", "cho", "choc", "milk", "tata te", "nestle cof", "butter 500")
+
+
+def seed_named_products(count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    rows = (
+        (
+            f"{rng.choice(BRANDS)} {rng.choice(ITEMS)} {rng.choice(SIZES)} {index}",
+            round(rng.uniform(1, 1_000), 2),
+            100,
+            None,
+        )
+        for index in range(1, count + 1)
+    )
+
+    while True:
+        batch = list(itertools.islice(rows, SEED_BATCH_SIZE))
+        if not batch:
+            return
+        ProductRepository.add_products(batch)
+
+
+def like_scan(text: str) -> list:
+    with pooled_connection() as connection:
+        return connection.execute(
+            "SELECT id FROM Products WHERE name LIKE ? LIMIT 20", (f"%{text}%",)
+        ).fetchall()
+
+
+def report(label: str, per_second: float) -> None:
+    print(f"{label:<36}: {1_000 / per_second:10.3f} ms/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=0, profile="fast"):
+        start = time.perf_counter()
+        seed_named_products(args.products)
+        print(
+            f"inserted {args.products} products, FTS index included, "
+            f"in {time.perf_counter() - start:.1f} s\n"
+        )
+
+        # a miss is the worst case for the scan: it reads every row
+        report("LIKE '%x%' scan, no match", measure(lambda: like_scan("zzz"), 5))
+        report("LIKE '%x%' scan, 20 matches", measure(lambda: like_scan("choc"), CALLS))
+
+        queries = itertools.cycle(QUERIES)
+        report("FTS word-prefix search, top 20", measure(
+            lambda: ProductRepository.search_products(next(queries)), CALLS
+        ))
+        report("FTS name prefix, top 20", measure(
+            lambda: ProductRepository.search_products(next(queries), name_prefix=True),
+            CALLS,
+        ))
+
+        manager = StoreManager()
+        start = time.perf_counter()
+        manager.suggest_products("a")
+        print(f"\nname index built on first use in {time.perf_counter() - start:.2f} s")
+
+        report("in-memory type-ahead, top 20", measure(
+            lambda: manager.suggest_products(next(queries)), CALLS * 10
+        ))
+
+        product_ids = itertools.cycle(range(1, args.products + 1))
+        report("sale with name index (in-memory)", measure(
+            lambda: manager.get_product_by_id(next(product_ids)).reduce_stock(1), 10_000
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Per-sale latency with two commits versus one transaction per sale.
+
+Run with: python -m benchmarks.bench_process_sale
+"""
+import itertools
+
+from benchmarks.common import measure, overwrite_stock, temporary_database
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+SALES = 2_000
+PRODUCTS = 100
+
+
+def main() -> None:
+    with temporary_database(products=PRODUCTS):
+        manager = StoreManager()
+        product_ids = itertools.cycle(range(1, PRODUCTS + 1))
+
+        def two_commit_sale() -> None:
+            product = manager.get_product_by_id(next(product_ids))
+            product.reduce_stock(1)
+            overwrite_stock(product.id, product.stock_quantity)
+            SalesRepository.record_sale(product.id, 1, product.price)
+
+        def single_transaction_sale() -> None:
+            manager.process_sale(next(product_ids), 1)
+
+        before = measure(two_commit_sale, SALES)
+        after = measure(single_transaction_sale, SALES)
+
+    print(f"two commits      : {1_000 / before:8.3f} ms/sale")
+    print(f"one transaction  : {1_000 / after:8.3f} ms/sale")
+    print(f"speed-up         : {after / before:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory per product and catalogue load time for each in-memory layout.
+
+Run with: python -m benchmarks.bench_product_memory [--products 1000000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.models.product import Product
+from smart_stock_management.services.product_store import ColumnarProductStore
+from smart_stock_management.services.store_manager import StoreManager
+
+
+def measure_build(label: str, build, products: int) -> None:
+    # timed and traced in separate runs: tracing slows allocation down
+    gc.collect()
+    start = time.perf_counter()
+    catalogue = build()
+    elapsed = time.perf_counter() - start
+    del catalogue
+
+    gc.collect()
+    tracemalloc.start()
+    catalogue = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalogue
+    print(
+        f"{label:<40}: {elapsed:6.2f} s  "
+        f"{current / 2**20:8.1f} MiB  {current / products:6.1f} B/product"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products, profile="fast"):
+        rows = ProductRepository.get_all_product_rows()
+
+        print("catalogue only (rows already fetched):")
+        measure_build(
+            "dict of validated Product",
+            lambda: {row[0]: Product(*row) for row in rows},
+            args.products,
+        )
+        measure_build(
+            "dict of Product.from_storage",
+            lambda: {row[0]: Product.from_storage(*row) for row in rows},
+            args.products,
+        )
+        measure_build(
+            "ColumnarProductStore",
+            lambda: ColumnarProductStore(rows),
+            args.products,
+        )
+        del rows
+
+        print("\nfull StoreManager load (query, catalogue and indexes):")
+        for product_store in StoreManager.PRODUCT_STORES:
+            measure_build(
+                f"StoreManager(product_store='{product_store}')",
+                lambda: StoreManager(product_store=product_store),
+                args.products,
+            )
+
+
+if __name__ == "__main__":
+    main()
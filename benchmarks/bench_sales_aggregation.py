@@ -0,0 +1,126 @@
+"""
+Time-windowed sales aggregation on a large SalesLog.
+
+Compares SQL GROUP BY aggregation, the precomputed daily rollups, and
+pulling the raw rows into Python and summing them there.
+
+Run with: python -m benchmarks.bench_sales_aggregation [--rows 10000000]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.sales_repository import SalesRepository
+
+PRODUCTS = 1_000
+DAYS = 90
+EPOCH = datetime(2025, 1, 1)
+
+
+def seed_sales(rows: int) -> None:
+    rng = random.Random(11)
+    span = DAYS * 24 * 3600
+
+    def generate():
+        for _ in range(rows):
+            moment = EPOCH + timedelta(seconds=rng.randrange(span))
+            yield (
+                rng.randint(1, PRODUCTS),
+                rng.randint(1, 5),
+                round(rng.uniform(1, 500), 2),
+                moment.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+
+    with pooled_connection() as connection:
+        connection.executemany(
+            "INSERT INTO SalesLog (product_id, quantity_sold, unit_price, timestamp) "
+            "VALUES (?, ?, ?, ?)",
+            generate(),
+        )
+
+
+def python_daily_totals(start: datetime, end: datetime) -> dict:
+    totals = defaultdict(lambda: [0, 0.0])
+    for sale in SalesRepository.iter_sales(batch_size=5_000):
+        if start <= sale.timestamp < end:
+            bucket = totals[(sale.timestamp.date(), sale.product_id)]
+            bucket[0] += sale.quantity_sold
+            bucket[1] += sale.quantity_sold * sale.unit_price
+    return totals
+
+
+def timed(label: str, operation) -> None:
+    start = time.perf_counter()
+    result = operation()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<46}: {elapsed * 1_000:10.1f} ms  ({len(result)} groups)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--skip-python", action="store_true")
+    args = parser.parse_args()
+
+    with temporary_database(products=PRODUCTS, profile="fast"):
+        start = time.perf_counter()
+        seed_sales(args.rows)
+        print(f"seeded {args.rows} sales in {time.perf_counter() - start:.1f} s\n")
+
+        day_start = EPOCH + timedelta(days=30)
+
+        timed(
+            "daily per product, 7 days (SQL)",
+            lambda: SalesRepository.summarize_sales("day", day_start, day_start + timedelta(days=7)),
+        )
+        timed(
+            "hourly totals, 1 day (SQL)",
+            lambda: SalesRepository.summarize_sales(
+                "hour", day_start, day_start + timedelta(days=1), by_product=False
+            ),
+        )
+        timed(
+            "weekly totals, 90 days (SQL)",
+            lambda: SalesRepository.summarize_sales(
+                "week", EPOCH, EPOCH + timedelta(days=DAYS), by_product=False
+            ),
+        )
+        timed(
+            "daily for one product, 90 days (SQL)",
+            lambda: SalesRepository.summarize_sales(
+                "day", EPOCH, EPOCH + timedelta(days=DAYS), product_id=7
+            ),
+        )
+
+        timed(
+            "one product, one day (SQL over SalesLog)",
+            lambda: SalesRepository.summarize_sales(
+                "day", day_start, day_start + timedelta(days=1), product_id=7
+            ),
+        )
+        timed(
+            "one product, one day (SalesDailyRollup)",
+            lambda: SalesRepository.get_daily_rollups(
+                day_start.date(), day_start.date(), product_id=7
+            ),
+        )
+        timed(
+            "daily per product, 7 days (SalesDailyRollup)",
+            lambda: SalesRepository.get_daily_rollups(
+                day_start.date(), (day_start + timedelta(days=6)).date()
+            ),
+        )
+
+        if not args.skip_python:
+            timed(
+                "daily per product, 7 days (Python)",
+                lambda: python_daily_totals(day_start, day_start + timedelta(days=7)),
+            )
+
+
+if __name__ == "__main__":
+    main()
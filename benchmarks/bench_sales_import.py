@@ -0,0 +1,62 @@
+"""
+Offline sales replay throughput: import_sales against one process_sale
+call per buffered line.
+
+Run with: python -m benchmarks.bench_sales_import [--sales 500000]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+
+def write_sales(path, count: int, products: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+
+    with open(path, "w", encoding="utf-8") as target:
+        for index in range(count):
+            record = {
+                "product_id": rng.randint(1, products),
+                "quantity_sold": rng.randint(1, 5),
+                "timestamp": (start + timedelta(seconds=index * 7)).isoformat(),
+            }
+            target.write(json.dumps(record) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sales", type=int, default=500_000)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--one-by-one", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products) as db_path:
+        manager = StoreManager()
+        rng = random.Random(7)
+        start = time.perf_counter()
+        for _ in range(args.one_by_one):
+            manager.process_sale(rng.randint(1, args.products), 1)
+        elapsed = time.perf_counter() - start
+        print(f"process_sale, one per line : {args.one_by_one / elapsed:10.0f} rows/s")
+
+    # stock low enough that some lines overdraw and are rejected
+    with temporary_database(products=args.products, stock=args.sales * 2 // args.products) as db_path:
+        source = db_path.with_name("sales.jsonl")
+        write_sales(source, args.sales, args.products)
+
+        manager = StoreManager()
+        report = manager.import_sales(source, rejects_path=db_path.with_name("rejects.jsonl"))
+        print(
+            f"import_sales               : {report.rows_per_second:10.0f} rows/s "
+            f"({report.imported} imported, {report.rejected} rejected)"
+        )
+        assert not manager.check_sales_rollups()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Sales history queries with and without the SalesLog indexes.
+The plans themselves are checked by benchmarks/check_query_plans.py.
+
+Run with: python -m benchmarks.bench_sales_queries
+"""
+import random
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.sales_repository import SalesRepository
+
+PRODUCTS = 1_000
+SALES = 500_000
+LOOKUPS = 200
+
+
+def time_lookups() -> float:
+    rng = random.Random(3)
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        SalesRepository.get_sales_by_product(rng.randint(1, PRODUCTS))
+    return (time.perf_counter() - start) / LOOKUPS * 1_000
+
+
+def main() -> None:
+    with temporary_database(products=PRODUCTS, profile="fast"):
+        rng = random.Random(1)
+        with pooled_connection() as connection:
+            connection.executemany(
+                "INSERT INTO SalesLog (product_id, quantity_sold, timestamp) "
+                "VALUES (?, 1, datetime('2025-01-01', '+' || ? || ' seconds'))",
+                ((rng.randint(1, PRODUCTS), index) for index in range(SALES)),
+            )
+
+        indexed = time_lookups()
+
+        with pooled_connection() as connection:
+            connection.execute("DROP INDEX idx_saleslog_product_timestamp")
+        scanned = time_lookups()
+
+    print(f"get_sales_by_product over {SALES} rows")
+    print(f"full scan : {scanned:8.3f} ms/query")
+    print(f"indexed   : {indexed:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Peak memory of get_all_sales() versus streaming with iter_sales().
+
+Run with: python -m benchmarks.bench_sales_streaming
+"""
+import time
+import tracemalloc
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.initializer import apply_migrations
+from smart_stock_management.database.sales_repository import SalesRepository
+
+PRODUCTS = 1_000
+SALES = 300_000
+
+
+def profile(label: str, consume) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = consume()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16}: {rows:>8} rows  {elapsed:6.2f} s  peak {peak / 2**20:8.1f} MiB")
+
+
+def main() -> None:
+    with temporary_database(products=PRODUCTS, profile="fast"):
+        with pooled_connection() as connection:
+            connection.executemany(
+                "INSERT INTO SalesLog (product_id, quantity_sold) VALUES (?, 1)",
+                (((index % PRODUCTS) + 1,) for index in range(SALES)),
+            )
+        apply_migrations()
+
+        profile("get_all_sales", lambda: len(SalesRepository.get_all_sales()))
+        profile("iter_sales", lambda: sum(1 for _ in SalesRepository.iter_sales()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Sorted product listings: sorted() per call versus the maintained indexes.
+
+Run with: python -m benchmarks.bench_sorted_listing [--products 1000000]
+"""
+import argparse
+import itertools
+import time
+
+from benchmarks.common import measure, temporary_database
+from smart_stock_management.services.store_manager import StoreManager
+
+CALLS = 20
+
+
+def report(label: str, per_second: float) -> None:
+    print(f"{label:<40}: {1_000 / per_second:10.3f} ms/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products, stock=1_000_000, profile="fast"):
+        start = time.perf_counter()
+        manager = StoreManager()
+        print(f"loaded {args.products} products in {time.perf_counter() - start:.1f} s\n")
+
+        products = manager._products.values()
+
+        report("sorted() full, by price", measure(lambda: sorted(products, key=lambda p: p.price), CALLS))
+        report("sorted() top 50, by price", measure(lambda: sorted(products, key=lambda p: p.price)[:50], CALLS))
+        report("index full, by price", measure(manager.get_sorted_products_by_price, CALLS))
+        report("index top 50, by price", measure(lambda: manager.get_sorted_products_by_price(limit=50), CALLS))
+        report("index page 1000, by stock", measure(
+            lambda: manager.get_sorted_products_by_stock(offset=50_000, limit=50), CALLS
+        ))
+        report("index price 100..101", measure(lambda: manager.get_products_by_price_range(100, 101), CALLS))
+
+        product_ids = itertools.cycle(range(1, args.products + 1))
+        report("index maintenance per sale (in-memory)", measure(
+            lambda: manager.get_product_by_id(next(product_ids)).reduce_stock(1), 10_000
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+StoreManager startup time for each catalogue load mode, including a
+snapshot restart after the previous run sold something.
+
+Run with: python -m benchmarks.bench_startup [--products 1000000]
+"""
+import argparse
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+# sales made between restarts; any one makes the startup snapshot stale
+SALES_BETWEEN_RESTARTS = 100
+
+
+def timed_start(**options) -> float:
+    start = time.perf_counter()
+    StoreManager(**options)
+    return time.perf_counter() - start
+
+
+def sell(manager: StoreManager) -> None:
+    for product_id in range(1, SALES_BETWEEN_RESTARTS + 1):
+        manager.process_sale(product_id, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products, profile="fast") as db_path:
+        snapshot_path = db_path.with_name(f"{db_path.name}.snapshot")
+
+        print(f"{args.products} products")
+        print(f"eager                      : {timed_start():7.2f} s")
+        print(f"eager, columnar            : {timed_start(product_store='columnar'):7.2f} s")
+        print(f"snapshot, cold (writes it) : {timed_start(load_mode='snapshot'):7.2f} s")
+        assert snapshot_path.exists()
+        print(f"snapshot, warm             : {timed_start(load_mode='snapshot'):7.2f} s")
+        print(f"snapshot, warm, columnar   : "
+              f"{timed_start(load_mode='snapshot', product_store='columnar'):7.2f} s")
+        print(f"lazy                       : {timed_start(load_mode='lazy'):7.2f} s")
+
+        # the previous run sold something, then exited with or without close()
+        sell(StoreManager(load_mode="snapshot"))
+        print(f"snapshot, sales, no close  : {timed_start(load_mode='snapshot'):7.2f} s")
+
+        manager = StoreManager(load_mode="snapshot")
+        sell(manager)
+        start = time.perf_counter()
+        manager.close()
+        print(f"close, rewrites snapshot   : {time.perf_counter() - start:7.2f} s")
+        print(f"snapshot, sales, closed    : {timed_start(load_mode='snapshot'):7.2f} s")
+
+        restarted = StoreManager(load_mode="snapshot").get_product_by_id(1)
+        stored = ProductRepository.get_product_by_id(1)
+        assert restarted.stock_quantity == stored.stock_quantity, "snapshot missed sales"
+
+        manager = StoreManager(load_mode="lazy")
+        start = time.perf_counter()
+        manager.get_product_by_id(args.products // 2)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        manager.get_product_by_id(args.products // 2)
+        cached = time.perf_counter() - start
+        print(f"lazy first lookup          : {first * 1_000:7.3f} ms")
+        print(f"lazy cached lookup         : {cached * 1_000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Perishable lots: "what expires in the next N days" from the in-memory
+expiry heap versus a scan of every lot and the SQL expiry index, plus the
+cost FEFO lot consumption adds to a sale.
+
+Run with: python -m benchmarks.bench_stock_lots [--lots 100000]
+"""
+import argparse
+import itertools
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import measure, temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.stock_lot_repository import StockLotRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+PRODUCTS = 20_000
+
+# expiry dates are spread over this many days from today
+SHELF_LIFE_DAYS = 365
+
+WINDOWS = (0, 1, 7, 30)
+
+
+def seed_lots(count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    today = date.today()
+    rows = (
+        (
+            rng.randint(1, PRODUCTS),
+            f"LOT-{index}",
+            rng.randint(1, 20),
+            (today + timedelta(days=rng.randint(-3, SHELF_LIFE_DAYS))).isoformat(),
+        )
+        for index in range(count)
+    )
+
+    with pooled_connection() as connection:
+        connection.executemany(
+            """
+            INSERT INTO StockLots (product_id, lot_code, quantity, expiry_date)
+            VALUES (?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+def report(label: str, per_second: float) -> None:
+    print(f"{label:<44}: {1_000 / per_second:10.3f} ms/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lots", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with temporary_database(products=PRODUCTS + 1_000, profile="fast"):
+        seed_lots(args.lots)
+        manager = StoreManager()
+
+        start = time.perf_counter()
+        manager.get_expiring_lots(0)
+        print(f"{args.lots} lots loaded into the expiry heap in {time.perf_counter() - start:.2f} s\n")
+
+        lots = manager._lots.values()
+
+        for days in WINDOWS:
+            last_day = date.today() + timedelta(days=days)
+            found = len(manager.get_expiring_lots(days))
+            print(f"-- expiring within {days} days: {found} lots")
+            report("  scan every lot (in memory)", measure(
+                lambda: sorted(
+                    (lot for lot in lots if lot.expiry_date <= last_day),
+                    key=lambda lot: (lot.expiry_date, lot.id),
+                ),
+                20,
+            ))
+            report("  SQL expiry index", measure(
+                lambda: StockLotRepository.get_lots_expiring_by(last_day), 20
+            ))
+            report("  expiry heap", measure(lambda: manager.get_expiring_lots(days), 20))
+
+        # products 1..PRODUCTS hold lots, the rest do not
+        with_lots = itertools.cycle(range(1, PRODUCTS + 1))
+        without_lots = itertools.cycle(range(PRODUCTS + 1, PRODUCTS + 1_001))
+        print()
+        report("sale, product without lots", measure(
+            lambda: manager.process_sale(next(without_lots), 1), 2_000
+        ))
+        report("sale, product with lots (FEFO)", measure(
+            lambda: manager.process_sale(next(with_lots), 1), 2_000
+        ))
+
+        # the first query after the sales re-reads the lots of the products sold
+        start = time.perf_counter()
+        manager.get_expiring_lots(7)
+        print(f"first heap query after 2000 FEFO sales     : {(time.perf_counter() - start) * 1_000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
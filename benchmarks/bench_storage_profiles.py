@@ -0,0 +1,68 @@
+"""
+Concurrent readers and a writer under each storage profile.
+
+A writer thread keeps processing sales while reader threads repeatedly
+scan SalesLog. Under the rollback journal readers block the writer;
+under WAL they do not.
+
+Run with: python -m benchmarks.bench_storage_profiles
+"""
+import itertools
+import threading
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import STORAGE_PROFILES
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+DURATION = 3.0
+READERS = 2
+PRODUCTS = 100
+SEED_SALES = 20_000
+
+
+def run_profile(profile: str) -> tuple:
+    with temporary_database(products=PRODUCTS, profile=profile):
+        SalesRepository.record_sales(
+            ((index % PRODUCTS) + 1, 1, 1.0) for index in range(SEED_SALES)
+        )
+        manager = StoreManager()
+        product_ids = itertools.cycle(range(1, PRODUCTS + 1))
+        stop = threading.Event()
+        counts = {"sales": 0, "reads": 0}
+        lock = threading.Lock()
+
+        def writer() -> None:
+            while not stop.is_set():
+                manager.process_sale(next(product_ids), 1)
+                counts["sales"] += 1
+
+        def reader() -> None:
+            while not stop.is_set():
+                SalesRepository.get_all_sales()
+                with lock:
+                    counts["reads"] += 1
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(READERS)]
+
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return counts["sales"] / DURATION, counts["reads"] / DURATION
+
+
+def main() -> None:
+    print(f"{'profile':<10} {'sales/sec':>10} {'scans/sec':>10}")
+    for profile in STORAGE_PROFILES:
+        sales, reads = run_profile(profile)
+        print(f"{profile:<10} {sales:>10.1f} {reads:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cross-store reporting over a chain of simulated stores, each with its own
+database file: chain-wide stock per product and revenue, run on one worker
+process versus a pool of them, checked against each other.
+
+Run with: python -m benchmarks.bench_store_chain [--stores 50] [--workers 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import SALES_DAYS, seed_products, seed_sales
+from smart_stock_management.database.connection import configure
+from smart_stock_management.database.initializer import initialize_database
+from smart_stock_management.services.store_chain import StoreChain
+
+STOCK_PER_PRODUCT = 1_000
+
+ROUNDS = 3
+
+
+def seed_store(db_path: str, products: int, sales: int, seed: int) -> None:
+    pool = configure(db_path, profile="fast")
+    try:
+        initialize_database()
+        seed_products(products, stock=STOCK_PER_PRODUCT, seed=seed)
+        seed_sales(sales, products, seed=seed)
+    finally:
+        pool.close()
+
+
+def best_of(operation) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stores", type=int, default=50)
+    parser.add_argument("--products", type=int, default=5_000, help="products per store")
+    parser.add_argument("--sales", type=int, default=50_000, help="sales per store")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=SALES_DAYS + 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with StoreChain(directory, profile="fast") as chain:
+            store_ids = [f"store-{number:03d}" for number in range(1, args.stores + 1)]
+
+            began = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=args.workers) as seeders:
+                list(seeders.map(
+                    seed_store,
+                    [str(chain.database_config(store_id).db_path) for store_id in store_ids],
+                    [args.products] * args.stores,
+                    [args.sales] * args.stores,
+                    range(args.stores),
+                ))
+            print(
+                f"seeded {args.stores} stores x {args.products} products, "
+                f"{args.sales} sales in {time.perf_counter() - began:.1f}s "
+                f"({os.cpu_count()} CPUs)\n"
+            )
+
+        answers = {}
+
+        for workers in sorted({1, args.workers}):
+            with StoreChain(directory, profile="fast", workers=workers) as chain:
+                # start the worker processes before timing
+                chain.get_stock_by_store("Product 1")
+
+                print(f"-- {workers} worker process(es)")
+                cases = {
+                    "total stock, every product": chain.get_total_stock,
+                    "stock of one product per store": lambda: chain.get_stock_by_store("Product 1"),
+                    "chain revenue per day": lambda: chain.get_revenue_by_period("day", start, end),
+                    "revenue per store": lambda: chain.get_revenue_by_store(start, end),
+                }
+                for label, operation in cases.items():
+                    print(f"  {label:<34}: {best_of(operation):9.1f} ms")
+
+                days = chain.get_revenue_by_period("day", start, end)
+                answers[workers] = (
+                    chain.get_total_stock(),
+                    [(day.period, day.units_sold, round(day.revenue, 2)) for day in days],
+                )
+
+        stock, days = answers[1]
+        expected_stock = args.stores * STOCK_PER_PRODUCT
+        assert all(total == expected_stock for total in stock.values()), "stock totals are wrong"
+        assert len(stock) == args.products, "products are missing from the stock totals"
+        assert sum(units for _, units, _ in days) > 0, "no revenue found"
+        assert all(answer == answers[1] for answer in answers.values()), "worker counts disagree"
+        print(f"\nOK: {len(stock)} products, {len(days)} days of chain revenue, results agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Checks that the fixed SalesLog queries still use their indexes, so a
+schema or query change that stops using one fails loudly. The queries
+are the ones SalesRepository runs, checked on a small seeded in-memory
+database; it takes well under a second.
+
+Run with: python -m benchmarks.check_query_plans
+"""
+import re
+import sys
+from typing import List
+
+from benchmarks.common import memory_database, seed_sales
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.sales_repository import (
+    ALL_SALES_QUERY,
+    SALES_BY_PRODUCT_QUERY,
+    SALES_TOTALS_QUERY,
+)
+
+PRODUCTS = 100
+SALES = 2_000
+
+SOME_TIME = "2025-01-01 00:00:00"
+
+# label: (query, params, the one index access the plan must make)
+EXPECTED_PLANS = {
+    "all sales": (
+        ALL_SALES_QUERY,
+        (),
+        "USING INDEX idx_saleslog_timestamp",
+    ),
+    "by product": (
+        SALES_BY_PRODUCT_QUERY,
+        (1,),
+        "USING INDEX idx_saleslog_product_timestamp",
+    ),
+    "totals": (
+        SALES_TOTALS_QUERY,
+        (SOME_TIME, SOME_TIME),
+        "USING COVERING INDEX idx_saleslog_timestamp_totals",
+    ),
+}
+
+INDEX_ACCESS = re.compile(r"\bUSING (?:COVERING )?INDEX \w+")
+
+
+def check_query_plans() -> List[str]:
+    """
+    Return a message for every query whose plan does not read SalesLog
+    through exactly the expected index, or that needs a sort.
+    """
+    failures = []
+
+    with pooled_connection() as connection:
+        for label, (query, params, expected) in EXPECTED_PLANS.items():
+            details = [
+                row["detail"]
+                for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            ]
+            plan = " | ".join(details)
+            accesses = [
+                match.group(0)
+                for match in (INDEX_ACCESS.search(detail) for detail in details)
+                if match is not None
+            ]
+
+            if accesses != [expected] or "TEMP B-TREE" in plan:
+                failures.append(f"{label}: expected {expected}, got plan: {plan}")
+            else:
+                print(f"plan ok  {label:<10}: {plan}")
+
+    return failures
+
+
+def main() -> int:
+    with memory_database(products=PRODUCTS):
+        seed_sales(SALES, PRODUCTS)
+        failures = check_query_plans()
+
+    for failure in failures:
+        print(f"FAILED   {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a throw-away database in a temporary
+directory, so the real store file is never touched.
+"""
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from smart_stock_management.database.connection import (
+    MEMORY_DB,
+    configure,
+    pooled_connection,
+)
+from smart_stock_management.database.initializer import initialize_database
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.database.sales_repository import SalesRepository
+
+# products and sales inserted per transaction when seeding
+SEED_BATCH_SIZE = 50_000
+
+# seeded sales are spread over this many days before now
+SALES_DAYS = 90
+
+
+@contextmanager
+def temporary_database(
+    products: int = 1_000,
+    stock: int = 1_000_000,
+    profile: Optional[str] = None,
+) -> Iterator[Path]:
+    """
+    Point the shared connection pool at a fresh, seeded database file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / "bench.db"
+        pool = configure(db_path, profile=profile)
+        try:
+            initialize_database()
+            seed_products(products, stock=stock)
+            yield db_path
+        finally:
+            pool.close()
+
+
+@contextmanager
+def memory_database(
+    products: int = 1_000,
+    stock: int = 1_000_000,
+    profile: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Point the shared connection pool at a fresh, seeded in-memory database.
+    """
+    pool = configure(MEMORY_DB, profile=profile)
+    try:
+        initialize_database()
+        seed_products(products, stock=stock)
+        yield str(pool.db_path)
+    finally:
+        pool.close()
+
+
+def seed_products(count: int, stock: int = 1_000_000, seed: int = 42) -> None:
+    """
+    Insert `count` synthetic products in batches.
+    """
+    rng = random.Random(seed)
+    rows = (
+        (f"Product {index}", round(rng.uniform(1, 1_000), 2), stock, None)
+        for index in range(1, count + 1)
+    )
+
+    while True:
+        batch = list(islice(rows, SEED_BATCH_SIZE))
+        if not batch:
+            return
+        ProductRepository.add_products(batch)
+
+
+def seed_sales(count: int, products: int, seed: int = 42) -> None:
+    """
+    Insert `count` past sales of random products, spread over SALES_DAYS.
+    """
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=SALES_DAYS)
+    span = SALES_DAYS * 86_400
+    sales = (
+        (
+            rng.randint(1, products),
+            rng.randint(1, 3),
+            round(rng.uniform(1, 1_000), 2),
+            start + timedelta(seconds=span * index / count),
+        )
+        for index in range(count)
+    )
+
+    while True:
+        batch = list(islice(sales, SEED_BATCH_SIZE))
+        if not batch:
+            return
+        SalesRepository.record_past_sales(batch)
+
+
+def measure(operation: Callable[[], object], repeat: int) -> float:
+    """
+    Run `operation` `repeat` times and return operations per second.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed if elapsed else float("inf")
+
+
+def overwrite_stock(product_id: int, new_stock: int) -> None:
+    """
+    Write a cached stock level back as an absolute value: the old sale
+    path, kept here only so benchmarks can show the lost updates it causes.
+    """
+    with pooled_connection() as connection:
+        connection.execute(
+            "UPDATE Products SET stock_quantity = ? WHERE id = ?",
+            (new_stock, product_id),
+        )
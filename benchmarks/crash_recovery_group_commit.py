@@ -0,0 +1,125 @@
+"""
+Crash recovery of group-committed sales.
+
+A child process sells through a SalesWriter and prints every sale it has
+acknowledged, and is then killed outright at a random moment. The parent
+reopens the database and checks that every acknowledged sale is in
+SalesLog and that stock still matches the log. Under durability="strict"
+no acknowledged sale may be missing; under "relaxed" at most
+2 * max_rows may be, one group committing and one queued.
+
+Run with: python -m benchmarks.crash_recovery_group_commit [--trials 5]
+"""
+import argparse
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import configure, pooled_connection
+from smart_stock_management.services.sales_writer import FLUSH_ROWS, SalesWriter
+from smart_stock_management.services.store_manager import StoreManager
+
+PRODUCTS = 50
+STOCK = 1_000_000
+
+
+def child(db_path: str, durability: str, interval_ms: float, max_rows: int) -> None:
+    configure(db_path)
+    manager = StoreManager(
+        sales_writer=SalesWriter(
+            flush_interval=interval_ms / 1_000,
+            max_rows=max_rows,
+            durability=durability,
+        )
+    )
+    rng = random.Random()
+    acknowledged = 0
+
+    while True:
+        manager.process_sale(rng.randint(1, PRODUCTS), 1)
+        acknowledged += 1
+        print(acknowledged, flush=True)
+
+
+def trial(durability: str, interval_ms: float, max_rows: int, run_for: float) -> tuple:
+    with temporary_database(products=PRODUCTS, stock=STOCK) as db_path:
+        process = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.crash_recovery_group_commit",
+                "--child", str(db_path),
+                "--durability", durability,
+                "--interval-ms", str(interval_ms),
+                "--max-rows", str(max_rows),
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+        acknowledged = [0]
+
+        def read_acks() -> None:
+            for line in process.stdout:
+                acknowledged[0] = int(line)
+
+        reader = threading.Thread(target=read_acks)
+        reader.start()
+        time.sleep(run_for)
+        process.kill()
+        process.wait()
+        reader.join()
+
+        # the killed process's connections are gone; read with fresh ones
+        configure(db_path)
+        with pooled_connection() as connection:
+            logged = connection.execute("SELECT COUNT(*) FROM SalesLog").fetchone()[0]
+            sold = connection.execute(
+                "SELECT TOTAL(quantity_sold) FROM SalesLog"
+            ).fetchone()[0]
+            stock = connection.execute(
+                "SELECT SUM(stock_quantity) FROM Products"
+            ).fetchone()[0]
+
+    consistent = PRODUCTS * STOCK - stock == sold
+    return acknowledged[0], logged, consistent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--durability", default="strict")
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--max-rows", type=int, default=FLUSH_ROWS)
+    parser.add_argument("--child")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.durability, args.interval_ms, args.max_rows)
+        return
+
+    rng = random.Random()
+    lost_total = 0
+
+    for number in range(1, args.trials + 1):
+        acknowledged, logged, consistent = trial(
+            args.durability, args.interval_ms, args.max_rows, rng.uniform(0.5, 2.0)
+        )
+        lost = max(acknowledged - logged, 0)
+        lost_total += lost
+        print(
+            f"trial {number}: acknowledged {acknowledged:6d}, in SalesLog {logged:6d}, "
+            f"lost {lost:4d}, stock matches log: {consistent}"
+        )
+        assert consistent, "stock and sales log disagree after the crash"
+        # every sale here is one line
+        assert lost <= 2 * args.max_rows, "lost more than two groups"
+
+    print(f"{args.durability}: {lost_total} acknowledged sales lost")
+    if args.durability == "strict":
+        assert lost_total == 0, "an acknowledged sale was lost"
+
+
+if __name__ == "__main__":
+    main()
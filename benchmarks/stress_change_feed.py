@@ -0,0 +1,102 @@
+"""
+One process edits prices while another keeps selling from its cached
+catalogue, pulling changes with StoreManager.refresh(). Checks that the
+seller's cache matches the database at the end, that no sale was lost or
+undone by a price edit (initial stock - units sold in SalesLog equals the
+final stock of every product), and compares the cost of an incremental
+refresh with reloading the whole catalogue.
+
+Run with: python -m benchmarks.stress_change_feed [--products 100000]
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmarks.common import temporary_database
+from smart_stock_management.database.connection import configure, pooled_connection
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+INITIAL_STOCK = 1_000_000
+
+
+def price_editor(db_path, edits: int, products: int) -> None:
+    configure(db_path)
+    manager = StoreManager(load_mode="lazy")
+    rng = random.Random(1)
+
+    for _ in range(edits):
+        manager.update_product(
+            rng.randint(1, products), price=round(rng.uniform(1, 1_000), 2)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=5_000)
+    parser.add_argument("--sales-per-refresh", type=int, default=20)
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products, stock=INITIAL_STOCK) as db_path:
+        manager = StoreManager()
+        rng = random.Random(2)
+
+        editor = multiprocessing.get_context("spawn").Process(
+            target=price_editor, args=(db_path, args.edits, args.products)
+        )
+        editor.start()
+
+        sales = refreshes = changed = 0
+        refresh_time = 0.0
+
+        while editor.is_alive():
+            for _ in range(args.sales_per_refresh):
+                manager.process_sale(rng.randint(1, args.products), 1)
+                sales += 1
+
+            start = time.perf_counter()
+            changed += manager.refresh()
+            refresh_time += time.perf_counter() - start
+            refreshes += 1
+
+        editor.join()
+        changed += manager.refresh()
+
+        start = time.perf_counter()
+        StoreManager()
+        reload_time = time.perf_counter() - start
+
+        rows = {row[0]: row for row in ProductRepository.get_all_product_rows()}
+        stale = [
+            product_id
+            for product_id, row in rows.items()
+            if (
+                manager.get_product_by_id(product_id).price != row[2]
+                or manager.get_product_by_id(product_id).stock_quantity != row[3]
+            )
+        ]
+
+        with pooled_connection() as connection:
+            sold = dict(connection.execute(
+                "SELECT product_id, SUM(quantity_sold) FROM SalesLog GROUP BY product_id"
+            ))
+        drifted = [
+            product_id
+            for product_id, row in rows.items()
+            if INITIAL_STOCK - sold.get(product_id, 0) != row[3]
+        ]
+
+    print(f"{sales} sales, {args.edits} price edits, {refreshes} refreshes")
+    print(f"products pulled by refresh : {changed}")
+    print(f"mean refresh               : {refresh_time / max(refreshes, 1) * 1_000:8.3f} ms")
+    print(f"full reload                : {reload_time * 1_000:8.3f} ms")
+    print(f"stale cached products      : {len(stale)}")
+    print(f"stock drifted from the log : {len(drifted)}")
+    assert not stale, "cache drifted from the database"
+    assert not drifted, "stock drifted from the sales log"
+
+
+if __name__ == "__main__":
+    main()
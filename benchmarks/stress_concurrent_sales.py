@@ -0,0 +1,130 @@
+"""
+Several till processes selling and restocking the same few products on one
+database, and now and then editing a product's price or setting its stock
+count from their (often stale) cached catalogue. Checks that no stock
+update is lost: for every product, initial stock + restocks + stock set
+adjustments - units sold must equal the final stock, and the units sold
+must match SalesLog. Stock sets made against a stale count must be refused.
+
+--absolute replays the old write path (cached stock written back as an
+absolute value) to show the lost updates it causes.
+
+Run with: python -m benchmarks.stress_concurrent_sales [--tills 8]
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmarks.common import overwrite_stock, temporary_database
+from smart_stock_management.database.connection import (
+    configure,
+    pooled_connection,
+    transaction,
+)
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.services.store_manager import StoreManager
+from smart_stock_management.utils.stock_exceptions import (
+    InsufficientStockError,
+    StockConflictError,
+)
+
+
+def absolute_sale(manager: StoreManager, product_id: int) -> None:
+    product = manager.get_product_by_id(product_id)
+    product.reduce_stock(1)
+    with transaction():
+        overwrite_stock(product_id, product.stock_quantity)
+        SalesRepository.record_sale(product_id, 1, product.price)
+
+
+def till(db_path, seed: int, operations: int, products: int, absolute: bool):
+    configure(db_path)
+    manager = StoreManager()
+    rng = random.Random(seed)
+    restocked = [0] * (products + 1)
+    refused = conflicts = 0
+
+    for _ in range(operations):
+        product_id = rng.randint(1, products)
+        roll = rng.random()
+        try:
+            if roll < 0.1:
+                quantity = rng.randint(1, 3)
+                manager.increase_product_stock(product_id, quantity)
+                restocked[product_id] += quantity
+            elif roll < 0.15:
+                # must leave the stock other tills are selling alone
+                manager.update_product(product_id, price=round(rng.uniform(1, 100), 2))
+            elif roll < 0.17:
+                # a stock count from the cache; refused if another till got there first
+                adjustment = rng.randint(0, 3)
+                counted = manager.get_product_by_id(product_id).stock_quantity
+                try:
+                    manager.update_product(product_id, stock_quantity=counted + adjustment)
+                    restocked[product_id] += adjustment
+                except StockConflictError:
+                    conflicts += 1
+            elif absolute:
+                absolute_sale(manager, product_id)
+            else:
+                manager.process_sale(product_id, 1)
+        except InsufficientStockError:
+            refused += 1
+
+    return restocked, refused, conflicts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tills", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=2_000)
+    parser.add_argument("--products", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=2_000)
+    parser.add_argument("--absolute", action="store_true")
+    args = parser.parse_args()
+
+    with temporary_database(products=args.products, stock=args.stock) as db_path:
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with context.Pool(args.tills) as pool:
+            results = pool.starmap(
+                till,
+                [
+                    (db_path, seed, args.operations, args.products, args.absolute)
+                    for seed in range(args.tills)
+                ],
+            )
+        elapsed = time.perf_counter() - start
+
+        with pooled_connection() as connection:
+            final = dict(connection.execute("SELECT id, stock_quantity FROM Products"))
+            sold = dict(connection.execute(
+                "SELECT product_id, SUM(quantity_sold) FROM SalesLog GROUP BY product_id"
+            ))
+
+    refused = sum(result[1] for result in results)
+    conflicts = sum(result[2] for result in results)
+    total = args.tills * args.operations
+    print(
+        f"{args.tills} tills, {total} operations in {elapsed:.2f}s, "
+        f"{refused} refused, {conflicts} stale stock sets refused"
+    )
+
+    lost = 0
+    for product_id in range(1, args.products + 1):
+        restocked = sum(result[0][product_id] for result in results)
+        expected = args.stock + restocked - sold.get(product_id, 0)
+        lost += abs(expected - final[product_id])
+        print(
+            f"  product {product_id}: final {final[product_id]:6d}, "
+            f"expected {expected:6d}, sold {sold.get(product_id, 0):6d}"
+        )
+
+    print(f"lost updates: {lost} units")
+    if not args.absolute:
+        assert lost == 0, "stock drifted from the sales log"
+
+
+if __name__ == "__main__":
+    main()
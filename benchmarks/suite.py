@@ -0,0 +1,237 @@
+"""
+Benchmark suite for the repositories, StoreManager and the sale flow,
+with JSON results that can be compared against a stored baseline.
+
+Seeds a synthetic catalogue and sales log into a temporary database, times
+each case over several rounds and reports the median time per operation.
+
+Run with:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline the exit status is 1 when any case is slower than the
+baseline by more than the threshold (0.2 = 20 %), so CI can fail on it.
+Baselines are only comparable on the same machine and seed sizes.
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from benchmarks.common import memory_database, seed_sales, temporary_database
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.services.store_manager import StoreManager
+
+# every LOW_STOCK_EVERY-th product starts below the low-stock threshold
+LOW_STOCK_EVERY = 20
+
+PAGE_SIZE = 50
+
+
+class Case(NamedTuple):
+    name: str
+    operation: Callable[[], object]
+    ops_per_round: int
+
+
+def build_cases(manager: StoreManager, products: int, seed: int) -> List[Case]:
+    rng = random.Random(seed)
+
+    def random_id() -> int:
+        return rng.randint(1, products)
+
+    def sellable_id() -> int:
+        # products that never start low, so sales keep succeeding
+        product_id = random_id()
+        return product_id if product_id % LOW_STOCK_EVERY else product_id - 1 or 1
+
+    sales_since = datetime.now(timezone.utc) - timedelta(days=7)
+    sales_until = datetime.now(timezone.utc)
+
+    return [
+        Case("startup.eager", StoreManager, 1),
+        Case("repo.get_product_by_id",
+             lambda: ProductRepository.get_product_by_id(random_id()), 2_000),
+        Case("manager.get_product_by_id",
+             lambda: manager.get_product_by_id(random_id()), 20_000),
+        Case("repo.sorted_page_by_price",
+             lambda: ProductRepository.get_sorted_products("price", 0, PAGE_SIZE), 200),
+        Case("manager.sorted_page_by_price",
+             lambda: manager.get_sorted_products_by_price(limit=PAGE_SIZE), 2_000),
+        Case("manager.sorted_page_by_stock_deep",
+             lambda: manager.get_sorted_products_by_stock(products // 2, PAGE_SIZE), 2_000),
+        Case("repo.low_stock",
+             lambda: ProductRepository.get_low_stock_products(StoreManager.LOW_STOCK_THRESHOLD), 20),
+        Case("manager.low_stock", manager.get_low_stock_products, 200),
+        Case("sale.single",
+             lambda: manager.process_sale(sellable_id(), 1), 500),
+        Case("sale.basket_5_lines",
+             lambda: manager.process_basket([(sellable_id(), 1) for _ in range(5)]), 200),
+        Case("sales.history_page",
+             lambda: manager.get_sales_page(limit=PAGE_SIZE), 500),
+        Case("sales.by_product",
+             lambda: SalesRepository.get_sales_by_product(random_id()), 200),
+        Case("sales.daily_summary_7d",
+             lambda: manager.get_sales_summary("day", sales_since, sales_until), 20),
+    ]
+
+
+def time_case(case: Case, rounds: int) -> Dict[str, float]:
+    """
+    Time `rounds` rounds of the case; per-operation times in milliseconds.
+    """
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(case.ops_per_round):
+            case.operation()
+        timings.append((time.perf_counter() - start) / case.ops_per_round * 1_000)
+
+    return {
+        "median_ms": statistics.median(timings),
+        "best_ms": min(timings),
+        "ops_per_round": case.ops_per_round,
+    }
+
+
+def run_suite(args: argparse.Namespace) -> dict:
+    results: Dict[str, Dict[str, float]] = {}
+
+    database = memory_database if args.in_memory else temporary_database
+
+    with database(products=args.products, stock=1_000_000, profile=args.profile):
+        with pooled_connection() as connection:
+            connection.execute(
+                "UPDATE Products SET stock_quantity = 2 WHERE id % ? = 0",
+                (LOW_STOCK_EVERY,),
+            )
+        seed_sales(args.sales, args.products, args.seed)
+
+        manager = StoreManager()
+
+        for case in build_cases(manager, args.products, args.seed):
+            if args.only and not any(case.name.startswith(name) for name in args.only):
+                continue
+            results[case.name] = time_case(case, args.rounds)
+            print(f"{case.name:<36}: {results[case.name]['median_ms']:10.4f} ms/op")
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "products": args.products,
+            "sales": args.sales,
+            "rounds": args.rounds,
+            "profile": args.profile,
+            "in_memory": args.in_memory,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float
+) -> Iterator[Tuple[str, float, float, Optional[float], bool]]:
+    """
+    Yield (case, baseline_ms, current_ms, ratio, regressed) for every case
+    in both runs, comparing medians.
+    """
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = (
+            result["median_ms"] / previous["median_ms"] if previous["median_ms"] else None
+        )
+        yield (
+            name,
+            previous["median_ms"],
+            result["median_ms"],
+            ratio,
+            ratio is not None and ratio > 1 + threshold,
+        )
+
+
+def report_comparison(current: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Print the comparison table. Returns True if any case regressed.
+    """
+    for key in ("products", "sales", "profile", "in_memory"):
+        if current["meta"].get(key) != baseline["meta"].get(key):
+            print(
+                f"warning: baseline was run with {key}={baseline['meta'].get(key)}, "
+                f"this run with {key}={current['meta'].get(key)}"
+            )
+
+    print(f"\n{'case':<36} {'baseline':>12} {'current':>12} {'change':>9}")
+    regressed = False
+
+    for name, before, after, ratio, slower in compare(current, baseline, threshold):
+        change = f"{(ratio - 1) * 100:+8.1f}%" if ratio is not None else "      n/a"
+        flag = "  REGRESSION" if slower else ""
+        print(f"{name:<36} {before:10.4f}ms {after:10.4f}ms {change}{flag}")
+        regressed = regressed or slower
+
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"not run this time: {', '.join(missing)}")
+
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Smart-Stock benchmark suite")
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--sales", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--profile", default="fast", help="storage profile of the temporary database")
+    parser.add_argument("--in-memory", action="store_true", help="use an in-memory database")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name starts with these")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline")
+    parser.add_argument("--baseline", help="compare against this baseline JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fractional slowdown counted as a regression (default 0.2 = 20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.products < LOW_STOCK_EVERY:
+        parser.error(f"--products must be at least {LOW_STOCK_EVERY}")
+
+    current = run_suite(args)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as target:
+                json.dump(current, target, indent=2)
+                target.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as source:
+            baseline = json.load(source)
+        if report_comparison(current, baseline, args.threshold):
+            print(f"\nFAILED: slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+        print(f"\nOK: within {args.threshold:.0%} of the baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
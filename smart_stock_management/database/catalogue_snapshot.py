@@ -0,0 +1,96 @@
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from smart_stock_management.database.connection import get_pool, is_memory_database
+
+# file layout: header, then ids, prices, stock, thresholds arrays and the names
+SNAPSHOT_MAGIC = b"SSCATv1\0"
+HEADER = struct.Struct("<8sqq")  # magic, catalogue version, product count
+NO_THRESHOLD = -1
+
+ProductRow = Tuple[int, str, float, int, Optional[int]]
+
+
+def get_snapshot_path() -> Optional[Path]:
+    """
+    Return the snapshot file next to the shared pool's database,
+    or None for in-memory databases and databases opened by URI.
+    """
+    db_path = get_pool().db_path
+
+    if is_memory_database(db_path) or str(db_path).startswith("file:"):
+        return None
+
+    return Path(f"{db_path}.snapshot")
+
+
+def write_snapshot(path: Path, version: int, rows: List[ProductRow]) -> bool:
+    """
+    Write product rows to a binary snapshot tagged with the catalogue version.
+    The file is replaced atomically. Returns False, writing nothing, when
+    a product name cannot be stored (contains a NUL character).
+    """
+    names = [row[1] for row in rows]
+
+    if any("\0" in name for name in names):
+        return False
+
+    ids = array("q", (row[0] for row in rows))
+    prices = array("d", (row[2] for row in rows))
+    stock = array("q", (row[3] for row in rows))
+    thresholds = array(
+        "q", (NO_THRESHOLD if row[4] is None else row[4] for row in rows)
+    )
+
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(HEADER.pack(SNAPSHOT_MAGIC, version, len(rows)))
+        for column in (ids, prices, stock, thresholds):
+            column.tofile(snapshot_file)
+        snapshot_file.write("\0".join(names).encode("utf-8"))
+
+    os.replace(temporary_path, path)
+    return True
+
+
+def read_snapshot(path: Path, expected_version: int) -> Optional[List[ProductRow]]:
+    """
+    Read product rows from a snapshot.
+    Returns None if the file is missing, unreadable or was taken at a
+    different catalogue version than `expected_version`.
+    """
+    try:
+        with open(path, "rb") as snapshot_file:
+            header = snapshot_file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+
+            magic, version, count = HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != expected_version:
+                return None
+
+            columns = []
+            for typecode in ("q", "d", "q", "q"):
+                column = array(typecode)
+                column.fromfile(snapshot_file, count)
+                columns.append(column)
+
+            names = snapshot_file.read().decode("utf-8").split("\0") if count else []
+    except (OSError, EOFError, UnicodeDecodeError, struct.error):
+        return None
+
+    if len(names) != count:
+        return None
+
+    ids, prices, stock, thresholds = columns
+
+    return [
+        (product_id, name, price, stock_quantity, None if threshold == NO_THRESHOLD else threshold)
+        for product_id, name, price, stock_quantity, threshold in zip(
+            ids, names, prices, stock, thresholds
+        )
+    ]
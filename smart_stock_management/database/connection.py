@@ -1,15 +1,480 @@
+import itertools
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Dict, Iterator, Mapping, Optional, Union
+from urllib.parse import quote
 
 # database directory
 BASE_DIR = Path(__file__).resolve().parents[2]
 DB_PATH = BASE_DIR / "smart_stock.db"
 
+# db_path value selecting an in-memory database shared by the pool's connections
+MEMORY_DB = ":memory:"
 
-def get_connection():
+# environment variables read by DatabaseConfig.from_env()
+ENV_DB_PATH = "SMART_STOCK_DB"
+ENV_DB_PROFILE = "SMART_STOCK_DB_PROFILE"
+ENV_POOL_SIZE = "SMART_STOCK_DB_POOL_SIZE"
+
+# pool settings
+POOL_SIZE = 5
+POOL_TIMEOUT = 30.0
+
+# storage profiles: pragmas applied once to every new connection
+STORAGE_PROFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    # rollback journal, full fsync: for filesystems without WAL support
+    "compat": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    # WAL, fsync on every commit: no committed sale is ever lost
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    # WAL, fsync at checkpoints: last commits may be lost on power failure
+    "balanced": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    # WAL, no fsync: an OS crash may corrupt the file; benchmarks and tests only
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+    },
+}
+
+DEFAULT_PROFILE = "durable"
+DEFAULT_PRAGMAS = STORAGE_PROFILES[DEFAULT_PROFILE]
+
+# receives the text of every statement run on pooled connections, when set
+_trace_callback: Optional[Callable[[str], None]] = None
+
+
+def resolve_pragmas(
+    profile: Optional[str] = None,
+    pragmas: Optional[Dict[str, Union[str, int]]] = None,
+) -> Dict[str, Union[str, int]]:
+    """
+    Return the pragmas of a storage profile with explicit overrides applied.
     """
-    Create and return a SQLite database connection.
+    profile = profile or DEFAULT_PROFILE
+
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{profile}'. "
+            f"Choose from: {', '.join(STORAGE_PROFILES)}"
+        )
+
+    return {**STORAGE_PROFILES[profile], **(pragmas or {})}
+
+
+_memory_names = itertools.count(1)
+
+
+def memory_uri(name: Optional[str] = None) -> str:
     """
-    connection = sqlite3.connect(DB_PATH)
+    Return a URI for a named in-memory database.
+
+    Every connection opened on the URI in this process shares the one
+    database, which lives until the last of them is closed. It uses the
+    memdb VFS rather than a shared cache: shared-cache table locks fail at
+    once instead of waiting out busy_timeout, so concurrent tills would
+    see "database table is locked" errors.
+    """
+    if sqlite3.sqlite_version_info < (3, 36, 0):
+        raise RuntimeError(
+            f"In-memory databases need SQLite 3.36 or newer, found {sqlite3.sqlite_version}"
+        )
+
+    if name is None:
+        name = f"smart_stock-{os.getpid()}-{next(_memory_names)}"
+
+    return f"file:/{quote(name)}?vfs=memdb"
+
+
+def is_memory_database(db_path: Union[str, Path]) -> bool:
+    db_path = str(db_path)
+    return (
+        db_path == MEMORY_DB
+        or (db_path.startswith("file:") and ("vfs=memdb" in db_path or "mode=memory" in db_path))
+    )
+
+
+def get_connection(
+    db_path: Union[str, Path, None] = None,
+    pragmas: Optional[Dict[str, Union[str, int]]] = None,
+) -> sqlite3.Connection:
+    """
+    Create and return a new SQLite database connection.
+    Pragmas are applied once, when the connection is opened.
+    A db_path starting with "file:" is opened as an SQLite URI.
+    """
+    db_path = db_path if db_path is not None else DB_PATH
+    connection = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        uri=str(db_path).startswith("file:"),
+    )
     connection.row_factory = sqlite3.Row
+
+    for name, value in (DEFAULT_PRAGMAS if pragmas is None else pragmas).items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
     return connection
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections.
+    Connections are opened lazily and handed out one thread at a time.
+    A db_path of ":memory:" gives the pool its own in-memory database.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path, None] = None,
+        pool_size: int = POOL_SIZE,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None,
+        timeout: float = POOL_TIMEOUT,
+    ) -> None:
+        if not isinstance(pool_size, int) or pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer")
+
+        if db_path is None:
+            db_path = DB_PATH
+        elif str(db_path) == MEMORY_DB:
+            db_path = memory_uri()
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._local = threading.local()
+        self._traced = False
+        self.pid = os.getpid()
+
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Take an idle connection, opening a new one while below pool_size.
+        Blocks up to `timeout` seconds when every connection is in use.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._created < self.pool_size
+            if can_open:
+                self._created += 1
+
+        if can_open:
+            try:
+                return get_connection(self.db_path, self.pragmas)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a database connection")
+
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        """
+        Return a connection to the pool.
+        Any transaction left open is rolled back first.
+        """
+        if connection.in_transaction:
+            connection.rollback()
+
+        if self._closed:
+            connection.close()
+            return
+
+        self._idle.put(connection)
+
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of the block.
+        Commits on success and rolls back on error.
+        Inside an open transaction the thread's connection is reused
+        and the commit is left to the outermost block.
+        """
+        active = getattr(self._local, "connection", None)
+        if active is not None:
+            yield active
+            return
+
+        connection = self.acquire()
+        if _trace_callback is not None or self._traced:
+            connection.set_trace_callback(_trace_callback)
+            self._traced = True
+        self._local.connection = connection
+        try:
+            yield connection
+            if connection.in_transaction:
+                connection.commit()
+        except BaseException:
+            if connection.in_transaction:
+                connection.rollback()
+            raise
+        finally:
+            self._local.connection = None
+            self.release(connection)
+
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run every repository call in the block as one transaction.
+        The write lock is taken up front and released by a single commit.
+        """
+        with self.connection() as connection:
+            if not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+            yield connection
+
+
+    @contextmanager
+    def savepoint(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run the block inside the current transaction (or a new one),
+        undoing only the block's own changes if it raises.
+        """
+        with self.transaction() as connection:
+            connection.execute("SAVEPOINT pool_savepoint")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK TO pool_savepoint")
+                connection.execute("RELEASE pool_savepoint")
+                raise
+            connection.execute("RELEASE pool_savepoint")
+
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+        Connections still in use are closed when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class DatabaseConfig:
+    """
+    Where the database lives and how pooled connections open it.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path, None] = None,
+        profile: Optional[str] = None,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None,
+        pool_size: int = POOL_SIZE,
+    ) -> None:
+        if not isinstance(pool_size, int) or pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer")
+
+        if db_path is None:
+            db_path = DB_PATH
+        elif str(db_path) == MEMORY_DB:
+            # resolve once, so every pool opened from this config shares it
+            db_path = memory_uri()
+
+        self.db_path = db_path
+        self.profile = profile or DEFAULT_PROFILE
+        self.pragmas = resolve_pragmas(self.profile, pragmas)
+        self.pool_size = pool_size
+
+
+    @classmethod
+    def in_memory(
+        cls,
+        name: Optional[str] = None,
+        profile: Optional[str] = None,
+        pool_size: int = POOL_SIZE,
+    ) -> "DatabaseConfig":
+        """
+        Config for a named in-memory database; see memory_uri().
+        """
+        return cls(memory_uri(name), profile=profile, pool_size=pool_size)
+
+
+    @classmethod
+    def from_env(
+        cls,
+        db_path: Union[str, Path, None] = None,
+        profile: Optional[str] = None,
+        environ: Optional[Mapping[str, str]] = None,
+    ) -> "DatabaseConfig":
+        """
+        Build a config from SMART_STOCK_DB, SMART_STOCK_DB_PROFILE and
+        SMART_STOCK_DB_POOL_SIZE. Arguments that are not None win over
+        the environment, which wins over the defaults.
+        """
+        environ = os.environ if environ is None else environ
+        pool_size = environ.get(ENV_POOL_SIZE)
+
+        if pool_size is not None and not pool_size.isdigit():
+            raise ValueError(f"{ENV_POOL_SIZE} must be a positive integer")
+
+        return cls(
+            db_path if db_path is not None else environ.get(ENV_DB_PATH) or None,
+            profile=profile or environ.get(ENV_DB_PROFILE) or None,
+            pool_size=int(pool_size) if pool_size else POOL_SIZE,
+        )
+
+
+    @property
+    def is_memory(self) -> bool:
+        return is_memory_database(self.db_path)
+
+
+    def open_pool(self) -> ConnectionPool:
+        return ConnectionPool(self.db_path, pool_size=self.pool_size, pragmas=self.pragmas)
+
+
+    def __repr__(self) -> str:
+        return (
+            f"DatabaseConfig(db_path='{self.db_path}', profile='{self.profile}', "
+            f"pool_size={self.pool_size})"
+        )
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def set_trace_callback(callback: Optional[Callable[[str], None]]) -> None:
+    """
+    Pass the SQL text of every statement run on pooled connections to
+    `callback`, or stop with None. Applies from each connection's next borrow.
+    """
+    global _trace_callback
+    _trace_callback = callback
+
+
+def configure(
+    db_path: Union[str, Path, None] = None,
+    pool_size: int = POOL_SIZE,
+    pragmas: Optional[Dict[str, Union[str, int]]] = None,
+    profile: Optional[str] = None,
+) -> ConnectionPool:
+    """
+    Replace the shared connection pool.
+    Connections use the given storage profile, with `pragmas` overriding
+    individual settings. The previous pool, if any, is closed.
+    """
+    return use_database(
+        DatabaseConfig(db_path, profile=profile, pragmas=pragmas, pool_size=pool_size)
+    )
+
+
+def use_database(config: DatabaseConfig) -> ConnectionPool:
+    """
+    Point the shared pool, and so every repository, at the configured
+    database. The previous pool, if any, is closed.
+    """
+    return _replace_pool(config.open_pool())
+
+
+def _replace_pool(pool: ConnectionPool) -> ConnectionPool:
+    global _pool
+
+    with _pool_lock:
+        previous = _pool
+        _pool = pool
+
+    if previous is not None and previous.pid == os.getpid():
+        previous.close()
+
+    return pool
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the shared connection pool, creating it on first use from the
+    SMART_STOCK_DB* environment variables.
+    A forked child process gets a fresh pool on the same database file;
+    in-memory databases are private to the process that created them.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = DatabaseConfig.from_env().open_pool()
+        elif _pool.pid != os.getpid():
+            _pool = ConnectionPool(
+                _pool.db_path,
+                pool_size=_pool.pool_size,
+                pragmas=_pool.pragmas,
+            )
+        return _pool
+
+
+@contextmanager
+def pooled_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a connection from the shared pool.
+    """
+    with get_pool().connection() as connection:
+        yield connection
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Group repository calls on the shared pool into one transaction.
+    """
+    with get_pool().transaction() as connection:
+        yield connection
+
+
+@contextmanager
+def savepoint() -> Iterator[sqlite3.Connection]:
+    """
+    Undo just the block's repository calls on error, keeping the rest
+    of the enclosing transaction.
+    """
+    with get_pool().savepoint() as connection:
+        yield connection
@@ -1,24 +1,69 @@
 from pathlib import Path
-from smart_stock_management.database.connection import get_connection
+from typing import List, Tuple
+
+from smart_stock_management.database.connection import pooled_connection
 
 # schema directory
 BASE_DIR = Path(__file__).resolve().parent
 SCHEMA_PATH = BASE_DIR / "schema.sql"
+MIGRATIONS_DIR = BASE_DIR / "migrations"
 
 
 def initialize_database():
     """
-    Initialize database tables using schema.sql.
+    Initialize database tables using schema.sql,
+    then apply any pending migrations.
+    Pooled connections carry the storage profile pragmas, so persistent
+    settings such as WAL journal mode are in place before any table is created.
     """
     if not SCHEMA_PATH.exists():
         raise FileNotFoundError("schema.sql not found in database directory")
 
-    connection = get_connection()
-    cursor = connection.cursor()
-
     with open(SCHEMA_PATH, "r", encoding="utf-8") as schema_file:
         schema_sql = schema_file.read()
 
-    cursor.executescript(schema_sql)
-    connection.commit()
-    connection.close()
+    with pooled_connection() as connection:
+        cursor = connection.cursor()
+        cursor.executescript(schema_sql)
+
+    apply_migrations()
+
+
+def get_migrations() -> List[Tuple[int, Path]]:
+    """
+    Return (version, path) for every migration file, in order.
+    Migration files are named NNNN_description.sql.
+    """
+    migrations = []
+
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        version, _, _ = path.stem.partition("_")
+        if not version.isdigit():
+            raise ValueError(f"Migration file '{path.name}' must start with a version number")
+        migrations.append((int(version), path))
+
+    return migrations
+
+
+def apply_migrations() -> int:
+    """
+    Apply migrations newer than the database's user_version.
+    Each migration runs in its own transaction together with the
+    version bump. Returns the resulting schema version.
+    """
+    with pooled_connection() as connection:
+        current_version = connection.execute("PRAGMA user_version").fetchone()[0]
+
+        for version, path in get_migrations():
+            if version <= current_version:
+                continue
+
+            with open(path, "r", encoding="utf-8") as migration_file:
+                migration_sql = migration_file.read()
+
+            connection.executescript(
+                f"BEGIN;\n{migration_sql}\nPRAGMA user_version = {version};\nCOMMIT;"
+            )
+            current_version = version
+
+    return current_version
@@ -0,0 +1,7 @@
+-- Sales history per product, newest first
+CREATE INDEX IF NOT EXISTS idx_saleslog_product_timestamp
+    ON SalesLog (product_id, timestamp);
+
+-- Sales history and time-range queries across all products
+CREATE INDEX IF NOT EXISTS idx_saleslog_timestamp
+    ON SalesLog (timestamp);
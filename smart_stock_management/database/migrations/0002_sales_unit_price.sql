@@ -0,0 +1,10 @@
+-- Price charged at the time of sale, so revenue survives later price changes
+ALTER TABLE SalesLog ADD COLUMN unit_price REAL;
+
+-- Existing sales are valued at the product's current price
+UPDATE SalesLog
+SET unit_price = (SELECT price FROM Products WHERE Products.id = SalesLog.product_id);
+
+-- Covering index for time-range aggregation: no table lookups needed
+CREATE INDEX IF NOT EXISTS idx_saleslog_timestamp_totals
+    ON SalesLog (timestamp, product_id, quantity_sold, unit_price);
@@ -0,0 +1,38 @@
+-- Units and revenue per product per (UTC) day, maintained on every sale
+CREATE TABLE IF NOT EXISTS SalesDailyRollup (
+    product_id INTEGER NOT NULL,
+    sale_date TEXT NOT NULL,
+    units_sold INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    sale_count INTEGER NOT NULL,
+    PRIMARY KEY (product_id, sale_date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_salesdailyrollup_date
+    ON SalesDailyRollup (sale_date);
+
+-- Runs inside the inserting statement, so the rollup commits with the sale
+CREATE TRIGGER IF NOT EXISTS trg_saleslog_daily_rollup
+AFTER INSERT ON SalesLog
+WHEN NEW.product_id IS NOT NULL
+BEGIN
+    INSERT INTO SalesDailyRollup (product_id, sale_date, units_sold, revenue, sale_count)
+    VALUES (
+        NEW.product_id,
+        date(NEW.timestamp),
+        NEW.quantity_sold,
+        COALESCE(NEW.quantity_sold * NEW.unit_price, 0),
+        1
+    )
+    ON CONFLICT (product_id, sale_date) DO UPDATE SET
+        units_sold = units_sold + excluded.units_sold,
+        revenue = revenue + excluded.revenue,
+        sale_count = sale_count + 1;
+END;
+
+-- Backfill from the existing log
+INSERT INTO SalesDailyRollup (product_id, sale_date, units_sold, revenue, sale_count)
+SELECT product_id, date(timestamp), SUM(quantity_sold), TOTAL(quantity_sold * unit_price), COUNT(*)
+FROM SalesLog
+WHERE product_id IS NOT NULL
+GROUP BY product_id, date(timestamp);
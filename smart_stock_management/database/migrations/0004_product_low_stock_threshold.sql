@@ -0,0 +1,3 @@
+-- Per-product low-stock alert level; NULL falls back to the store default
+ALTER TABLE Products ADD COLUMN low_stock_threshold INTEGER
+    CHECK(low_stock_threshold IS NULL OR low_stock_threshold >= 0);
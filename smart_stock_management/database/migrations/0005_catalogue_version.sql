@@ -0,0 +1,29 @@
+-- Bumped on every change to Products; lets caches tell whether they are stale
+CREATE TABLE IF NOT EXISTS CatalogueVersion (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO CatalogueVersion (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_version_insert
+AFTER INSERT ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_version_update
+AFTER UPDATE ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_version_delete
+AFTER DELETE ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+END;
+
+-- Sorted listings served straight from the database in lazy mode
+CREATE INDEX IF NOT EXISTS idx_products_price ON Products (price);
+CREATE INDEX IF NOT EXISTS idx_products_stock ON Products (stock_quantity);
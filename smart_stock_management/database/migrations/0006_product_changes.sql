@@ -0,0 +1,41 @@
+-- Catalogue version of the last change to each product, so a cache loaded
+-- at version V can pull just the rows changed since; deletes leave their row
+CREATE TABLE IF NOT EXISTS ProductChanges (
+    product_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_productchanges_version
+    ON ProductChanges (version);
+
+-- One trigger per event bumps the version and records it, in that order
+DROP TRIGGER IF EXISTS trg_products_version_insert;
+DROP TRIGGER IF EXISTS trg_products_version_update;
+DROP TRIGGER IF EXISTS trg_products_version_delete;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_changed_insert
+AFTER INSERT ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+    INSERT INTO ProductChanges (product_id, version)
+    SELECT NEW.id, version FROM CatalogueVersion WHERE id = 1
+    ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_changed_update
+AFTER UPDATE ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+    INSERT INTO ProductChanges (product_id, version)
+    SELECT NEW.id, version FROM CatalogueVersion WHERE id = 1
+    ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_changed_delete
+AFTER DELETE ON Products
+BEGIN
+    UPDATE CatalogueVersion SET version = version + 1 WHERE id = 1;
+    INSERT INTO ProductChanges (product_id, version)
+    SELECT OLD.id, version FROM CatalogueVersion WHERE id = 1
+    ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+END;
@@ -0,0 +1,35 @@
+-- Full-text index over product names. External content: the names are
+-- read from Products, so only the token index is stored here. Prefix
+-- indexes on 2 and 3 characters keep short type-ahead queries fast.
+CREATE VIRTUAL TABLE IF NOT EXISTS ProductSearch USING fts5(
+    name,
+    content = 'Products',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+INSERT INTO ProductSearch (ProductSearch) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_products_search_insert
+AFTER INSERT ON Products
+BEGIN
+    INSERT INTO ProductSearch (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_search_delete
+AFTER DELETE ON Products
+BEGIN
+    INSERT INTO ProductSearch (ProductSearch, rowid, name)
+    VALUES ('delete', OLD.id, OLD.name);
+END;
+
+-- Sales and restocks rewrite stock only, so they leave the index alone
+CREATE TRIGGER IF NOT EXISTS trg_products_search_update
+AFTER UPDATE OF name ON Products
+WHEN OLD.name IS NOT NEW.name
+BEGIN
+    INSERT INTO ProductSearch (ProductSearch, rowid, name)
+    VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO ProductSearch (rowid, name) VALUES (NEW.id, NEW.name);
+END;
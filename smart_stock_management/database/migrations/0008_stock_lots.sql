@@ -0,0 +1,27 @@
+-- Perishable stock, received in lots that share an expiry date. A product's
+-- lots never add up to more than its stock_quantity; any stock beyond them
+-- does not expire. Lots are deleted once sold out. AUTOINCREMENT keeps IDs
+-- from being reused, so a cached lot ID never names a different lot.
+CREATE TABLE IF NOT EXISTS StockLots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL,
+    lot_code TEXT NOT NULL,
+    quantity INTEGER NOT NULL CHECK(quantity > 0),
+    expiry_date TEXT NOT NULL,
+    UNIQUE (product_id, lot_code),
+    FOREIGN KEY (product_id) REFERENCES Products(id)
+);
+
+-- "What expires before X" across the store
+CREATE INDEX IF NOT EXISTS idx_stocklots_expiry
+    ON StockLots (expiry_date);
+
+-- A product's lots in first-expired-first-out order
+CREATE INDEX IF NOT EXISTS idx_stocklots_product_expiry
+    ON StockLots (product_id, expiry_date);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_delete_lots
+AFTER DELETE ON Products
+BEGIN
+    DELETE FROM StockLots WHERE product_id = OLD.id;
+END;
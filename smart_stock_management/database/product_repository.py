@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from smart_stock_management.database.connection import get_connection
+from smart_stock_management.database.connection import pooled_connection, transaction
 from smart_stock_management.models.product import Product
+from smart_stock_management.utils.stock_exceptions import StockConflictError
 
 
 class ProductRepository:
@@ -9,23 +10,67 @@ class ProductRepository:
     Repository responsible for Product persistence.
     """
 
+    # columns the sorted and range queries may order or filter by
+    SORTABLE_COLUMNS = ("price", "stock_quantity")
+
+    # rows per INSERT in add_products; 4 parameters each stays under
+    # the 999-parameter limit of older SQLite builds
+    INSERT_BATCH_ROWS = 249
+
     @staticmethod
-    def add_product(name: str, price: float, stock_quantity: int) -> int:
+    def add_product(
+        name: str,
+        price: float,
+        stock_quantity: int,
+        low_stock_threshold: Optional[int] = None,
+    ) -> int:
         query = """
-        INSERT INTO Products (name, price, stock_quantity)
-        VALUES (?, ?, ?)
+        INSERT INTO Products (name, price, stock_quantity, low_stock_threshold)
+        VALUES (?, ?, ?, ?)
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (name, price, stock_quantity, low_stock_threshold))
+            product_id = cursor.lastrowid
 
-        cursor.execute(query, (name, price, stock_quantity))
-        connection.commit()
+        return product_id
 
-        product_id = cursor.lastrowid
-        connection.close()
 
-        return product_id
+    @staticmethod
+    def add_products(
+        products: List[Tuple[str, float, int, Optional[int]]],
+    ) -> List[int]:
+        """
+        Insert many products in one transaction.
+        Takes (name, price, stock_quantity, low_stock_threshold) tuples and
+        returns the new IDs in the same order.
+        """
+        query = """
+        INSERT INTO Products (name, price, stock_quantity, low_stock_threshold)
+        VALUES {}
+        """
+
+        if not products:
+            return []
+
+        # several rows per statement: the search index trigger flushes once
+        # per statement, which made one statement per row several times slower
+        batch_size = ProductRepository.INSERT_BATCH_ROWS
+
+        # the write lock is held throughout, so the new IDs are consecutive
+        with transaction() as connection:
+            cursor = connection.cursor()
+            for start in range(0, len(products), batch_size):
+                batch = products[start:start + batch_size]
+                cursor.execute(
+                    query.format(", ".join(["(?, ?, ?, ?)"] * len(batch))),
+                    [value for product in batch for value in product],
+                )
+            cursor.execute("SELECT last_insert_rowid()")
+            last_id = cursor.fetchone()[0]
+
+        return list(range(last_id - len(products) + 1, last_id + 1))
 
 
     @staticmethod
@@ -35,27 +80,20 @@ class ProductRepository:
         Returns a Product object.
         """
         query = """
-        SELECT id, name, price, stock_quantity
+        SELECT id, name, price, stock_quantity, low_stock_threshold
         FROM Products
         WHERE id = ?
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
-
-        cursor.execute(query, (product_id,))
-        row = cursor.fetchone()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (product_id,))
+            row = cursor.fetchone()
 
         if row is None:
             return None
 
-        return Product(
-            product_id=row["id"],
-            name=row["name"],
-            price=row["price"],
-            stock_quantity=row["stock_quantity"],
-        )
+        return ProductRepository._to_product(row)
 
 
     @staticmethod
@@ -65,44 +103,445 @@ class ProductRepository:
         Returns a list of Product object.
         """
         query = """
-        SELECT id, name, price, stock_quantity
+        SELECT id, name, price, stock_quantity, low_stock_threshold
+        FROM Products
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+        return [ProductRepository._to_product(row) for row in rows]
+
+    @staticmethod
+    def get_all_product_rows() -> List[Tuple[int, str, float, int, Optional[int]]]:
+        """
+        Fetch all products as plain
+        (id, name, price, stock_quantity, low_stock_threshold) tuples,
+        for bulk loaders that do not need Product objects.
+        """
+        query = """
+        SELECT id, name, price, stock_quantity, low_stock_threshold
+        FROM Products
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+        return rows
+
+
+    @staticmethod
+    def iter_products(batch_size: int = 1_000) -> Iterator[Product]:
+        """
+        Stream all products in ID order, one batch at a time.
+        No connection is kept checked out between batches.
+        """
+        query = """
+        SELECT id, name, price, stock_quantity, low_stock_threshold
         FROM Products
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        last_id = 0
+
+        while True:
+            with pooled_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, (last_id, batch_size))
+                rows = cursor.fetchall()
 
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        connection.close()
+            for row in rows:
+                yield ProductRepository._to_product(row)
 
-        return [
-            Product(
-                product_id=row["id"],
-                name=row["name"],
-                price=row["price"],
-                stock_quantity=row["stock_quantity"],
+            if len(rows) < batch_size:
+                return
+
+            last_id = rows[-1]["id"]
+
+
+    @staticmethod
+    def get_product_ids() -> List[int]:
+        """
+        Fetch every product ID, in ascending order.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT id FROM Products ORDER BY id")
+            rows = cursor.fetchall()
+
+        return [row["id"] for row in rows]
+
+
+    @staticmethod
+    def count_products() -> int:
+        """
+        Return the number of products.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM Products")
+            count = cursor.fetchone()[0]
+
+        return count
+
+
+    @staticmethod
+    def get_stock_by_name(names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Return total stock per product name, summing products that share one,
+        for the given names or every product.
+        """
+        query = "SELECT name, SUM(stock_quantity) FROM Products {} GROUP BY name"
+        stock: Dict[str, int] = {}
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+
+            if names is None:
+                cursor.execute(query.format(""))
+                stock.update(cursor.fetchall())
+                return stock
+
+            names = list(names)
+
+            # stay below SQLite's bound-parameter limit on older builds
+            batch_size = 500
+
+            for start in range(0, len(names), batch_size):
+                batch = names[start:start + batch_size]
+                cursor.execute(
+                    query.format(f"WHERE name IN ({', '.join('?' * len(batch))})"),
+                    batch,
+                )
+                stock.update(cursor.fetchall())
+
+        return stock
+
+
+    @staticmethod
+    def get_catalogue_version() -> int:
+        """
+        Return the catalogue version, bumped by triggers on every
+        insert, update or delete in Products.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT version FROM CatalogueVersion WHERE id = 1")
+            row = cursor.fetchone()
+
+        return row["version"]
+
+
+    @staticmethod
+    def get_catalogue_snapshot() -> Tuple[int, List[Tuple[int, str, float, int, Optional[int]]]]:
+        """
+        Return the catalogue version together with all product rows,
+        read in one transaction so the two always match.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT version FROM CatalogueVersion WHERE id = 1")
+            version = cursor.fetchone()[0]
+            cursor.execute(
+                """
+                SELECT id, name, price, stock_quantity, low_stock_threshold
+                FROM Products
+                """
             )
-            for row in rows
+            rows = cursor.fetchall()
+
+        return version, rows
+
+
+    @staticmethod
+    def get_changes_since(
+        version: int,
+    ) -> Tuple[int, List[Tuple[int, Optional[str], Optional[float], Optional[int], Optional[int]]]]:
+        """
+        Return the current catalogue version and the rows of every product
+        changed after `version`, read in one transaction.
+        Deleted products come back with every column but the ID set to None.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT version FROM CatalogueVersion WHERE id = 1")
+            current = cursor.fetchone()[0]
+
+            if current == version:
+                return current, []
+
+            cursor.execute(
+                """
+                SELECT c.product_id, p.name, p.price, p.stock_quantity, p.low_stock_threshold
+                FROM ProductChanges c
+                LEFT JOIN Products p ON p.id = c.product_id
+                WHERE c.version > ?
+                """,
+                (version,),
+            )
+            rows = cursor.fetchall()
+
+        return current, rows
+
+
+    @staticmethod
+    def get_low_stock_products(default_threshold: int) -> List[Product]:
+        """
+        Fetch products below their own threshold, or `default_threshold`
+        when they have none. Ordered by ID.
+        """
+        query = """
+        SELECT id, name, price, stock_quantity, low_stock_threshold
+        FROM Products
+        WHERE stock_quantity < COALESCE(low_stock_threshold, ?)
+        ORDER BY id
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (default_threshold,))
+            rows = cursor.fetchall()
+
+        return [ProductRepository._to_product(row) for row in rows]
+
+
+    @staticmethod
+    def get_sorted_products(
+        order_by: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Product]:
+        """
+        Fetch products ordered by price or stock_quantity, ties by ID.
+        """
+        if order_by not in ProductRepository.SORTABLE_COLUMNS:
+            raise ValueError(
+                f"order_by must be one of: {', '.join(ProductRepository.SORTABLE_COLUMNS)}"
+            )
+
+        direction = "DESC" if descending else "ASC"
+
+        query = f"""
+        SELECT id, name, price, stock_quantity, low_stock_threshold
+        FROM Products
+        ORDER BY {order_by} {direction}, id {direction}
+        LIMIT ? OFFSET ?
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (-1 if limit is None else limit, offset))
+            rows = cursor.fetchall()
+
+        return [ProductRepository._to_product(row) for row in rows]
+
+
+    @staticmethod
+    def get_products_in_range(column: str, low: float, high: float) -> List[Product]:
+        """
+        Fetch products with low <= column <= high, ordered by that column.
+        """
+        if column not in ProductRepository.SORTABLE_COLUMNS:
+            raise ValueError(
+                f"column must be one of: {', '.join(ProductRepository.SORTABLE_COLUMNS)}"
+            )
+
+        query = f"""
+        SELECT id, name, price, stock_quantity, low_stock_threshold
+        FROM Products
+        WHERE {column} BETWEEN ? AND ?
+        ORDER BY {column}, id
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (low, high))
+            rows = cursor.fetchall()
+
+        return [ProductRepository._to_product(row) for row in rows]
+
+
+    @staticmethod
+    def search_products(
+        text: str, limit: int = 20, name_prefix: bool = False
+    ) -> List[Product]:
+        """
+        Full-text search on product names, in ID order.
+        Every word must appear, each matched as a word prefix, case and
+        accents ignored: "choc mil" finds "Milk Chocolate".
+        With name_prefix=True the name must instead start with `text`.
+        Results are not ranked: ranking scores every match before the
+        limit applies, which costs ~100 ms for a one-letter query on a
+        large catalogue, while ID order stops after `limit` matches.
+        """
+        expression = ProductRepository._match_expression(text, name_prefix)
+        if expression is None:
+            return []
+
+        query = """
+        SELECT Products.id, Products.name, Products.price,
+               Products.stock_quantity, Products.low_stock_threshold
+        FROM ProductSearch
+        JOIN Products ON Products.id = ProductSearch.rowid
+        WHERE ProductSearch MATCH ?
+        ORDER BY ProductSearch.rowid
+        LIMIT ?
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (expression, limit))
+            rows = cursor.fetchall()
+
+        return [ProductRepository._to_product(row) for row in rows]
+
+
+    @staticmethod
+    def _match_expression(text: str, name_prefix: bool) -> Optional[str]:
+        """
+        Build an FTS5 query from user input. Each word becomes a quoted
+        prefix phrase, so quotes and operators in the input are matched
+        literally instead of being parsed as query syntax.
+        """
+        words = [
+            '"' + word.replace('"', '""') + '"'
+            for word in text.split()
+            if any(character.isalnum() for character in word)
         ]
 
+        if not words:
+            return None
+
+        if name_prefix:
+            # one phrase anchored at the first token of the name
+            return "^" + " + ".join(words) + "*"
+
+        return " ".join(word + "*" for word in words)
+
     @staticmethod
-    def update_stock(product_id: int, new_stock: int) -> None:
+    def set_stock(product_id: int, new_stock: int, expected_stock: int) -> None:
         """
-        Update stock quantity.
+        Set stock to an absolute value, but only while the database still
+        holds `expected_stock`. Raises StockConflictError, changing nothing,
+        when the product is missing or its stock was changed meanwhile.
         """
         query = """
         UPDATE Products
         SET stock_quantity = ?
+        WHERE id = ? AND stock_quantity = ?
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (new_stock, product_id, expected_stock))
+
+            if cursor.rowcount == 0:
+                raise StockConflictError(
+                    [product_id],
+                    f"Stock of product ID {product_id} changed in the database "
+                    f"since it was read as {expected_stock}",
+                )
+
+
+    @staticmethod
+    def decrease_stocks(quantities: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+        """
+        Take stock off many products as one all-or-nothing write.
+        Takes (product_id, quantity) pairs and returns the new stock levels.
+        Each update is relative and only applies while enough stock is left,
+        so concurrent writers can neither oversell nor overwrite each other.
+        Raises StockConflictError, changing nothing, when any product is
+        missing or short.
+        """
+        update = """
+        UPDATE Products
+        SET stock_quantity = stock_quantity - ?
+        WHERE id = ? AND stock_quantity >= ?
+        """
+        select = "SELECT stock_quantity FROM Products WHERE id = ?"
+
+        levels: Dict[int, int] = {}
+        conflicts: List[int] = []
+
+        with transaction() as connection:
+            cursor = connection.cursor()
+
+            for product_id, quantity in quantities:
+                cursor.execute(update, (quantity, product_id, quantity))
+                if cursor.rowcount == 0:
+                    conflicts.append(product_id)
+                    continue
+                cursor.execute(select, (product_id,))
+                levels[product_id] = cursor.fetchone()[0]
+
+            if conflicts:
+                raise StockConflictError(conflicts)
+
+        return levels
+
+
+    @staticmethod
+    def increase_stock(product_id: int, quantity: int) -> Optional[int]:
+        """
+        Add stock relative to the current database value.
+        Returns the new stock level, or None if the product does not exist.
+        """
+        update = """
+        UPDATE Products
+        SET stock_quantity = stock_quantity + ?
         WHERE id = ?
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        with transaction() as connection:
+            cursor = connection.cursor()
+            cursor.execute(update, (quantity, product_id))
+            if cursor.rowcount == 0:
+                return None
+            cursor.execute(
+                "SELECT stock_quantity FROM Products WHERE id = ?", (product_id,)
+            )
+            return cursor.fetchone()[0]
+
+
+    @staticmethod
+    def get_stock_levels(product_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Read the current stock of the given products.
+        Products that no longer exist are left out.
+        """
+        product_ids = list(product_ids)
+        levels: Dict[int, int] = {}
 
-        cursor.execute(query, (new_stock, product_id))
-        connection.commit()
-        connection.close()
+        # stay below SQLite's bound-parameter limit on older builds
+        batch_size = 500
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            for start in range(0, len(product_ids), batch_size):
+                batch = product_ids[start:start + batch_size]
+                cursor.execute(
+                    f"""
+                    SELECT id, stock_quantity
+                    FROM Products
+                    WHERE id IN ({", ".join("?" * len(batch))})
+                    """,
+                    batch,
+                )
+                levels.update(cursor.fetchall())
+
+        return levels
 
 
     @staticmethod
@@ -110,12 +549,17 @@ class ProductRepository:
         product_id: int,
         name: Optional[str] = None,
         price: Optional[float] = None,
-        stock_quantity: Optional[int] = None,
+        low_stock_threshold: Optional[int] = None,
+        clear_threshold: bool = False,
     ) -> None:
         """
         Update product details.
-        Only provided fields will be updated.
+        Only provided fields will be updated. Stock is never written here,
+        see set_stock. clear_threshold sets the low-stock threshold back
+        to NULL, the store default.
         """
+        if clear_threshold and low_stock_threshold is not None:
+            raise ValueError("Cannot both set and clear the low-stock threshold.")
 
         updates = []
         params = []
@@ -128,9 +572,12 @@ class ProductRepository:
             updates.append("price = ?")
             params.append(price)
 
-        if stock_quantity is not None:
-            updates.append("stock_quantity = ?")
-            params.append(stock_quantity)
+        if low_stock_threshold is not None:
+            updates.append("low_stock_threshold = ?")
+            params.append(low_stock_threshold)
+
+        if clear_threshold:
+            updates.append("low_stock_threshold = NULL")
 
         if not updates:
             raise ValueError("No fields provided to update.")
@@ -143,12 +590,9 @@ class ProductRepository:
 
         params.append(product_id)
 
-        connection = get_connection()
-        cursor = connection.cursor()
-
-        cursor.execute(query, tuple(params))
-        connection.commit()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, tuple(params))
 
 
     @staticmethod
@@ -161,14 +605,20 @@ class ProductRepository:
         WHERE id = ?
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (product_id,))
 
-        cursor.execute(query, (product_id,))
-        connection.commit()
+            if cursor.rowcount == 0:
+                raise ValueError(f"Product with ID {product_id} not found.")
 
-        if cursor.rowcount == 0:
-            connection.close()
-            raise ValueError(f"Product with ID {product_id} not found.")
 
-        connection.close()
+    @staticmethod
+    def _to_product(row) -> Product:
+        return Product.from_storage(
+            product_id=row["id"],
+            name=row["name"],
+            price=row["price"],
+            stock_quantity=row["stock_quantity"],
+            low_stock_threshold=row["low_stock_threshold"],
+        )
@@ -1,8 +1,33 @@
-from typing import List
-from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timezone
 
-from smart_stock_management.database.connection import get_connection
-from smart_stock_management.models.sales import Sale
+from smart_stock_management.database.connection import pooled_connection
+from smart_stock_management.models.sales import Sale, SalesSummary
+
+# Fixed SalesLog queries, module-level so benchmarks/check_query_plans.py
+# checks the index of the exact SQL run here
+
+# all sales, newest first, in idx_saleslog_timestamp order
+ALL_SALES_QUERY = """
+SELECT sale_id, product_id, quantity_sold, unit_price, timestamp
+FROM SalesLog
+ORDER BY timestamp DESC, sale_id DESC
+"""
+
+# one product's sales, newest first, from idx_saleslog_product_timestamp
+SALES_BY_PRODUCT_QUERY = """
+SELECT sale_id, product_id, quantity_sold, unit_price, timestamp
+FROM SalesLog
+WHERE product_id = ?
+ORDER BY timestamp DESC, sale_id DESC
+"""
+
+# units and revenue in [start, end), read from idx_saleslog_timestamp_totals alone
+SALES_TOTALS_QUERY = """
+SELECT COALESCE(SUM(quantity_sold), 0), TOTAL(quantity_sold * unit_price)
+FROM SalesLog
+WHERE timestamp >= ? AND timestamp < ?
+"""
 
 
 class SalesRepository:
@@ -10,27 +35,79 @@ class SalesRepository:
     Repository responsible for SalesLog persistence.
     """
 
+    # SQLite expressions truncating a timestamp, shifted to local time, to its period
+    PERIODS = {
+        "hour": "strftime('%Y-%m-%d %H:00', timestamp, :offset)",
+        "day": "date(timestamp, :offset)",
+        "week": "date(timestamp, :offset, 'weekday 0', '-6 days')",
+    }
+
     @staticmethod
-    def record_sale(product_id: int, quantity_sold: int) -> int:
+    def record_sale(
+        product_id: int,
+        quantity_sold: int,
+        unit_price: Optional[float] = None,
+    ) -> int:
         """
         Insert a sales record into the SalesLog table.
         Returns the generated sale_id.
         """
         query = """
-        INSERT INTO SalesLog (product_id, quantity_sold)
-        VALUES (?, ?)
+        INSERT INTO SalesLog (product_id, quantity_sold, unit_price)
+        VALUES (?, ?, ?)
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (product_id, quantity_sold, unit_price))
+            sale_id = cursor.lastrowid
 
-        cursor.execute(query, (product_id, quantity_sold))
-        connection.commit()
+        return sale_id
 
-        sale_id = cursor.lastrowid
-        connection.close()
 
-        return sale_id
+    @staticmethod
+    def record_sales(sales: Iterable[Tuple[int, int, Optional[float]]]) -> None:
+        """
+        Insert many sales records into the SalesLog table.
+        Takes (product_id, quantity_sold, unit_price) tuples.
+        """
+        query = """
+        INSERT INTO SalesLog (product_id, quantity_sold, unit_price)
+        VALUES (?, ?, ?)
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(query, sales)
+
+
+    @staticmethod
+    def record_past_sales(
+        sales: Iterable[Tuple[int, int, Optional[float], datetime]],
+    ) -> None:
+        """
+        Insert many sales records with their original timestamps.
+        Takes (product_id, quantity_sold, unit_price, timestamp) tuples.
+        """
+        query = """
+        INSERT INTO SalesLog (product_id, quantity_sold, unit_price, timestamp)
+        VALUES (?, ?, ?, ?)
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                query,
+                (
+                    (
+                        product_id,
+                        quantity_sold,
+                        unit_price,
+                        SalesRepository._to_db_timestamp(timestamp),
+                    )
+                    for product_id, quantity_sold, unit_price, timestamp in sales
+                ),
+            )
 
 
     @staticmethod
@@ -39,55 +116,363 @@ class SalesRepository:
         Fetch all sales records.
         Returns a list of Sale objects.
         """
-        query = """
-        SELECT sale_id, product_id, quantity_sold, timestamp
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(ALL_SALES_QUERY)
+            rows = cursor.fetchall()
+
+        return [SalesRepository._to_sale(row) for row in rows]
+
+    @staticmethod
+    def get_sales_by_product(product_id: int) -> List[Sale]:
+        """
+        Fetch sales records for a specific product.
+        Returns a list of Sale objects.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(SALES_BY_PRODUCT_QUERY, (product_id,))
+            rows = cursor.fetchall()
+
+        return [SalesRepository._to_sale(row) for row in rows]
+
+
+    @staticmethod
+    def get_sales_page(
+        after_sale_id: Optional[int] = None,
+        limit: int = 50,
+        product_id: Optional[int] = None,
+    ) -> List[Sale]:
+        """
+        Fetch one page of sales records, newest first.
+        Pass the id of the last sale of the previous page as `after_sale_id`
+        to get the next page; the cost of a page does not grow with its depth.
+        """
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("limit must be a positive integer")
+
+        product_filter = "" if product_id is None else "product_id = :product_id AND "
+        columns = "sale_id, product_id, quantity_sold, unit_price, timestamp"
+        params = {"product_id": product_id, "limit": limit}
+
+        if after_sale_id is None:
+            query = f"""
+            SELECT {columns}
+            FROM SalesLog
+            {"" if product_id is None else "WHERE product_id = :product_id"}
+            ORDER BY timestamp DESC, sale_id DESC
+            LIMIT :limit
+            """
+        else:
+            # sales sharing the anchor's timestamp, then strictly older ones;
+            # each half is an index range scan of at most `limit` rows
+            query = f"""
+            SELECT {columns} FROM (
+                SELECT {columns}
+                FROM SalesLog
+                WHERE {product_filter}timestamp = :timestamp AND sale_id < :sale_id
+                ORDER BY sale_id DESC
+                LIMIT :limit
+            )
+            UNION ALL
+            SELECT {columns} FROM (
+                SELECT {columns}
+                FROM SalesLog
+                WHERE {product_filter}timestamp < :timestamp
+                ORDER BY timestamp DESC, sale_id DESC
+                LIMIT :limit
+            )
+            ORDER BY timestamp DESC, sale_id DESC
+            LIMIT :limit
+            """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+
+            if after_sale_id is not None:
+                cursor.execute(
+                    "SELECT timestamp FROM SalesLog WHERE sale_id = ?",
+                    (after_sale_id,),
+                )
+                anchor = cursor.fetchone()
+                if anchor is None:
+                    return []
+                params["timestamp"] = anchor["timestamp"]
+                params["sale_id"] = after_sale_id
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        return [SalesRepository._to_sale(row) for row in rows]
+
+
+    @staticmethod
+    def iter_sales(
+        product_id: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Sale]:
+        """
+        Stream sales records, newest first, one page at a time.
+        Only `batch_size` rows are held in memory, and no connection
+        is kept checked out between pages.
+        """
+        after_sale_id = None
+
+        while True:
+            page = SalesRepository.get_sales_page(
+                after_sale_id=after_sale_id,
+                limit=batch_size,
+                product_id=product_id,
+            )
+
+            yield from page
+
+            if len(page) < batch_size:
+                return
+
+            after_sale_id = page[-1].id
+
+
+    @staticmethod
+    def summarize_sales(
+        period: str,
+        start: datetime,
+        end: datetime,
+        product_id: Optional[int] = None,
+        by_product: bool = True,
+        utc_offset_minutes: int = 0,
+    ) -> List[SalesSummary]:
+        """
+        Aggregate units sold and revenue per hour, day or week
+        for sales in [start, end). Grouping runs inside SQLite over an
+        index range scan, so only one row per group reaches Python.
+        Periods are labelled in local time given by `utc_offset_minutes`.
+        """
+        if period not in SalesRepository.PERIODS:
+            raise ValueError(
+                f"Period must be one of: {', '.join(SalesRepository.PERIODS)}"
+            )
+
+        if start >= end:
+            raise ValueError("start must be before end")
+
+        group_columns = "period, product_id" if by_product else "period"
+        product_column = "product_id" if by_product else "NULL"
+        product_filter = "" if product_id is None else "AND product_id = :product_id"
+
+        query = f"""
+        SELECT
+            {SalesRepository.PERIODS[period]} AS period,
+            {product_column} AS product_id,
+            SUM(quantity_sold) AS units_sold,
+            TOTAL(quantity_sold * unit_price) AS revenue
         FROM SalesLog
-        ORDER BY timestamp DESC
+        WHERE timestamp >= :start AND timestamp < :end {product_filter}
+        GROUP BY {group_columns}
+        ORDER BY {group_columns}
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        params = {
+            "offset": f"{utc_offset_minutes:+d} minutes",
+            "start": SalesRepository._to_db_timestamp(start),
+            "end": SalesRepository._to_db_timestamp(end),
+            "product_id": product_id,
+        }
 
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
         return [
-            Sale(
-                sale_id=row["sale_id"],
+            SalesSummary(
+                period=row["period"],
                 product_id=row["product_id"],
-                quantity_sold=row["quantity_sold"],
-                timestamp=datetime.fromisoformat(row["timestamp"]),
+                units_sold=row["units_sold"],
+                revenue=row["revenue"],
             )
             for row in rows
         ]
 
+
     @staticmethod
-    def get_sales_by_product(product_id: int) -> List[Sale]:
+    def get_sales_totals(start: datetime, end: datetime) -> Tuple[int, float]:
         """
-        Fetch sales records for a specific product.
-        Returns a list of Sale objects.
+        Return total units sold and revenue for sales in [start, end),
+        read from the covering timestamp index.
         """
-        query = """
-        SELECT sale_id, product_id, quantity_sold, timestamp
-        FROM SalesLog
-        WHERE product_id = ?
-        ORDER BY timestamp DESC
+        if start >= end:
+            raise ValueError("start must be before end")
+
+        params = (
+            SalesRepository._to_db_timestamp(start),
+            SalesRepository._to_db_timestamp(end),
+        )
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(SALES_TOTALS_QUERY, params)
+            units_sold, revenue = cursor.fetchone()
+
+        return units_sold, revenue
+
+
+    @staticmethod
+    def get_daily_rollups(
+        start_date: date,
+        end_date: date,
+        product_id: Optional[int] = None,
+    ) -> List[SalesSummary]:
+        """
+        Fetch per product per day totals from SalesDailyRollup
+        for UTC days in [start_date, end_date]. A single product and day
+        is one primary-key lookup, however large SalesLog grows.
+        """
+        product_filter = "" if product_id is None else "AND product_id = :product_id"
+
+        query = f"""
+        SELECT sale_date, product_id, units_sold, revenue
+        FROM SalesDailyRollup
+        WHERE sale_date BETWEEN :start AND :end {product_filter}
+        ORDER BY sale_date, product_id
         """
 
-        connection = get_connection()
-        cursor = connection.cursor()
+        params = {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "product_id": product_id,
+        }
 
-        cursor.execute(query, (product_id,))
-        rows = cursor.fetchall()
-        connection.close()
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
         return [
-            Sale(
-                sale_id=row["sale_id"],
+            SalesSummary(
+                period=row["sale_date"],
                 product_id=row["product_id"],
-                quantity_sold=row["quantity_sold"],
-                timestamp=datetime.fromisoformat(row["timestamp"]),
+                units_sold=row["units_sold"],
+                revenue=row["revenue"],
             )
             for row in rows
         ]
+
+
+    @staticmethod
+    def rebuild_daily_rollups() -> int:
+        """
+        Recompute SalesDailyRollup from SalesLog in one transaction.
+        Returns the number of rollup rows written.
+        """
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM SalesDailyRollup")
+            cursor.execute(
+                """
+                INSERT INTO SalesDailyRollup
+                    (product_id, sale_date, units_sold, revenue, sale_count)
+                SELECT
+                    product_id,
+                    date(timestamp),
+                    SUM(quantity_sold),
+                    TOTAL(quantity_sold * unit_price),
+                    COUNT(*)
+                FROM SalesLog
+                WHERE product_id IS NOT NULL
+                GROUP BY product_id, date(timestamp)
+                """
+            )
+            written = cursor.rowcount
+
+        return written
+
+
+    @staticmethod
+    def check_daily_rollups() -> List[Tuple[Optional[SalesSummary], Optional[SalesSummary]]]:
+        """
+        Compare SalesDailyRollup against totals recomputed from SalesLog.
+        Returns (expected, actual) pairs for every product and day that
+        differ; either side is None when its row is missing.
+        """
+        query = """
+        WITH expected AS (
+            SELECT
+                product_id,
+                date(timestamp) AS sale_date,
+                SUM(quantity_sold) AS units_sold,
+                TOTAL(quantity_sold * unit_price) AS revenue
+            FROM SalesLog
+            WHERE product_id IS NOT NULL
+            GROUP BY product_id, date(timestamp)
+        )
+        SELECT
+            e.product_id, e.sale_date,
+            e.units_sold AS expected_units, e.revenue AS expected_revenue,
+            r.units_sold AS actual_units, r.revenue AS actual_revenue
+        FROM expected e
+        LEFT JOIN SalesDailyRollup r
+            ON r.product_id = e.product_id AND r.sale_date = e.sale_date
+        WHERE r.product_id IS NULL
+            OR r.units_sold != e.units_sold
+            OR ABS(r.revenue - e.revenue) > 0.005
+        UNION ALL
+        SELECT
+            r.product_id, r.sale_date,
+            NULL, NULL,
+            r.units_sold, r.revenue
+        FROM SalesDailyRollup r
+        WHERE NOT EXISTS (
+            SELECT 1 FROM expected e
+            WHERE e.product_id = r.product_id AND e.sale_date = r.sale_date
+        )
+        ORDER BY 2, 1
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+        mismatches = []
+
+        for row in rows:
+            expected = actual = None
+
+            if row["expected_units"] is not None:
+                expected = SalesSummary(
+                    row["sale_date"], row["product_id"],
+                    row["expected_units"], row["expected_revenue"],
+                )
+
+            if row["actual_units"] is not None:
+                actual = SalesSummary(
+                    row["sale_date"], row["product_id"],
+                    row["actual_units"], row["actual_revenue"],
+                )
+
+            mismatches.append((expected, actual))
+
+        return mismatches
+
+
+    @staticmethod
+    def _to_db_timestamp(value: datetime) -> str:
+        """
+        Format a datetime the way SQLite's CURRENT_TIMESTAMP stores it (UTC).
+        Naive datetimes are taken to be UTC already.
+        """
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+    @staticmethod
+    def _to_sale(row) -> Sale:
+        return Sale.from_storage(
+            sale_id=row["sale_id"],
+            product_id=row["product_id"],
+            quantity_sold=row["quantity_sold"],
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            unit_price=row["unit_price"],
+        )
@@ -0,0 +1,211 @@
+from datetime import date
+from typing import Iterable, List, Tuple
+
+from smart_stock_management.database.connection import pooled_connection, transaction
+from smart_stock_management.models.stock_lot import StockLot
+
+
+class StockLotRepository:
+    """
+    Repository responsible for StockLots persistence.
+    """
+
+    # stay below SQLite's bound-parameter limit on older builds
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def add_lot(
+        product_id: int,
+        lot_code: str,
+        quantity: int,
+        expiry_date: date,
+    ) -> int:
+        """
+        Record a received lot, or add to an existing lot with the same code.
+        Returns the lot ID. Raises ValueError if the lot exists with
+        another expiry date.
+        """
+        upsert = """
+        INSERT INTO StockLots (product_id, lot_code, quantity, expiry_date)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (product_id, lot_code) DO UPDATE
+        SET quantity = quantity + excluded.quantity
+        WHERE expiry_date = excluded.expiry_date
+        """
+        select = "SELECT id FROM StockLots WHERE product_id = ? AND lot_code = ?"
+
+        with transaction() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                upsert, (product_id, lot_code, quantity, expiry_date.isoformat())
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(
+                    f"Lot '{lot_code}' of product {product_id} already exists "
+                    "with a different expiry date"
+                )
+            cursor.execute(select, (product_id, lot_code))
+            lot_id = cursor.fetchone()[0]
+
+        return lot_id
+
+
+    @staticmethod
+    def consume_lots(quantities: Iterable[Tuple[int, int]]) -> None:
+        """
+        Take sold stock off the products' lots, earliest expiry first (FEFO).
+        Takes (product_id, quantity) pairs. Lots that run out are deleted;
+        whatever the lots cannot cover came from stock without an expiry.
+        """
+        remaining = dict(quantities)
+        product_ids = list(remaining)
+        used_up: List[Tuple[int]] = []
+        reduced: List[Tuple[int, int]] = []
+
+        with transaction() as connection:
+            cursor = connection.cursor()
+
+            for start in range(0, len(product_ids), StockLotRepository.BATCH_SIZE):
+                batch = product_ids[start:start + StockLotRepository.BATCH_SIZE]
+                cursor.execute(
+                    f"""
+                    SELECT id, product_id, quantity
+                    FROM StockLots
+                    WHERE product_id IN ({", ".join("?" * len(batch))})
+                    ORDER BY product_id, expiry_date, id
+                    """,
+                    batch,
+                )
+
+                for lot_id, product_id, quantity in cursor.fetchall():
+                    wanted = remaining[product_id]
+                    if wanted <= 0:
+                        continue
+                    if quantity <= wanted:
+                        used_up.append((lot_id,))
+                    else:
+                        reduced.append((quantity - wanted, lot_id))
+                    remaining[product_id] = wanted - quantity
+
+            if used_up:
+                cursor.executemany("DELETE FROM StockLots WHERE id = ?", used_up)
+            if reduced:
+                cursor.executemany(
+                    "UPDATE StockLots SET quantity = ? WHERE id = ?", reduced
+                )
+
+
+    @staticmethod
+    def fit_lots_to_stock(product_id: int) -> None:
+        """
+        After the stock of a product was set outright, consume its lots
+        (FEFO) until they no longer exceed the stock.
+        """
+        query = """
+        SELECT COALESCE(SUM(StockLots.quantity), 0) - Products.stock_quantity
+        FROM Products
+        LEFT JOIN StockLots ON StockLots.product_id = Products.id
+        WHERE Products.id = ?
+        """
+
+        with transaction() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (product_id,))
+            row = cursor.fetchone()
+
+            if row is not None and row[0] > 0:
+                StockLotRepository.consume_lots([(product_id, row[0])])
+
+
+    @staticmethod
+    def get_lots_for_product(product_id: int) -> List[StockLot]:
+        """
+        Fetch a product's lots, earliest expiry first.
+        """
+        query = """
+        SELECT id, product_id, lot_code, quantity, expiry_date
+        FROM StockLots
+        WHERE product_id = ?
+        ORDER BY expiry_date, id
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (product_id,))
+            rows = cursor.fetchall()
+
+        return [StockLotRepository._to_lot(row) for row in rows]
+
+
+    @staticmethod
+    def get_all_lots() -> List[StockLot]:
+        """
+        Fetch every lot.
+        """
+        query = """
+        SELECT id, product_id, lot_code, quantity, expiry_date
+        FROM StockLots
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+        return [StockLotRepository._to_lot(row) for row in rows]
+
+
+    @staticmethod
+    def get_lots_for_products(product_ids: Iterable[int]) -> List[StockLot]:
+        """
+        Fetch the lots of many products.
+        """
+        product_ids = list(product_ids)
+        lots: List[StockLot] = []
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            for start in range(0, len(product_ids), StockLotRepository.BATCH_SIZE):
+                batch = product_ids[start:start + StockLotRepository.BATCH_SIZE]
+                cursor.execute(
+                    f"""
+                    SELECT id, product_id, lot_code, quantity, expiry_date
+                    FROM StockLots
+                    WHERE product_id IN ({", ".join("?" * len(batch))})
+                    """,
+                    batch,
+                )
+                lots.extend(StockLotRepository._to_lot(row) for row in cursor.fetchall())
+
+        return lots
+
+
+    @staticmethod
+    def get_lots_expiring_by(day: date) -> List[StockLot]:
+        """
+        Fetch lots expiring on or before `day`, earliest first.
+        """
+        query = """
+        SELECT id, product_id, lot_code, quantity, expiry_date
+        FROM StockLots
+        WHERE expiry_date <= ?
+        ORDER BY expiry_date, id
+        """
+
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, (day.isoformat(),))
+            rows = cursor.fetchall()
+
+        return [StockLotRepository._to_lot(row) for row in rows]
+
+
+    @staticmethod
+    def _to_lot(row) -> StockLot:
+        return StockLot.from_storage(
+            lot_id=row["id"],
+            product_id=row["product_id"],
+            lot_code=row["lot_code"],
+            quantity=row["quantity"],
+            expiry_date=date.fromisoformat(row["expiry_date"]),
+        )
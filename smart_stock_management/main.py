@@ -1,9 +1,38 @@
+import argparse
+import time
 from datetime import datetime
 
 from smart_stock_management.services.store_manager import StoreManager
-from smart_stock_management.utils.stock_exceptions import InsufficientStockError
+from smart_stock_management.utils.stock_exceptions import (
+    InsufficientStockError,
+    StockConflictError,
+)
+from smart_stock_management.database.connection import (
+    ENV_DB_PATH,
+    ENV_DB_PROFILE,
+    MEMORY_DB,
+    STORAGE_PROFILES,
+    DatabaseConfig,
+    use_database,
+)
 from smart_stock_management.database.initializer import initialize_database
-from smart_stock_management.models.product import PerishableProduct
+from smart_stock_management.services.catalogue_io import FORMATS, ImportReport
+from smart_stock_management.services.http_api import StoreAPIServer
+from smart_stock_management.services.instrumentation import (
+    SLOW_QUERY_MS,
+    disable_instrumentation,
+    enable_instrumentation,
+    is_instrumentation_enabled,
+    metrics,
+    write_metrics,
+)
+from smart_stock_management.utils.metrics import format_report, format_seconds
+from smart_stock_management.services.store_chain import StoreChain
+from smart_stock_management.services.sales_writer import (
+    DURABILITY_LEVELS,
+    FLUSH_ROWS,
+    SalesWriter,
+)
 
 # input helpers
 def read_int(prompt: str, min_value: int | None = None) -> int:
@@ -52,7 +81,7 @@ Stock Quantity  : {product.stock_quantity}
     )
 
 
-from datetime import timezone
+from datetime import timedelta, timezone
 from zoneinfo import ZoneInfo
 
 def convert_utc_to_ist(utc_dt):
@@ -82,8 +111,19 @@ def add_product_flow(manager: StoreManager) -> None:
     name = read_non_empty_string("Enter product name: ")
     price = read_float("Enter price: ", min_value=0)
     quantity = read_int("Enter stock quantity: ", min_value=0)
+    threshold_input = input(
+        f"Low-stock alert below (blank for default {manager.LOW_STOCK_THRESHOLD}): "
+    ).strip()
 
-    product = manager.add_product(name, price, quantity)
+    low_stock_threshold = None
+    if threshold_input:
+        try:
+            low_stock_threshold = int(threshold_input)
+        except ValueError:
+            print("Invalid threshold. Product not added.")
+            return
+
+    product = manager.add_product(name, price, quantity, low_stock_threshold)
     print(f"Product added successfully!")
     display_product(product=product)
 
@@ -101,6 +141,9 @@ def update_product_flow(manager: StoreManager) -> None:
     name = input("New name: ").strip()
     price_input = input("New price: ").strip()
     stock_input = input("New stock quantity: ").strip()
+    threshold_input = input(
+        "New low-stock threshold ('default' for the store default): "
+    ).strip()
 
     kwargs = {}
 
@@ -121,11 +164,26 @@ def update_product_flow(manager: StoreManager) -> None:
             print("Invalid stock quantity. Update aborted.")
             return
 
+    if threshold_input.lower() == "default":
+        kwargs["clear_threshold"] = True
+    elif threshold_input:
+        try:
+            kwargs["low_stock_threshold"] = int(threshold_input)
+        except ValueError:
+            print("Invalid low-stock threshold. Update aborted.")
+            return
+
     if not kwargs:
         print("No fields provided for update.")
         return
 
-    updated_product = manager.update_product(product_id, **kwargs)
+    try:
+        updated_product = manager.update_product(product_id, **kwargs)
+    except StockConflictError as e:
+        # another till sold or restocked meanwhile
+        print(f"{e}; it is now {product.stock_quantity}. Update aborted.")
+        return
+
     print(f"Product updated successfully!")
     display_product(product=updated_product)
 
@@ -186,7 +244,7 @@ def process_sale_flow(manager: StoreManager) -> None:
         manager.process_sale(product_id, quantity)
         print("Sale processed successfully.")
 
-        if product.stock_quantity < manager.LOW_STOCK_THRESHOLD:
+        if manager.is_low_stock(product):
             print(
                 f"ALERT: '{product.name}' is low on stock "
                 f"(Remaining: {product.stock_quantity})"
@@ -198,6 +256,53 @@ def process_sale_flow(manager: StoreManager) -> None:
         print(e)
 
 
+def process_basket_flow(manager: StoreManager) -> None:
+    print("Enter basket lines. Leave product ID blank to finish.")
+
+    lines = []
+    total_amount = 0.0
+
+    while True:
+        product_input = input("Product ID: ").strip()
+        if not product_input:
+            break
+
+        try:
+            product_id = int(product_input)
+        except ValueError:
+            print("Please enter a valid integer.")
+            continue
+
+        product = manager.get_product_by_id(product_id)
+        if product is None:
+            print(f"Product with ID {product_id} not found.")
+            continue
+
+        quantity = read_int("Quantity: ", min_value=1)
+        lines.append((product_id, quantity))
+        total_amount += product.price * quantity
+
+    if not lines:
+        print("Basket is empty.")
+        return
+
+    print(f"\nBasket lines: {len(lines)}")
+    print(f"Total amount to pay: ₹{total_amount:.2f}")
+    confirm = input("Do you want to proceed? (y/n): ").strip().lower()
+
+    if confirm != "y":
+        print("Transaction cancelled.")
+        return
+
+    try:
+        manager.process_basket(lines)
+        print("Basket processed successfully.")
+    except InsufficientStockError as e:
+        print(f"Basket rejected: {e}")
+    except ValueError as e:
+        print(e)
+
+
 def list_low_stock_products(manager: StoreManager) -> None:
     products = manager.get_low_stock_products()
 
@@ -210,69 +315,184 @@ def list_low_stock_products(manager: StoreManager) -> None:
         display_product(product=product)
 
 
+PRODUCTS_PAGE_SIZE = 20
+
+
 def list_products_sorted(manager: StoreManager) -> None:
     print("\n1. Sort by price")
     print("2. Sort by stock quantity")
+    print("3. Filter by price range")
 
     choice = read_int("Choose sorting option: ", min_value=1)
 
     if choice == 1:
-        products = manager.get_sorted_products_by_price()
+        get_page = manager.get_sorted_products_by_price
     elif choice == 2:
-        products = manager.get_sorted_products_by_stock()
+        get_page = manager.get_sorted_products_by_stock
+    elif choice == 3:
+        min_price = read_float("Minimum price: ", min_value=0)
+        max_price = read_float("Maximum price: ", min_value=0)
+        products = manager.get_products_by_price_range(min_price, max_price)
+
+        def get_page(offset: int, limit: int):
+            return products[offset:offset + limit]
     else:
         print("Invalid choice.")
         return
-    
+
+    offset = 0
+
+    while True:
+        products_page = get_page(offset=offset, limit=PRODUCTS_PAGE_SIZE)
+
+        if not products_page and offset == 0:
+            print("\nNo Products Available.")
+            return
+
+        if offset == 0:
+            print("\n--- Sorted Products ---")
+
+        for product in products_page:
+            display_product(product=product)
+
+        if len(products_page) < PRODUCTS_PAGE_SIZE:
+            return
+
+        more = input("Show more? (y/n): ").strip().lower()
+        if more != "y":
+            return
+
+        offset += PRODUCTS_PAGE_SIZE
+
+
+def search_products_flow(manager: StoreManager) -> None:
+    print("\n1. Search by words in the name")
+    print("2. Names starting with")
+
+    choice = read_int("Choose search option: ", min_value=1)
+
+    if choice == 1:
+        search = manager.search_products
+    elif choice == 2:
+        search = manager.suggest_products
+    else:
+        print("Invalid choice.")
+        return
+
+    text = read_non_empty_string("Search for: ")
+    products = search(text)
+
     if not products:
-        print("\nNo Products Available.")
+        print("No matching products.")
         return
 
-    print("\n--- Sorted Products ---")
+    print(f"\n--- Matches (up to {manager.SEARCH_LIMIT}) ---")
     for product in products:
         display_product(product=product)
 
 
-def check_expiry_flow(manager: StoreManager) -> None:
-    product_id = read_int("Enter product ID: ", min_value=1)
+def display_lot(lot):
+    status = "EXPIRED" if lot.is_expired() else "ok"
+    print(
+        f"Lot {lot.lot_code:<12} product {lot.product_id:<8} "
+        f"qty {lot.quantity:<6} expires {lot.expiry_date} ({status})"
+    )
 
-    product = manager.get_product_by_id(product_id)
-    if product is None:
-        print(f"Product with ID {product_id} not found.")
-        return
 
-    expiry_input = input("Enter expiry date (YYYY-MM-DD): ").strip()
+def read_expiry_date(prompt: str):
+    while True:
+        value = input(prompt).strip()
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD.")
 
-    try:
-        expiry_date = datetime.strptime(expiry_input, "%Y-%m-%d").date()
-    except ValueError:
-        print("Invalid date format. Use YYYY-MM-DD.")
-        return
 
-    perishable_product = PerishableProduct(
-        product.id,
-        product.name,
-        product.price,
-        product.stock_quantity,
-        expiry_date,
-    )
+def perishable_stock_flow(manager: StoreManager) -> None:
+    print("\n1. Receive a lot")
+    print("2. View a product's lots")
+    print("3. Lots expiring soon")
+
+    choice = read_int("Choose option: ", min_value=1)
 
-    if perishable_product.is_expired():
-        print(f"Product '{product.name}' is EXPIRED.")
+    if choice == 1:
+        product_id = read_int("Enter product ID: ", min_value=1)
+        lot_code = read_non_empty_string("Enter lot code: ")
+        quantity = read_int("Enter quantity: ", min_value=1)
+        expiry_date = read_expiry_date("Enter expiry date (YYYY-MM-DD): ")
+
+        try:
+            manager.receive_lot(product_id, lot_code, quantity, expiry_date)
+            print("Lot received successfully.")
+        except ValueError as e:
+            print(e)
+    elif choice == 2:
+        product_id = read_int("Enter product ID: ", min_value=1)
+        product = manager.get_product_by_id(product_id)
+        if product is None:
+            print(f"Product with ID {product_id} not found.")
+            return
+
+        lots = manager.get_product_lots(product_id)
+        if not lots:
+            print(f"No lots recorded for '{product.name}'.")
+            return
+
+        print(f"\nLots of '{product.name}', sold in this order:")
+        for lot in lots:
+            display_lot(lot)
+    elif choice == 3:
+        days = read_int("Expiring within how many days: ", min_value=0)
+        lots = manager.get_expiring_lots(days)
+        if not lots:
+            print("No lots expiring in that window.")
+            return
+
+        print(f"\nLots expiring within {days} days:")
+        for lot in lots:
+            display_lot(lot)
     else:
-        print(f"Product '{product.name}' is NOT expired.")
+        print("Invalid choice.")
 
 
-def view_all_sales_flow(manager: StoreManager) -> None:
-    sales = manager.get_all_sales()
+SALES_PAGE_SIZE = 20
 
-    if not sales:
-        print("No sales records found.")
-        return
 
+def page_through_sales(manager: StoreManager, product_id: int | None = None) -> int:
+    """
+    Display sales one page at a time.
+    Returns the number of sales shown.
+    """
+    shown = 0
+    after_sale_id = None
+
+    while True:
+        sales = manager.get_sales_page(
+            after_sale_id=after_sale_id,
+            limit=SALES_PAGE_SIZE,
+            product_id=product_id,
+        )
+
+        for sale in sales:
+            display_sale(sale=sale)
+
+        shown += len(sales)
+
+        if len(sales) < SALES_PAGE_SIZE:
+            return shown
+
+        more = input("Show more? (y/n): ").strip().lower()
+        if more != "y":
+            return shown
+
+        after_sale_id = sales[-1].id
+
+
+def view_all_sales_flow(manager: StoreManager) -> None:
     print("\n\n--- Sales Records ---")
-    for sale in sales:
-        display_sale(sale=sale)
+
+    if page_through_sales(manager) == 0:
+        print("No sales records found.")
 
 
 def view_sales_by_product_flow(manager: StoreManager) -> None:
@@ -282,22 +502,474 @@ def view_sales_by_product_flow(manager: StoreManager) -> None:
     if product is None:
         print(f"Product with ID {product_id} not found.")
         return
-    
-    sales = manager.get_sales_by_product(product_id)
 
-    if not sales:
+    print(f"\n\n--- Sales for Product ID {product_id} ---")
+
+    if page_through_sales(manager, product_id=product_id) == 0:
         print(f"No sales records found for product ID {product_id}.")
+
+
+def read_date(prompt: str):
+    while True:
+        value = input(prompt).strip()
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            print("Invalid date format. Use YYYY-MM-DD.")
+
+
+def display_sales_summary(summary) -> None:
+    product = f"Product {summary.product_id:<6} " if summary.product_id is not None else ""
+    print(
+        f"{summary.period:<17} {product}"
+        f"Units: {summary.units_sold:<8} Revenue: ₹{summary.revenue:.2f}"
+    )
+
+
+def sales_report_flow(manager: StoreManager) -> None:
+    print("\n1. Hourly")
+    print("2. Daily")
+    print("3. Weekly")
+
+    choice = read_int("Choose report period: ", min_value=1)
+    periods = {1: "hour", 2: "day", 3: "week"}
+
+    if choice not in periods:
+        print("Invalid choice.")
         return
 
-    print(f"\n\n--- Sales for Product ID {product_id} ---")
-    for sale in sales:
-        display_sale(sale=sale)
+    start_date = read_date("Start date (YYYY-MM-DD): ")
+    end_date = read_date("End date (YYYY-MM-DD, inclusive): ")
+
+    if end_date < start_date:
+        print("End date cannot be before start date.")
+        return
+
+    local_zone = ZoneInfo("Asia/Kolkata")
+    start = datetime.combine(start_date, datetime.min.time(), tzinfo=local_zone)
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo=local_zone)
+    utc_offset_minutes = int(start.utcoffset().total_seconds() // 60)
+
+    totals = manager.get_revenue_by_period(
+        periods[choice], start, end, utc_offset_minutes=utc_offset_minutes
+    )
+
+    if not totals:
+        print("No sales in this period.")
+        return
+
+    print(f"\n--- Revenue by {periods[choice]} ---")
+    for summary in totals:
+        display_sales_summary(summary)
+
+    print(
+        f"\nTotal units: {sum(s.units_sold for s in totals)}  "
+        f"Total revenue: ₹{sum(s.revenue for s in totals):.2f}"
+    )
+
+    breakdown = input("\nShow per-product breakdown? (y/n): ").strip().lower()
+    if breakdown != "y":
+        return
+
+    print(f"\n--- Units and revenue per product by {periods[choice]} ---")
+    for summary in manager.get_sales_summary(
+        periods[choice], start, end, utc_offset_minutes=utc_offset_minutes
+    ):
+        display_sales_summary(summary)
+
+
+# operations shown in the metrics report
+METRICS_REPORT_ROWS = 25
+
+
+def display_metrics() -> None:
+    histograms = metrics.histograms()
+    if not histograms:
+        print("No calls recorded yet.")
+        return
+
+    elapsed = time.time() - metrics.started
+    print(f"\n--- Calls by total time (last {elapsed:.0f}s) ---")
+    for row in format_report(histograms, limit=METRICS_REPORT_ROWS):
+        print(row)
+
+    slow_calls = metrics.slow_calls()
+    if not slow_calls:
+        return
+
+    print(f"\n--- Slowest database calls ({len(slow_calls)} logged) ---")
+    for call in slow_calls[:10]:
+        when = datetime.fromtimestamp(call.timestamp).strftime("%H:%M:%S")
+        print(
+            f"{when} {call.operation} {format_seconds(call.seconds)} "
+            f"({call.statement_count} statements)"
+        )
+        for statement in call.statements:
+            print(f"    {statement}")
+        if call.statement_count > len(call.statements):
+            print(f"    ... {call.statement_count - len(call.statements)} more")
+
+
+def metrics_flow(manager: StoreManager) -> None:
+    if not is_instrumentation_enabled():
+        print("\nInstrumentation is off. Start with --metrics to record from startup.")
+        turn_on = input("Turn it on now? (y/n): ").strip().lower()
+        if turn_on == "y":
+            enable_instrumentation()
+            print("Instrumentation is on; calls from now on are recorded.")
+        return
+
+    display_metrics()
+
+    print("\n1. Write metrics file (Prometheus text format)")
+    print("2. Reset metrics")
+    print("3. Turn instrumentation off")
+    print("0. Back")
+
+    choice = read_int("Choose option: ", min_value=0)
+
+    if choice == 1:
+        path = read_non_empty_string("File path: ")
+        try:
+            write_metrics(path)
+            print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
+    elif choice == 2:
+        metrics.reset()
+        print("Metrics reset.")
+    elif choice == 3:
+        disable_instrumentation()
+        print("Instrumentation is off.")
+    elif choice != 0:
+        print("Invalid choice.")
+
+
+# commands
+def rebuild_rollups_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    written = manager.rebuild_sales_rollups()
+    print(f"Rebuilt sales rollups: {written} product-day rows.")
+
+
+def check_rollups_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    mismatches = manager.check_sales_rollups()
+
+    if not mismatches:
+        print("Sales rollups are consistent with the sales log.")
+        return
+
+    print(f"{len(mismatches)} rollup rows disagree with the sales log:")
+    for expected, actual in mismatches:
+        key = expected or actual
+        print(
+            f"  {key.period} product {key.product_id}: "
+            f"log={expected and (expected.units_sold, round(expected.revenue, 2))} "
+            f"rollup={actual and (actual.units_sold, round(actual.revenue, 2))}"
+        )
+    print("Run 'rebuild-rollups' to recompute them.")
+
+
+def print_import_report(report: ImportReport, noun: str, rejects_path: str | None) -> None:
+    print(
+        f"Imported {report.imported} {noun}, rejected {report.rejected} "
+        f"in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s)."
+    )
+    for line_number, reason in report.samples:
+        print(f"  line {line_number}: {reason}")
+    if report.rejected > len(report.samples):
+        print(f"  ... and {report.rejected - len(report.samples)} more")
+    if report.rejected and rejects_path:
+        print(f"Rejected rows written to {rejects_path}")
+
+
+def import_products_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    try:
+        report = manager.import_products(
+            args.path,
+            file_format=args.format,
+            chunk_size=args.chunk_size,
+            rejects_path=args.rejects,
+        )
+    except (ValueError, OSError) as e:
+        print(f"Import failed: {e}")
+        return
+
+    print_import_report(report, "products", args.rejects)
+
+
+def import_sales_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    try:
+        report = manager.import_sales(
+            args.path,
+            file_format=args.format,
+            chunk_size=args.chunk_size,
+            rejects_path=args.rejects,
+        )
+    except (ValueError, OSError) as e:
+        print(f"Import failed: {e}")
+        return
+
+    print_import_report(report, "sales", args.rejects)
+
+
+def export_products_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    try:
+        written = manager.export_products(args.path, file_format=args.format)
+    except (ValueError, OSError) as e:
+        print(f"Export failed: {e}")
+        return
+
+    print(f"Exported {written} products to {args.path}")
+
+
+def serve_command(manager: StoreManager, args: argparse.Namespace) -> None:
+    server = StoreAPIServer(
+        (args.host, args.port), manager, log_requests=args.log_requests
+    )
+    host, port = server.server_address[:2]
+    print(f"Serving the HTTP API on http://{host}:{port} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+
+def chain_report_command(args: argparse.Namespace) -> None:
+    with StoreChain(args.directory, profile=args.db_profile, workers=args.workers) as chain:
+        store_ids = chain.store_ids()
+        if not store_ids:
+            print(f"No store databases found in {args.directory}")
+            return
+
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=args.days)
+
+        print(f"--- Revenue over the last {args.days} days, {len(store_ids)} stores ---")
+        totals = chain.get_revenue_by_store(start, end)
+        for store_id, (units_sold, revenue) in totals.items():
+            print(f"{store_id:<20} Units: {units_sold:<8} Revenue: ₹{revenue:.2f}")
+        print(
+            f"{'Chain':<20} Units: {sum(units for units, _ in totals.values()):<8} "
+            f"Revenue: ₹{sum(revenue for _, revenue in totals.values()):.2f}"
+        )
+
+        if args.product:
+            print("\n--- Chain-wide stock ---")
+            stock = chain.get_total_stock(args.product)
+            for name in args.product:
+                print(f"{name:<30} {stock.get(name, 0)}")
+
+
+COMMANDS = {
+    "rebuild-rollups": rebuild_rollups_command,
+    "check-rollups": check_rollups_command,
+    "import-products": import_products_command,
+    "import-sales": import_sales_command,
+    "export-products": export_products_command,
+    "serve": serve_command,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="smart_stock_management",
+        description="QuickCart Smart-Stock Retail Management System. "
+        "Runs the interactive menu when no command is given.",
+    )
+    parser.add_argument(
+        "--db",
+        help=f"database file, or {MEMORY_DB} for a throw-away in-memory database "
+        f"(default: ${ENV_DB_PATH} or smart_stock.db)",
+    )
+    parser.add_argument(
+        "--db-profile",
+        choices=STORAGE_PROFILES,
+        help=f"storage profile of the connections (default: ${ENV_DB_PROFILE} or durable)",
+    )
+    parser.add_argument(
+        "--load-mode",
+        choices=StoreManager.LOAD_MODES,
+        default="eager",
+        help="how the product catalogue is loaded at startup (default: eager)",
+    )
+    parser.add_argument(
+        "--product-store",
+        choices=StoreManager.PRODUCT_STORES,
+        default="dict",
+        help="in-memory catalogue layout (default: dict)",
+    )
+    parser.add_argument(
+        "--group-commit-ms",
+        type=float,
+        help="queue sales and commit them in groups; with relaxed durability "
+        "a group waits at most N milliseconds (default: commit every sale)",
+    )
+    parser.add_argument(
+        "--group-commit-rows",
+        type=int,
+        default=FLUSH_ROWS,
+        help=f"commit early once this many sale lines are queued (default: {FLUSH_ROWS})",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=DURABILITY_LEVELS,
+        default="strict",
+        help="strict: a sale returns once committed; relaxed: once queued, "
+        "so a crash can lose the last interval of sales (default: strict)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="record latency histograms of repository and service calls",
+    )
+    parser.add_argument(
+        "--slow-query-ms",
+        type=float,
+        default=SLOW_QUERY_MS,
+        help=f"log database calls slower than this with their SQL (default: {SLOW_QUERY_MS:g})",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="on exit, write the metrics to this file in Prometheus text format; "
+        "implies --metrics",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser(
+        "rebuild-rollups",
+        help="recompute the daily sales rollups from the sales log",
+    )
+    commands.add_parser(
+        "check-rollups",
+        help="compare the daily sales rollups with the sales log",
+    )
+
+    for name, help_text in (
+        ("import-products", "bulk-load products from a CSV or JSON Lines file"),
+        ("import-sales", "replay timestamped sales from an offline terminal"),
+    ):
+        import_parser = commands.add_parser(name, help=help_text)
+        import_parser.add_argument("path", help="file to import")
+        import_parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="file format (default: from the file extension)",
+        )
+        import_parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=StoreManager.IMPORT_CHUNK_SIZE,
+            help=f"rows per transaction (default: {StoreManager.IMPORT_CHUNK_SIZE})",
+        )
+        import_parser.add_argument(
+            "--rejects",
+            help="write rejected rows to this JSON Lines file",
+        )
+
+    export_parser = commands.add_parser(
+        "export-products",
+        help="write the product catalogue to a CSV or JSON Lines file",
+    )
+    export_parser.add_argument("path", help="file to write")
+    export_parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="file format (default: from the file extension)",
+    )
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="serve the HTTP/JSON API",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument(
+        "--log-requests",
+        action="store_true",
+        help="log every request to stderr",
+    )
+
+    chain_parser = commands.add_parser(
+        "chain-report",
+        help="revenue per store and chain-wide stock across a directory of store databases",
+    )
+    chain_parser.add_argument("directory", help="directory holding one <store_id>.db per store")
+    chain_parser.add_argument("--days", type=int, default=7, help="revenue window (default: 7)")
+    chain_parser.add_argument(
+        "--product",
+        nargs="*",
+        help="also show the chain-wide stock of these product names",
+    )
+    chain_parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker processes querying the stores (default: one per CPU)",
+    )
+
+    return parser
+
+
+def close_manager(manager: StoreManager, metrics_file: str | None = None) -> None:
+    """
+    Commit any sales still queued for group commit before exiting,
+    then write the metrics file if one was requested.
+    """
+    for basket, error in manager.close():
+        lines = ", ".join(
+            f"{quantity} x product {product_id}" for product_id, quantity, _ in basket[1]
+        )
+        print(f"Sale could not be saved ({lines}): {error}")
+
+    if metrics_file:
+        try:
+            write_metrics(metrics_file)
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
 
 
 # main menu
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+
+    if args.metrics or args.metrics_file:
+        enable_instrumentation(args.slow_query_ms)
+
+    # reads the store databases in worker processes; opens no database here
+    if args.command == "chain-report":
+        chain_report_command(args)
+        return
+
+    try:
+        use_database(DatabaseConfig.from_env(db_path=args.db, profile=args.db_profile))
+    except (ValueError, RuntimeError) as e:
+        print(f"Cannot open the database: {e}")
+        return
+
     initialize_database()
-    manager = StoreManager()
+
+    sales_writer = None
+    if args.group_commit_ms is not None:
+        sales_writer = SalesWriter(
+            flush_interval=args.group_commit_ms / 1_000,
+            max_rows=args.group_commit_rows,
+            durability=args.durability,
+        )
+
+    manager = StoreManager(
+        product_store=args.product_store,
+        load_mode=args.load_mode,
+        sales_writer=sales_writer,
+    )
+
+    if args.command is not None:
+        try:
+            COMMANDS[args.command](manager, args)
+        finally:
+            close_manager(manager, args.metrics_file)
+        return
 
     try:
         while True:
@@ -309,14 +981,21 @@ def main() -> None:
             print("5. Process sale")
             print("6. View low-stock products")
             print("7. View all products")
-            print("8. Check product expiry")
+            print("8. Perishable stock")
             print("9. View All Sales")
             print("10. View Sales By Product")
+            print("11. Process basket")
+            print("12. Sales report")
+            print("13. Search products")
+            print("14. Performance metrics")
             print("0. Exit")
 
             choice = read_int("Enter your choice: ")
 
             try:
+                # pick up changes made meanwhile by other tills or tools
+                manager.refresh()
+
                 if choice == 1:
                     add_product_flow(manager)
                 elif choice == 2:
@@ -332,11 +1011,19 @@ def main() -> None:
                 elif choice == 7:
                     list_products_sorted(manager)
                 elif choice == 8:
-                    check_expiry_flow(manager)
+                    perishable_stock_flow(manager)
                 elif choice == 9:
                     view_all_sales_flow(manager)
                 elif choice == 10:
                     view_sales_by_product_flow(manager)
+                elif choice == 11:
+                    process_basket_flow(manager)
+                elif choice == 12:
+                    sales_report_flow(manager)
+                elif choice == 13:
+                    search_products_flow(manager)
+                elif choice == 14:
+                    metrics_flow(manager)
                 elif choice == 0:
                     print("\nGoodbye!")
                     break
@@ -348,5 +1035,9 @@ def main() -> None:
 
     except KeyboardInterrupt:
         print("\nCtrl+c detected, Closing Gracefully!")
+        close_manager(manager, args.metrics_file)
         print("\nGoodbye!")
+        return
+
+    close_manager(manager, args.metrics_file)
 
@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import Callable, Optional
 
 from smart_stock_management.utils.stock_exceptions import InsufficientStockError
 
@@ -9,17 +9,53 @@ class Product:
     Represents a product in the inventory.
     """
 
+    __slots__ = (
+        "id",
+        "name",
+        "_price",
+        "_stock_quantity",
+        "_low_stock_threshold",
+        "_change_listener",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         product_id: Optional[int],
         name: str,
         price: float,
         stock_quantity: int,
+        low_stock_threshold: Optional[int] = None,
     ):
+        self._change_listener: Optional[Callable[["Product"], None]] = None
         self.id = product_id
         self.name = name
         self.price = price
         self._stock_quantity = stock_quantity
+        self.low_stock_threshold = low_stock_threshold
+
+    @classmethod
+    def from_storage(
+        cls,
+        product_id: int,
+        name: str,
+        price: float,
+        stock_quantity: int,
+        low_stock_threshold: Optional[int] = None,
+    ) -> "Product":
+        """
+        Build a product from values read back from our own database.
+        They already passed validation (and the table's CHECK constraints)
+        on the way in, so the property setters are skipped.
+        """
+        product = cls.__new__(cls)
+        product._change_listener = None
+        product.id = product_id
+        product.name = name
+        product._price = price
+        product._stock_quantity = stock_quantity
+        product._low_stock_threshold = low_stock_threshold
+        return product
 
     # price validation
     @property
@@ -33,11 +69,36 @@ class Product:
         if value <= 0:
             raise ValueError("Price must be greater than 0")
         self._price = float(value)
+        self._notify_change()
+
+    # low-stock threshold validation
+    @property
+    def low_stock_threshold(self) -> Optional[int]:
+        return self._low_stock_threshold
+
+    @low_stock_threshold.setter
+    def low_stock_threshold(self, value: Optional[int]) -> None:
+        if value is not None and (not isinstance(value, int) or value < 0):
+            raise ValueError("Low-stock threshold must be a non-negative integer")
+        self._low_stock_threshold = value
+        self._notify_change()
 
     # stock encapsulation
     @property
     def stock_quantity(self) -> int:
         return self._stock_quantity
+
+    def set_change_listener(
+        self, listener: Optional[Callable[["Product"], None]]
+    ) -> None:
+        """
+        Register a callback run after every price, stock or threshold change.
+        """
+        self._change_listener = listener
+
+    def _notify_change(self) -> None:
+        if self._change_listener is not None:
+            self._change_listener(self)
     
     def set_stock(self, quantity: int) -> None:
         if not isinstance(quantity, int):
@@ -45,6 +106,25 @@ class Product:
         if quantity < 0:
             raise ValueError("Stock quantity cannot be negative")
         self._stock_quantity = quantity
+        self._notify_change()
+
+
+    def refresh_from_storage(
+        self,
+        name: str,
+        price: float,
+        stock_quantity: int,
+        low_stock_threshold: Optional[int],
+    ) -> None:
+        """
+        Overwrite every field with values read back from the database,
+        notifying the listener once.
+        """
+        self.name = name
+        self._price = price
+        self._stock_quantity = stock_quantity
+        self._low_stock_threshold = low_stock_threshold
+        self._notify_change()
 
 
     def reduce_stock(self, quantity: int) -> None:
@@ -63,6 +143,7 @@ class Product:
             )
 
         self._stock_quantity -= quantity
+        self._notify_change()
 
 
     def increase_stock(self, quantity: int) -> None:
@@ -76,6 +157,7 @@ class Product:
             raise ValueError("Quantity must be greater than 0")
 
         self._stock_quantity += quantity
+        self._notify_change()
 
 
     def __repr__(self) -> str:
@@ -90,6 +172,8 @@ class PerishableProduct(Product):
     Represents a perishable product with an expiry date.
     """
 
+    __slots__ = ("expiry_date",)
+
     def __init__(
         self,
         product_id: Optional[int],
@@ -7,12 +7,15 @@ class Sale:
     Represents a single sale transaction.
     """
 
+    __slots__ = ("id", "product_id", "quantity_sold", "timestamp", "unit_price")
+
     def __init__(
         self,
         sale_id: Optional[int],
         product_id: int,
         quantity_sold: int,
         timestamp: datetime,
+        unit_price: Optional[float] = None,
     ):
         if not isinstance(product_id, int) or product_id <= 0:
             raise ValueError("product_id must be a positive integer")
@@ -27,9 +30,57 @@ class Sale:
         self.product_id = product_id
         self.quantity_sold = quantity_sold
         self.timestamp = timestamp
+        self.unit_price = unit_price
+
+    @classmethod
+    def from_storage(
+        cls,
+        sale_id: int,
+        product_id: int,
+        quantity_sold: int,
+        timestamp: datetime,
+        unit_price: Optional[float] = None,
+    ) -> "Sale":
+        """
+        Build a sale from values read back from SalesLog, skipping validation.
+        """
+        sale = cls.__new__(cls)
+        sale.id = sale_id
+        sale.product_id = product_id
+        sale.quantity_sold = quantity_sold
+        sale.timestamp = timestamp
+        sale.unit_price = unit_price
+        return sale
 
     def __repr__(self) -> str:
         return (
             f"Sale(id={self.id}, product_id={self.product_id}, "
             f"quantity_sold={self.quantity_sold}, timestamp={self.timestamp})"
         )
+
+
+class SalesSummary:
+    """
+    Units sold and revenue for one time period,
+    optionally for a single product.
+    """
+
+    __slots__ = ("period", "product_id", "units_sold", "revenue")
+
+    def __init__(
+        self,
+        period: str,
+        product_id: Optional[int],
+        units_sold: int,
+        revenue: float,
+    ):
+        self.period = period
+        self.product_id = product_id
+        self.units_sold = units_sold
+        self.revenue = revenue
+
+    def __repr__(self) -> str:
+        return (
+            f"SalesSummary(period='{self.period}', product_id={self.product_id}, "
+            f"units_sold={self.units_sold}, revenue={self.revenue})"
+        )
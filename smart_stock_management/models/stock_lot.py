@@ -0,0 +1,70 @@
+from datetime import date
+from typing import Optional
+
+
+class StockLot:
+    """
+    Represents a quantity of one product received together,
+    sharing an expiry date.
+    """
+
+    __slots__ = ("id", "product_id", "lot_code", "quantity", "expiry_date")
+
+    def __init__(
+        self,
+        lot_id: Optional[int],
+        product_id: int,
+        lot_code: str,
+        quantity: int,
+        expiry_date: date,
+    ):
+        if not isinstance(product_id, int) or product_id <= 0:
+            raise ValueError("product_id must be a positive integer")
+
+        if not isinstance(lot_code, str) or not lot_code.strip():
+            raise ValueError("Lot code must be a non-empty string")
+
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise ValueError("Lot quantity must be a positive integer")
+
+        if not isinstance(expiry_date, date):
+            raise ValueError("expiry_date must be a date object")
+
+        self.id = lot_id
+        self.product_id = product_id
+        self.lot_code = lot_code.strip()
+        self.quantity = quantity
+        self.expiry_date = expiry_date
+
+    @classmethod
+    def from_storage(
+        cls,
+        lot_id: int,
+        product_id: int,
+        lot_code: str,
+        quantity: int,
+        expiry_date: date,
+    ) -> "StockLot":
+        """
+        Build a lot from values read back from StockLots, skipping validation.
+        """
+        lot = cls.__new__(cls)
+        lot.id = lot_id
+        lot.product_id = product_id
+        lot.lot_code = lot_code
+        lot.quantity = quantity
+        lot.expiry_date = expiry_date
+        return lot
+
+    def is_expired(self, today: Optional[date] = None) -> bool:
+        """
+        Check if the lot is past its expiry date.
+        """
+        return self.expiry_date < (today or date.today())
+
+    def __repr__(self) -> str:
+        return (
+            f"StockLot(id={self.id}, product_id={self.product_id}, "
+            f"lot_code='{self.lot_code}', quantity={self.quantity}, "
+            f"expiry_date={self.expiry_date})"
+        )
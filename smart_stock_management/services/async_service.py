@@ -0,0 +1,260 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+
+from smart_stock_management.models.product import Product
+from smart_stock_management.models.sales import Sale, SalesSummary
+from smart_stock_management.services.store_manager import StoreManager
+
+# largest number of baskets committed together by the writer task
+MAX_BATCH = 256
+
+# threads serving read queries; one more connection goes to the writer
+READ_WORKERS = 4
+
+
+class AsyncStoreService:
+    """
+    asyncio front end letting many terminals share one StoreManager.
+
+    Sales are queued to a single writer task. Whatever has queued up while
+    the previous commit was in flight is committed next as one transaction,
+    so the commit cost is shared as load grows, while a lone sale is never
+    held back waiting for company.
+
+    Reads run on a thread pool. Reads of the in-memory catalogue take the
+    same lock as the writer; reads served by the database (sales history
+    and reports) do not, and run alongside commits.
+    """
+
+    def __init__(
+        self,
+        manager: StoreManager,
+        max_batch: int = MAX_BATCH,
+        read_workers: int = READ_WORKERS,
+    ) -> None:
+        if not isinstance(max_batch, int) or max_batch <= 0:
+            raise ValueError("max_batch must be a positive integer")
+
+        self.manager = manager
+        self.max_batch = max_batch
+        self.read_workers = read_workers
+        # guards the in-memory catalogue, which StoreManager does not lock
+        self._state_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        # set once stop() has begun; no sale may be queued after its sentinel
+        self._stopping = False
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        # commits made by the writer task so far
+        self.batches = 0
+
+
+    async def start(self) -> None:
+        """
+        Start the writer task and the thread pools.
+        """
+        if self._writer_task is not None:
+            raise RuntimeError("Service is already running")
+
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="store-writer")
+        self._readers = ThreadPoolExecutor(
+            self.read_workers, thread_name_prefix="store-reader"
+        )
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+
+    async def stop(self) -> None:
+        """
+        Commit every sale already queued, then stop the writer and the pools.
+        """
+        if self._writer_task is None or self._stopping:
+            return
+
+        self._stopping = True
+        await self._queue.put(None)
+        await self._writer_task
+
+        # nothing should be left behind the sentinel; never leave a caller hanging
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("Service is not running"))
+
+        self._writer_task = None
+        self._writer.shutdown()
+        self._readers.shutdown()
+
+
+    async def __aenter__(self) -> "AsyncStoreService":
+        await self.start()
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+    # writes
+    async def process_sale(self, product_id: int, quantity: int) -> None:
+        """
+        Sell one product. Resolves once the sale is committed.
+        """
+        await self.process_basket([(product_id, quantity)])
+
+
+    async def process_basket(self, lines: List[Tuple[int, int]]) -> None:
+        """
+        Sell a basket as a unit. Resolves once it is committed and raises
+        what StoreManager.process_basket would have raised for it.
+        """
+        if self._writer_task is None or self._stopping:
+            raise RuntimeError("Service is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(lines), future))
+        await future
+
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            batch = [(lines, future) for lines, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                results = await loop.run_in_executor(
+                    self._writer, self._commit_batch, [lines for lines, _ in batch]
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+
+            self.batches += 1
+
+            for (_, future), error in zip(batch, results):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+
+    def _commit_batch(
+        self, baskets: List[List[Tuple[int, int]]]
+    ) -> List[Optional[Exception]]:
+        with self._state_lock:
+            return self.manager.process_sales(baskets)
+
+
+    # reads
+    async def _read(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a read of the in-memory catalogue on the read pool.
+        """
+        def locked() -> Any:
+            with self._state_lock:
+                return method(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._readers, locked)
+
+
+    async def _query(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a read served by the database on the read pool.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, partial(method, *args, **kwargs)
+        )
+
+
+    async def get_product_by_id(self, product_id: int) -> Optional[Product]:
+        """
+        Look up a cached product.
+        """
+        return await self._read(self.manager.get_product_by_id, product_id)
+
+
+    async def get_low_stock_products(self) -> List[Product]:
+        """
+        Return products below their low-stock threshold.
+        """
+        return await self._read(self.manager.get_low_stock_products)
+
+
+    async def get_sorted_products_by_price(
+        self, offset: int = 0, limit: Optional[int] = None, descending: bool = False
+    ) -> List[Product]:
+        """
+        Return one page of products sorted by price.
+        """
+        return await self._read(
+            self.manager.get_sorted_products_by_price, offset, limit, descending
+        )
+
+
+    async def get_sorted_products_by_stock(
+        self, offset: int = 0, limit: Optional[int] = None, descending: bool = False
+    ) -> List[Product]:
+        """
+        Return one page of products sorted by stock.
+        """
+        return await self._read(
+            self.manager.get_sorted_products_by_stock, offset, limit, descending
+        )
+
+
+    async def refresh(self) -> int:
+        """
+        Pull catalogue changes made by other processes.
+        """
+        return await self._read(self.manager.refresh)
+
+
+    async def get_sales_page(
+        self,
+        after_sale_id: Optional[int] = None,
+        limit: int = 50,
+        product_id: Optional[int] = None,
+    ) -> List[Sale]:
+        """
+        Return one page of sales records, newest first.
+        """
+        return await self._query(
+            self.manager.get_sales_page, after_sale_id, limit, product_id
+        )
+
+
+    async def get_sales_summary(
+        self, period: str, start: datetime, end: datetime, **options: Any
+    ) -> List[SalesSummary]:
+        """
+        Return units sold and revenue per period.
+        """
+        return await self._query(
+            self.manager.get_sales_summary, period, start, end, **options
+        )
@@ -0,0 +1,198 @@
+import csv
+import json
+import math
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from smart_stock_management.models.product import Product
+
+# supported file formats, picked from the extension when not given
+FORMATS = ("csv", "jsonl")
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+IMPORT_FIELDS = ("name", "price", "stock_quantity", "low_stock_threshold")
+EXPORT_FIELDS = ("id",) + IMPORT_FIELDS
+
+# rejected rows kept on the report itself; the rest only go to the rejects file
+REJECT_SAMPLES = 20
+
+
+class ImportReport:
+    """
+    Outcome of a bulk import.
+    """
+
+    __slots__ = ("imported", "rejected", "samples", "elapsed")
+
+    def __init__(self) -> None:
+        self.imported = 0
+        self.rejected = 0
+        self.samples: List[Tuple[int, str]] = []
+        self.elapsed = 0.0
+
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Input rows handled per second, accepted or rejected.
+        """
+        rows = self.imported + self.rejected
+        return rows / self.elapsed if self.elapsed else 0.0
+
+
+    def reject(self, line_number: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.samples) < REJECT_SAMPLES:
+            self.samples.append((line_number, reason))
+
+
+    def __repr__(self) -> str:
+        return f"ImportReport(imported={self.imported}, rejected={self.rejected})"
+
+
+def detect_format(path: Union[str, Path], file_format: Optional[str] = None) -> str:
+    """
+    Return the explicit format, or the one implied by the file extension.
+    """
+    if file_format is None:
+        file_format = EXTENSIONS.get(Path(path).suffix.lower())
+        if file_format is None:
+            raise ValueError(
+                f"Cannot tell the format of '{path}'. Use one of: {', '.join(FORMATS)}"
+            )
+
+    if file_format not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+
+    return file_format
+
+
+def read_records(
+    path: Union[str, Path], file_format: str
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Stream (line_number, record, error) triples from a CSV or JSON Lines file.
+    Exactly one of record and error is set.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as source:
+        if file_format == "csv":
+            reader = csv.DictReader(source)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Each line must be a JSON object"
+                continue
+            yield line_number, record, None
+
+
+def parse_product(record: Dict[str, Any]) -> Tuple[str, float, int, Optional[int]]:
+    """
+    Convert a raw record into (name, price, stock_quantity, low_stock_threshold),
+    applying the same rules as Product and StoreManager.add_product.
+    Raises ValueError for invalid records.
+    """
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Product name must be a non-empty string")
+
+    price = to_number(record.get("price"), float, "Price")
+    stock_quantity = to_number(record.get("stock_quantity"), int, "Stock quantity")
+
+    low_stock_threshold = record.get("low_stock_threshold")
+    if low_stock_threshold in (None, ""):
+        low_stock_threshold = None
+    else:
+        low_stock_threshold = to_number(low_stock_threshold, int, "Low-stock threshold")
+
+    if stock_quantity < 0:
+        raise ValueError("Stock quantity must be a non-negative integer")
+
+    product = Product(None, name, price, stock_quantity, low_stock_threshold)
+
+    return product.name, product.price, product.stock_quantity, product.low_stock_threshold
+
+
+def to_number(value: Any, number_type: type, label: str) -> Union[int, float]:
+    """
+    Coerce a CSV string or JSON value to int or float.
+    Booleans, blanks and non-finite values are rejected.
+    """
+    if isinstance(value, bool) or value is None or value == "":
+        raise ValueError(f"{label} is required and must be numeric")
+
+    if isinstance(value, str):
+        try:
+            value = number_type(value.strip())
+        except ValueError:
+            raise ValueError(
+                f"{label} must be {'an integer' if number_type is int else 'numeric'}"
+            )
+
+    if number_type is int and not isinstance(value, int):
+        raise ValueError(f"{label} must be an integer")
+
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{label} must be numeric")
+
+    return value
+
+
+def open_rejects(path: Union[str, Path]) -> IO[str]:
+    """
+    Open a JSON Lines file for rejected rows.
+    """
+    return open(path, "w", encoding="utf-8")
+
+
+def write_reject(
+    rejects: IO[str],
+    line_number: int,
+    reason: str,
+    record: Optional[Dict[str, Any]],
+) -> None:
+    rejects.write(
+        json.dumps({"line": line_number, "error": reason, "record": record}) + "\n"
+    )
+
+
+def write_products(
+    path: Union[str, Path], file_format: str, products: Iterable[Product]
+) -> int:
+    """
+    Stream products to a CSV or JSON Lines file.
+    Returns the number of products written.
+    """
+    written = 0
+
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        if file_format == "csv":
+            writer = csv.writer(target)
+            writer.writerow(EXPORT_FIELDS)
+
+        for product in products:
+            values = (
+                product.id,
+                product.name,
+                product.price,
+                product.stock_quantity,
+                product.low_stock_threshold,
+            )
+
+            if file_format == "csv":
+                writer.writerow("" if value is None else value for value in values)
+            else:
+                target.write(json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n")
+
+            written += 1
+
+    return written
@@ -0,0 +1,358 @@
+import asyncio
+import json
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from smart_stock_management.models.product import Product
+from smart_stock_management.models.sales import Sale
+from smart_stock_management.services.async_service import AsyncStoreService
+from smart_stock_management.services.store_manager import StoreManager
+from smart_stock_management.utils.stock_exceptions import InsufficientStockError
+
+# page sizes for list endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# largest request body accepted, in bytes
+MAX_BODY_SIZE = 1_048_576
+
+
+class APIError(Exception):
+    """
+    Error answered with the given HTTP status and a JSON message.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def product_to_json(product: Product) -> Dict[str, Any]:
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": product.price,
+        "stock_quantity": product.stock_quantity,
+        "low_stock_threshold": product.low_stock_threshold,
+    }
+
+
+def sale_to_json(sale: Sale) -> Dict[str, Any]:
+    return {
+        "sale_id": sale.id,
+        "product_id": sale.product_id,
+        "quantity_sold": sale.quantity_sold,
+        "unit_price": sale.unit_price,
+        "timestamp": sale.timestamp.isoformat(sep=" "),
+    }
+
+
+class StoreAPIServer(ThreadingHTTPServer):
+    """
+    HTTP/JSON API over a StoreManager.
+
+    Each client connection gets a thread and is kept alive between requests.
+    Calls are handed to an AsyncStoreService running on a background event
+    loop, so sales from all connections are group-committed and the
+    database connections stay open in the shared pool.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        manager: StoreManager,
+        log_requests: bool = False,
+    ) -> None:
+        super().__init__(address, StoreRequestHandler)
+        self.log_requests = log_requests
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self.loop.run_forever, name="store-api-loop", daemon=True
+        )
+        self._loop_thread.start()
+        self.service = AsyncStoreService(manager)
+        self.call(self.service.start())
+
+
+    def call(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        """
+        Run a service coroutine on the event loop and wait for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+
+    def server_close(self) -> None:
+        """
+        Stop accepting requests, commit queued sales and stop the loop.
+        """
+        super().server_close()
+        self.call(self.service.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join()
+        self.loop.close()
+
+
+class StoreRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the service and writes JSON responses.
+    """
+
+    # keep-alive needs HTTP/1.1 and a Content-Length on every response
+    protocol_version = "HTTP/1.1"
+
+    # send headers and body in one segment, flushed after each request;
+    # separate small writes stall ~40 ms on delayed ACKs
+    wbufsize = 65536
+    disable_nagle_algorithm = True
+    server: StoreAPIServer
+
+    ROUTES: List[Tuple[str, "re.Pattern[str]", str]] = [
+        ("GET", re.compile(r"/products/low-stock"), "low_stock_products"),
+        ("GET", re.compile(r"/products/(\d+)"), "get_product"),
+        ("GET", re.compile(r"/products"), "list_products"),
+        ("GET", re.compile(r"/sales"), "list_sales"),
+        ("POST", re.compile(r"/sales"), "create_sale"),
+        ("POST", re.compile(r"/baskets"), "create_basket"),
+    ]
+
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.log_requests:
+            super().log_message(format, *args)
+
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        self.query = {
+            name: values[-1] for name, values in parse_qs(url.query).items()
+        }
+
+        try:
+            # read the body up front so an unknown route cannot leave it
+            # unread on a kept-alive connection
+            self.body = self._read_body() if method == "POST" else b""
+            handler, args = self._route(method, url.path.rstrip("/") or "/")
+            status, body = handler(*args)
+        except APIError as e:
+            status, body = e.status, {"error": str(e)}
+        except InsufficientStockError as e:
+            status, body = HTTPStatus.CONFLICT, {"error": str(e)}
+        except ValueError as e:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            self.log_error("Unhandled error on %s %s: %r", method, self.path, e)
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"}
+
+        self._send_json(status, body)
+
+
+    def _route(self, method: str, path: str) -> Tuple[Callable[..., Any], Tuple[str, ...]]:
+        path_matched = False
+
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method == method:
+                return getattr(self, name), match.groups()
+
+        if path_matched:
+            raise APIError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed here")
+        raise APIError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.close_connection = True
+            raise APIError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+
+        if length < 0:
+            # rfile.read(-1) would block until the client closes
+            self.close_connection = True
+            raise APIError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            raise APIError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+
+        return self.rfile.read(length)
+
+
+    def _read_json(self) -> Any:
+        try:
+            return json.loads(self.body or b"null")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Request body must be JSON")
+
+
+    @staticmethod
+    def _require_int(value: Any, name: str) -> int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise APIError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer")
+        return value
+
+
+    def _query_int(self, name: str, default: Optional[int]) -> Optional[int]:
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer")
+
+
+    def _page_bounds(self) -> Tuple[int, int]:
+        offset = self._query_int("offset", 0)
+        limit = self._query_int("limit", DEFAULT_PAGE_SIZE)
+
+        if offset < 0:
+            raise APIError(HTTPStatus.BAD_REQUEST, "'offset' must be >= 0")
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            raise APIError(
+                HTTPStatus.BAD_REQUEST, f"'limit' must be between 1 and {MAX_PAGE_SIZE}"
+            )
+
+        return offset, limit
+
+
+    # products
+    def get_product(self, product_id: str) -> Tuple[HTTPStatus, Any]:
+        product = self.server.call(self.server.service.get_product_by_id(int(product_id)))
+
+        if product is None:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Product with ID {product_id} not found")
+
+        return HTTPStatus.OK, product_to_json(product)
+
+
+    def list_products(self) -> Tuple[HTTPStatus, Any]:
+        """
+        GET /products?sort=price|stock&order=asc|desc&offset=0&limit=50
+        """
+        offset, limit = self._page_bounds()
+        sort = self.query.get("sort", "price")
+        order = self.query.get("order", "asc")
+
+        if sort not in ("price", "stock"):
+            raise APIError(HTTPStatus.BAD_REQUEST, "'sort' must be 'price' or 'stock'")
+        if order not in ("asc", "desc"):
+            raise APIError(HTTPStatus.BAD_REQUEST, "'order' must be 'asc' or 'desc'")
+
+        service = self.server.service
+        listing = (
+            service.get_sorted_products_by_price
+            if sort == "price"
+            else service.get_sorted_products_by_stock
+        )
+        # one extra row tells whether another page follows
+        products = self.server.call(listing(offset, limit + 1, order == "desc"))
+
+        return HTTPStatus.OK, {
+            "items": [product_to_json(product) for product in products[:limit]],
+            "next_offset": offset + limit if len(products) > limit else None,
+        }
+
+
+    def low_stock_products(self) -> Tuple[HTTPStatus, Any]:
+        """
+        GET /products/low-stock?offset=0&limit=50
+        """
+        offset, limit = self._page_bounds()
+        products = self.server.call(self.server.service.get_low_stock_products())
+
+        return HTTPStatus.OK, {
+            "items": [
+                product_to_json(product) for product in products[offset:offset + limit]
+            ],
+            "next_offset": offset + limit if len(products) > offset + limit else None,
+        }
+
+
+    # sales
+    def list_sales(self) -> Tuple[HTTPStatus, Any]:
+        """
+        GET /sales?after=<sale_id>&limit=50&product_id=<id>, newest first.
+        """
+        _, limit = self._page_bounds()
+        sales = self.server.call(
+            self.server.service.get_sales_page(
+                self._query_int("after", None),
+                limit,
+                self._query_int("product_id", None),
+            )
+        )
+
+        return HTTPStatus.OK, {
+            "items": [sale_to_json(sale) for sale in sales],
+            "next_after": sales[-1].id if len(sales) == limit else None,
+        }
+
+
+    def create_sale(self) -> Tuple[HTTPStatus, Any]:
+        """
+        POST /sales {"product_id": 1, "quantity": 2}
+        """
+        body = self._read_json()
+        if not isinstance(body, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+
+        self.server.call(
+            self.server.service.process_sale(
+                self._require_int(body.get("product_id"), "product_id"),
+                self._require_int(body.get("quantity"), "quantity"),
+            )
+        )
+
+        return HTTPStatus.CREATED, {"status": "sold"}
+
+
+    def create_basket(self) -> Tuple[HTTPStatus, Any]:
+        """
+        POST /baskets {"lines": [{"product_id": 1, "quantity": 2}, ...]}
+        """
+        body = self._read_json()
+        lines = body.get("lines") if isinstance(body, dict) else None
+
+        if not isinstance(lines, list) or not all(isinstance(line, dict) for line in lines):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected {\"lines\": [...]}")
+
+        self.server.call(
+            self.server.service.process_basket(
+                [
+                    (
+                        self._require_int(line.get("product_id"), "product_id"),
+                        self._require_int(line.get("quantity"), "quantity"),
+                    )
+                    for line in lines
+                ]
+            )
+        )
+
+        return HTTPStatus.CREATED, {"status": "sold", "lines": len(lines)}
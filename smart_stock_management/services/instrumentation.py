@@ -0,0 +1,166 @@
+import inspect
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, List, Tuple, Union
+
+from smart_stock_management.database import connection as db_connection
+from smart_stock_management.database.connection import ConnectionPool
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.database.stock_lot_repository import StockLotRepository
+from smart_stock_management.services.store_manager import StoreManager
+from smart_stock_management.utils.metrics import MetricsRegistry
+
+# repository calls slower than this go to the slow-query log
+SLOW_QUERY_MS = 100.0
+
+# statements kept per slow call, and characters kept per statement
+SLOW_QUERY_STATEMENTS = 5
+STATEMENT_CHARS = 500
+
+# classes whose public methods are timed, with their layer label
+INSTRUMENTED_CLASSES = (
+    (ProductRepository, "repository"),
+    (SalesRepository, "repository"),
+    (StockLotRepository, "repository"),
+    (StoreManager, "service"),
+)
+
+# trivial methods called inside loops; timing them would only add noise
+UNTIMED_METHODS = {"is_low_stock"}
+
+metrics = MetricsRegistry()
+
+_lock = threading.Lock()
+_local = threading.local()
+_patched: List[Tuple[Any, str, Any]] = []
+_slow_seconds = SLOW_QUERY_MS / 1_000
+
+
+def is_instrumentation_enabled() -> bool:
+    return bool(_patched)
+
+
+def enable_instrumentation(slow_query_ms: float = SLOW_QUERY_MS) -> None:
+    """
+    Start timing repository, connection and StoreManager calls.
+
+    The methods are wrapped only while instrumentation is on, so a process
+    that never enables it runs the original code. Calling again while
+    enabled just changes the slow-query threshold.
+    """
+    global _slow_seconds
+
+    if slow_query_ms < 0:
+        raise ValueError("slow_query_ms cannot be negative")
+
+    with _lock:
+        _slow_seconds = slow_query_ms / 1_000
+        if _patched:
+            return
+
+        for cls, layer in INSTRUMENTED_CLASSES:
+            _instrument_class(cls, layer)
+
+        _patch(ConnectionPool, "acquire", _timed(
+            ConnectionPool.acquire, "connection", "ConnectionPool.acquire"
+        ))
+        _patch(db_connection, "get_connection", _timed(
+            db_connection.get_connection, "connection", "get_connection"
+        ))
+        db_connection.set_trace_callback(_trace_statement)
+
+
+def disable_instrumentation() -> None:
+    """
+    Restore the original methods. Collected metrics are kept.
+    """
+    with _lock:
+        db_connection.set_trace_callback(None)
+        while _patched:
+            owner, name, original = _patched.pop()
+            setattr(owner, name, original)
+
+
+def write_metrics(path: Union[str, Path]) -> None:
+    """
+    Write the metrics in Prometheus text format, replacing the file
+    atomically so a collector never reads a partial file.
+    """
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    with open(temporary, "w", encoding="utf-8", newline="\n") as target:
+        target.write(metrics.to_prometheus())
+
+    os.replace(temporary, path)
+
+
+def _instrument_class(cls: type, layer: str) -> None:
+    for name, attribute in list(vars(cls).items()):
+        if (name.startswith("_") and name != "__init__") or name in UNTIMED_METHODS:
+            continue
+
+        if isinstance(attribute, staticmethod):
+            function, rewrap = attribute.__func__, staticmethod
+        elif inspect.isfunction(attribute):
+            function, rewrap = attribute, None
+        else:
+            continue
+
+        # a generator's call returns at once; its work happens in the caller's loop
+        if inspect.isgeneratorfunction(function):
+            continue
+
+        timed = _timed(function, layer, f"{cls.__name__}.{name}")
+        _patch(cls, name, rewrap(timed) if rewrap else timed)
+
+
+def _patch(owner: Any, name: str, replacement: Any) -> None:
+    _patched.append((owner, name, vars(owner)[name]))
+    setattr(owner, name, replacement)
+
+
+def _timed(function: Callable[..., Any], layer: str, operation: str) -> Callable[..., Any]:
+    observe = metrics.observe
+    collect_sql = layer == "repository"
+
+    @wraps(function)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        if collect_sql:
+            # [statements, statement count] for this call; nested calls push their own
+            frame: List[Any] = [[], 0]
+            stack = getattr(_local, "frames", None)
+            if stack is None:
+                stack = _local.frames = []
+            stack.append(frame)
+
+        failed = True
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            observe(layer, operation, elapsed, failed)
+            if collect_sql:
+                stack.pop()
+                if elapsed >= _slow_seconds:
+                    metrics.record_slow_call(operation, elapsed, frame[0], frame[1])
+
+    return timed
+
+
+def _trace_statement(statement: str) -> None:
+    stack = getattr(_local, "frames", None)
+    if not stack:
+        return
+
+    frame = stack[-1]
+    frame[1] += 1
+    if len(frame[0]) < SLOW_QUERY_STATEMENTS:
+        frame[0].append(" ".join(statement[:STATEMENT_CHARS].split()))
@@ -0,0 +1,235 @@
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import repeat
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from weakref import WeakValueDictionary
+
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.models.product import Product
+
+# marks "no own threshold" in the threshold column
+NO_THRESHOLD = -1
+
+# products kept in memory by the lazy catalogue
+LAZY_CACHE_SIZE = 10_000
+
+
+class ColumnarProductStore(MutableMapping):
+    """
+    Product catalogue held in parallel arrays indexed by product id.
+
+    Prices, stock and thresholds live in typed arrays (8 bytes per value)
+    instead of one Python object per product. Product objects are built
+    on access and shared while anything still references them; changes
+    made through them are written back with `store[product.id] = product`.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[int, str, float, int, Optional[int]]] = (),
+        listener: Optional[Callable[[Product], None]] = None,
+    ) -> None:
+        self._names: List[Optional[str]] = []
+        self._prices = array("d")
+        self._stock = array("q")
+        self._thresholds = array("q")
+        self._present = bytearray()
+        self._count = 0
+        self._live: "WeakValueDictionary[int, Product]" = WeakValueDictionary()
+        self._listener = listener
+
+        rows = list(rows)
+        if not rows:
+            return
+
+        self._reserve(max(row[0] for row in rows))
+        names, prices, stock = self._names, self._prices, self._stock
+        thresholds, present = self._thresholds, self._present
+
+        for product_id, name, price, stock_quantity, low_stock_threshold in rows:
+            names[product_id] = name
+            prices[product_id] = price
+            stock[product_id] = stock_quantity
+            thresholds[product_id] = (
+                NO_THRESHOLD if low_stock_threshold is None else low_stock_threshold
+            )
+            present[product_id] = 1
+
+        self._count = sum(present)
+
+
+    def __len__(self) -> int:
+        return self._count
+
+
+    def __contains__(self, product_id: object) -> bool:
+        return (
+            isinstance(product_id, int)
+            and 0 <= product_id < len(self._present)
+            and self._present[product_id] == 1
+        )
+
+
+    def __iter__(self) -> Iterator[int]:
+        present = self._present
+        return (product_id for product_id in range(len(present)) if present[product_id])
+
+
+    def __getitem__(self, product_id: int) -> Product:
+        if product_id not in self:
+            raise KeyError(product_id)
+
+        product = self._live.get(product_id)
+        if product is not None:
+            return product
+
+        threshold = self._thresholds[product_id]
+        product = Product.from_storage(
+            product_id,
+            self._names[product_id],
+            self._prices[product_id],
+            self._stock[product_id],
+            None if threshold == NO_THRESHOLD else threshold,
+        )
+        product.set_change_listener(self._listener)
+        self._live[product_id] = product
+
+        return product
+
+
+    def __setitem__(self, product_id: int, product: Product) -> None:
+        self._store(
+            product_id,
+            product.name,
+            product.price,
+            product.stock_quantity,
+            product.low_stock_threshold,
+        )
+        self._live[product_id] = product
+
+
+    def __delitem__(self, product_id: int) -> None:
+        if product_id not in self:
+            raise KeyError(product_id)
+
+        self._present[product_id] = 0
+        self._names[product_id] = None
+        self._live.pop(product_id, None)
+        self._count -= 1
+
+
+    def _reserve(self, product_id: int) -> None:
+        """
+        Grow every column so `product_id` is a valid position.
+        """
+        missing = product_id + 1 - len(self._present)
+
+        if missing > 0:
+            self._names.extend(repeat(None, missing))
+            self._prices.extend(repeat(0.0, missing))
+            self._stock.extend(repeat(0, missing))
+            self._thresholds.extend(repeat(NO_THRESHOLD, missing))
+            self._present.extend(repeat(0, missing))
+
+
+    def _store(
+        self,
+        product_id: int,
+        name: str,
+        price: float,
+        stock_quantity: int,
+        low_stock_threshold: Optional[int],
+    ) -> None:
+        self._reserve(product_id)
+
+        if not self._present[product_id]:
+            self._present[product_id] = 1
+            self._count += 1
+
+        self._names[product_id] = name
+        self._prices[product_id] = price
+        self._stock[product_id] = stock_quantity
+        self._thresholds[product_id] = (
+            NO_THRESHOLD if low_stock_threshold is None else low_stock_threshold
+        )
+
+
+class LazyProductStore(MutableMapping):
+    """
+    Product catalogue that reads products from the database on first
+    access and keeps the most recently used `capacity` of them in memory.
+
+    Changes are written to the database by StoreManager before they reach
+    the store, so evicting a product never loses data.
+    """
+
+    def __init__(
+        self,
+        capacity: int = LAZY_CACHE_SIZE,
+        listener: Optional[Callable[[Product], None]] = None,
+    ) -> None:
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+
+        self.capacity = capacity
+        self._cache: "OrderedDict[int, Product]" = OrderedDict()
+        self._listener = listener
+
+
+    def __len__(self) -> int:
+        return ProductRepository.count_products()
+
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(ProductRepository.get_product_ids())
+
+
+    def __getitem__(self, product_id: int) -> Product:
+        product = self._cache.get(product_id)
+
+        if product is not None:
+            self._cache.move_to_end(product_id)
+            return product
+
+        product = ProductRepository.get_product_by_id(product_id)
+        if product is None:
+            raise KeyError(product_id)
+
+        return self.adopt(product)
+
+
+    def __setitem__(self, product_id: int, product: Product) -> None:
+        self._cache[product_id] = product
+        self._cache.move_to_end(product_id)
+
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+
+    def __delitem__(self, product_id: int) -> None:
+        self._cache.pop(product_id, None)
+
+
+    def peek(self, product_id: int) -> Optional[Product]:
+        """
+        Return the product if it is in memory, without reading the database.
+        """
+        return self._cache.get(product_id)
+
+
+    def adopt(self, product: Product) -> Product:
+        """
+        Return the cached instance of a product freshly read from the
+        database, caching the given one if it is not in memory yet.
+        Keeps one object per product among the ones still cached.
+        """
+        cached = self._cache.get(product.id)
+
+        if cached is not None:
+            self._cache.move_to_end(product.id)
+            return cached
+
+        product.set_change_listener(self._listener)
+        self[product.id] = product
+        return product
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from smart_stock_management.services.catalogue_io import to_number
+
+# columns of an offline sales file; unit_price is optional
+SALE_FIELDS = ("product_id", "quantity_sold", "timestamp", "unit_price")
+
+
+def parse_sale(record: Dict[str, Any]) -> Tuple[int, int, Optional[float], datetime]:
+    """
+    Convert a raw record into (product_id, quantity_sold, unit_price, timestamp).
+    Timestamps are ISO 8601; naive ones are taken to be UTC.
+    Raises ValueError for invalid records.
+    """
+    product_id = to_number(record.get("product_id"), int, "product_id")
+    if product_id <= 0:
+        raise ValueError("product_id must be a positive integer")
+
+    quantity_sold = to_number(record.get("quantity_sold"), int, "quantity_sold")
+    if quantity_sold <= 0:
+        raise ValueError("quantity_sold must be a positive integer")
+
+    timestamp = record.get("timestamp")
+    if not isinstance(timestamp, str) or not timestamp.strip():
+        raise ValueError("timestamp is required")
+    try:
+        timestamp = datetime.fromisoformat(timestamp.strip())
+    except ValueError:
+        raise ValueError(f"Invalid ISO 8601 timestamp '{timestamp}'")
+
+    unit_price = record.get("unit_price")
+    if unit_price in (None, ""):
+        unit_price = None
+    else:
+        unit_price = to_number(unit_price, float, "unit_price")
+        if unit_price <= 0:
+            raise ValueError("unit_price must be greater than 0")
+
+    return product_id, quantity_sold, unit_price, timestamp
@@ -0,0 +1,270 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from smart_stock_management.database.connection import savepoint, transaction
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.database.stock_lot_repository import StockLotRepository
+from smart_stock_management.utils.stock_exceptions import StockConflictError
+
+# strict: a sale is acknowledged once committed; relaxed: once queued
+DURABILITY_LEVELS = ("strict", "relaxed")
+
+FLUSH_INTERVAL = 0.05
+FLUSH_ROWS = 500
+
+# (net quantity per product, (product_id, quantity_sold, unit_price) per line)
+Basket = Tuple[Dict[int, int], List[Tuple[int, int, Optional[float]]]]
+
+
+def write_baskets(
+    baskets: List[Basket],
+) -> List[Union[Dict[int, int], StockConflictError]]:
+    """
+    Write many baskets in one transaction, each in its own savepoint.
+    Returns, per basket, the new stock levels of its products or the
+    StockConflictError that kept it out. Errors committing the transaction
+    itself are raised.
+    """
+    results: List[Union[Dict[int, int], StockConflictError]] = []
+
+    with transaction():
+        for totals, sales in baskets:
+            try:
+                with savepoint():
+                    stock_levels = ProductRepository.decrease_stocks(totals.items())
+                    StockLotRepository.consume_lots(totals.items())
+                    SalesRepository.record_sales(sales)
+            except StockConflictError as e:
+                results.append(e)
+            else:
+                results.append(stock_levels)
+
+    return results
+
+
+class SaleTicket:
+    """
+    Handle on a queued basket, resolved once its group is committed.
+    """
+
+    __slots__ = ("basket", "error", "_done")
+
+    def __init__(self, basket: Basket) -> None:
+        self.basket = basket
+        self.error: Optional[Exception] = None
+        self._done = threading.Event()
+
+
+    def resolve(self, error: Optional[Exception]) -> None:
+        self.error = error
+        self._done.set()
+
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Exception]:
+        """
+        Block until the basket is committed or rejected.
+        Returns None on success, or the error that kept it out.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for the sale to be committed")
+        return self.error
+
+
+class SalesWriter:
+    """
+    Write-behind queue committing sales in groups from a background thread.
+
+    With durability="relaxed" callers return as soon as a sale is queued.
+    A group is committed every `flush_interval` seconds, or as soon as
+    `max_rows` sale lines are waiting, so many sales share one fsync. A
+    group holds at most `max_rows` lines, and submit blocks while a full
+    group is already queued behind the one committing, so a crash loses at
+    most 2 * max_rows acknowledged lines (plus one basket, if a single
+    basket is larger than max_rows).
+
+    With durability="strict" callers wait on their ticket, and a sale is
+    only acknowledged once it is on disk. Groups are committed back to
+    back, each holding whatever queued while the previous one committed.
+
+    The writer only touches the database; keeping the in-memory catalogue
+    in step is up to the caller.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_rows: int = FLUSH_ROWS,
+        durability: str = "strict",
+    ) -> None:
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"durability must be one of: {', '.join(DURABILITY_LEVELS)}"
+            )
+
+        if not isinstance(max_rows, int) or max_rows <= 0:
+            raise ValueError("max_rows must be a positive integer")
+
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be greater than 0")
+
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.durability = durability
+
+        self._pending: List[SaleTicket] = []
+        self._pending_rows = 0
+        # the group being committed right now
+        self._in_flight: List[SaleTicket] = []
+        self._failed: List[SaleTicket] = []
+        self._flush_requested = False
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="sales-writer", daemon=True
+        )
+        self._thread.start()
+
+
+    def submit(self, basket: Basket) -> SaleTicket:
+        """
+        Queue a basket for the next group commit.
+        """
+        ticket = SaleTicket(basket)
+
+        with self._condition:
+            # back-pressure: at most one full group waits behind the one
+            # committing, which bounds what a crash can lose when relaxed
+            while self._pending_rows >= self.max_rows and not self._closed:
+                self._condition.wait()
+
+            if self._closed:
+                raise RuntimeError("Sales writer is closed")
+
+            self._pending.append(ticket)
+            self._pending_rows += len(basket[1])
+
+            if self._pending_rows >= self.max_rows:
+                self._flush_requested = True
+                self._condition.notify()
+            elif len(self._pending) == 1:
+                # starts the clock on a new group
+                self._condition.notify()
+
+        return ticket
+
+
+    def flush(self) -> None:
+        """
+        Commit everything queued so far and wait for it.
+        """
+        with self._condition:
+            if self._pending:
+                last = self._pending[-1]
+                self._flush_requested = True
+                self._condition.notify()
+            elif self._in_flight:
+                last = self._in_flight[-1]
+            else:
+                return
+
+        last.wait()
+
+
+    def take_failures(self) -> List[SaleTicket]:
+        """
+        Return and forget the baskets that were acknowledged without waiting
+        but could not be committed.
+        """
+        with self._condition:
+            failed, self._failed = self._failed, []
+
+        return failed
+
+
+    def close(self) -> None:
+        """
+        Commit everything still queued and stop the background thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+
+                # strict callers are all blocked, so waiting would only add
+                # latency; their groups form while the previous one commits.
+                # Relaxed sales wait at most one interval.
+                deadline = time.monotonic() + self.flush_interval
+                while self.durability == "relaxed" and not (
+                    self._closed or self._flush_requested
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._next_group()
+                self._in_flight = batch
+                self._condition.notify_all()
+                # whatever did not fit is already due
+                self._flush_requested = bool(self._pending)
+                done = self._closed and not self._pending
+
+            if batch:
+                self._commit(batch)
+
+            if done:
+                return
+
+
+    def _next_group(self) -> List[SaleTicket]:
+        """
+        Take the oldest queued baskets holding at most max_rows sale lines,
+        or the oldest basket alone if it is bigger. Call with the lock held.
+        """
+        taken = rows = 0
+
+        for ticket in self._pending:
+            lines = len(ticket.basket[1])
+            if taken and rows + lines > self.max_rows:
+                break
+            taken += 1
+            rows += lines
+
+        batch, self._pending = self._pending[:taken], self._pending[taken:]
+        self._pending_rows -= rows
+
+        return batch
+
+
+    def _commit(self, batch: List[SaleTicket]) -> None:
+        try:
+            results = [
+                result if isinstance(result, Exception) else None
+                for result in write_baskets([ticket.basket for ticket in batch])
+            ]
+        except Exception as e:
+            results = [e] * len(batch)
+
+        failed = [
+            ticket
+            for ticket, error in zip(batch, results)
+            if error is not None and self.durability == "relaxed"
+        ]
+        if failed:
+            with self._condition:
+                self._failed.extend(failed)
+
+        for ticket, error in zip(batch, results):
+            ticket.resolve(error)
@@ -0,0 +1,249 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from smart_stock_management.database.connection import DatabaseConfig, use_database
+from smart_stock_management.database.initializer import initialize_database
+from smart_stock_management.database.product_repository import ProductRepository
+from smart_stock_management.database.sales_repository import SalesRepository
+from smart_stock_management.models.sales import SalesSummary
+from smart_stock_management.services.store_manager import StoreManager
+
+# store IDs double as file names: <directory>/<store_id>.db
+STORE_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]*")
+STORE_FILE_SUFFIX = ".db"
+
+
+def _create_store() -> int:
+    initialize_database()
+    return ProductRepository.count_products()
+
+
+def _store_stock(names: Optional[List[str]]) -> Dict[str, int]:
+    return ProductRepository.get_stock_by_name(names)
+
+
+def _store_revenue(
+    period: str, start: datetime, end: datetime, utc_offset_minutes: int
+) -> List[Tuple[str, int, float]]:
+    return [
+        (summary.period, summary.units_sold, summary.revenue)
+        for summary in SalesRepository.summarize_sales(
+            period, start, end, by_product=False, utc_offset_minutes=utc_offset_minutes
+        )
+    ]
+
+
+def _store_totals(start: datetime, end: datetime) -> Tuple[int, float]:
+    return SalesRepository.get_sales_totals(start, end)
+
+
+# queries a worker can run against one store's database
+STORE_QUERIES: Dict[str, Callable[..., Any]] = {
+    "create": _create_store,
+    "stock": _store_stock,
+    "revenue": _store_revenue,
+    "totals": _store_totals,
+}
+
+# database the worker process's shared pool points at
+_open_database: Optional[Tuple[str, Optional[str]]] = None
+
+
+def _run_on_store(db_path: str, profile: Optional[str], query: str, args: Tuple) -> Any:
+    """
+    Run a store query in a worker process, first pointing the process's
+    shared pool at the store's database unless it already is.
+    """
+    global _open_database
+
+    if _open_database != (db_path, profile):
+        use_database(DatabaseConfig(db_path, profile=profile))
+        _open_database = (db_path, profile)
+
+    return STORE_QUERIES[query](*args)
+
+
+class StoreChain:
+    """
+    A chain of stores, each with its own SQLite database in one directory.
+
+    Each store is run by its own StoreManager in its own process (see
+    open_store). Cross-store queries fan out to a pool of worker processes,
+    one store database per task, and the results are merged here.
+    Products are matched across stores by name, since each store numbers
+    its own products.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        profile: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        if workers is not None and (not isinstance(workers, int) or workers <= 0):
+            raise ValueError("workers must be a positive integer")
+
+        self.directory = Path(directory)
+        self.profile = profile
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+
+    def __enter__(self) -> "StoreChain":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+    def store_ids(self) -> List[str]:
+        """
+        Return the IDs of the stores with a database in the directory, sorted.
+        """
+        if not self.directory.is_dir():
+            return []
+
+        return sorted(
+            path.stem
+            for path in self.directory.glob(f"*{STORE_FILE_SUFFIX}")
+            if STORE_ID_PATTERN.fullmatch(path.stem)
+        )
+
+
+    def database_config(self, store_id: str) -> DatabaseConfig:
+        """
+        Return the config of a store's database.
+        """
+        if not isinstance(store_id, str) or not STORE_ID_PATTERN.fullmatch(store_id):
+            raise ValueError(
+                "Store ID must start with a letter or digit and contain only "
+                "letters, digits, '-' and '_'"
+            )
+
+        return DatabaseConfig(
+            self.directory / f"{store_id}{STORE_FILE_SUFFIX}", profile=self.profile
+        )
+
+
+    def add_stores(self, store_ids: Iterable[str]) -> None:
+        """
+        Create the databases of new stores, with the current schema.
+        Existing stores are only migrated.
+        """
+        store_ids = list(store_ids)
+        for store_id in store_ids:
+            self.database_config(store_id)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._map("create", store_ids)
+
+
+    def open_store(self, store_id: str, **options) -> StoreManager:
+        """
+        Return a StoreManager on one store's database, passing `options`
+        through. This points the calling process's shared pool at the store,
+        so open one store per process.
+        """
+        if store_id not in self.store_ids():
+            raise ValueError(f"Store '{store_id}' not found in {self.directory}")
+
+        return StoreManager(database=self.database_config(store_id), **options)
+
+
+    def get_total_stock(self, names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Return stock summed over all stores per product name,
+        for the given names or every product.
+        """
+        wanted = None if names is None else list(names)
+        totals: Counter = Counter()
+
+        for stock in self._map("stock", self.store_ids(), wanted).values():
+            totals.update(stock)
+
+        return dict(totals)
+
+
+    def get_stock_by_store(self, name: str) -> Dict[str, int]:
+        """
+        Return the stock of one product in every store that carries it.
+        """
+        return {
+            store_id: stock[name]
+            for store_id, stock in self._map("stock", self.store_ids(), [name]).items()
+            if name in stock
+        }
+
+
+    def get_revenue_by_period(
+        self,
+        period: str,
+        start: datetime,
+        end: datetime,
+        utc_offset_minutes: int = 0,
+    ) -> List[SalesSummary]:
+        """
+        Return chain-wide units sold and revenue per hour, day or week
+        in [start, end).
+        """
+        units: Counter = Counter()
+        revenue: Counter = Counter()
+
+        results = self._map(
+            "revenue", self.store_ids(), period, start, end, utc_offset_minutes
+        )
+        for rows in results.values():
+            for label, units_sold, amount in rows:
+                units[label] += units_sold
+                revenue[label] += amount
+
+        return [
+            SalesSummary(period=label, product_id=None, units_sold=units[label], revenue=revenue[label])
+            for label in sorted(units)
+        ]
+
+
+    def get_revenue_by_store(
+        self, start: datetime, end: datetime
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Return (units sold, revenue) per store for sales in [start, end).
+        """
+        return self._map("totals", self.store_ids(), start, end)
+
+
+    def _map(self, query: str, store_ids: List[str], *args) -> Dict[str, Any]:
+        """
+        Run a store query on every given store in the worker processes.
+        """
+        if not store_ids:
+            return {}
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        paths = [str(self.database_config(store_id).db_path) for store_id in store_ids]
+        results = self._executor.map(
+            _run_on_store,
+            paths,
+            [self.profile] * len(paths),
+            [query] * len(paths),
+            [args] * len(paths),
+        )
+
+        return dict(zip(store_ids, results))
@@ -1,10 +1,62 @@
-from typing import Dict, List, Optional
+import gc
+import os
+import time
+import weakref
+from itertools import islice
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from smart_stock_management.database.connection import (
+    DatabaseConfig,
+    get_pool,
+    transaction,
+    use_database,
+)
+from smart_stock_management.database.initializer import initialize_database
 from smart_stock_management.models.product import Product
 from smart_stock_management.database.product_repository import ProductRepository
 from smart_stock_management.database.sales_repository import SalesRepository
-from smart_stock_management.utils.stock_exceptions import InsufficientStockError
-from smart_stock_management.models.sales import Sale
+from smart_stock_management.database.stock_lot_repository import StockLotRepository
+from smart_stock_management.utils.stock_exceptions import (
+    InsufficientStockError,
+    StockConflictError,
+)
+from smart_stock_management.models.sales import Sale, SalesSummary
+from smart_stock_management.models.stock_lot import StockLot
+from smart_stock_management.database.catalogue_snapshot import (
+    get_snapshot_path,
+    read_snapshot,
+    write_snapshot,
+)
+from smart_stock_management.services.product_store import (
+    ColumnarProductStore,
+    LazyProductStore,
+)
+from smart_stock_management.services.catalogue_io import (
+    ImportReport,
+    detect_format,
+    open_rejects,
+    parse_product,
+    read_records,
+    write_products,
+    write_reject,
+)
+from smart_stock_management.services.sales_io import parse_sale
+from smart_stock_management.services.sales_writer import Basket, SalesWriter, write_baskets
+from smart_stock_management.utils.expiry_heap import ExpiryHeap
+from smart_stock_management.utils.sorted_index import SortedIndex
 
 
 class StoreManager:
@@ -12,19 +64,279 @@ class StoreManager:
     Core business logic layer for inventory and sales handling.
     """
 
+    # default for products without their own low-stock threshold
     LOW_STOCK_THRESHOLD = 5
 
-    def __init__(self) -> None:
-        self._products: Dict[int, Product] = {}
+    # in-memory catalogue layouts
+    PRODUCT_STORES = ("dict", "columnar")
+
+    # how the catalogue is loaded at startup
+    LOAD_MODES = ("eager", "lazy", "snapshot")
+
+    # rows written per transaction by import_products and import_sales
+    IMPORT_CHUNK_SIZE = 5_000
+
+    # matches returned by name search and type-ahead
+    SEARCH_LIMIT = 20
+
+    # managers not yet closed; the pool is process-wide, so while one is open
+    # no other may point the pool at a different database
+    _open_managers: "weakref.WeakSet[StoreManager]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        product_store: str = "dict",
+        load_mode: str = "eager",
+        sales_writer: Optional[SalesWriter] = None,
+        database: Optional[DatabaseConfig] = None,
+    ) -> None:
+        """
+        product_store="columnar" keeps the catalogue in typed arrays,
+        trading a little lookup speed for much less memory per product.
+
+        load_mode="eager" reads every product at startup.
+        load_mode="snapshot" does the same from a binary cache file next to
+        the database, falling back to the database when the file is stale.
+        load_mode="lazy" reads products on first access into a bounded LRU
+        cache; low-stock and sorted listings are then served by SQL.
+
+        With a `sales_writer`, process_sale and process_basket take the stock
+        off in memory and leave the database writes to its group commits.
+        Call close() before exiting so no queued sale is dropped.
+
+        With a `database` config, the shared connection pool is pointed at
+        that database and its schema created or migrated before loading.
+        The pool is process-wide: run one store's database per process.
+        Raises RuntimeError if another manager in this process is still open
+        on a different database; close() it first.
+        """
+        if product_store not in self.PRODUCT_STORES:
+            raise ValueError(
+                f"product_store must be one of: {', '.join(self.PRODUCT_STORES)}"
+            )
+
+        if load_mode not in self.LOAD_MODES:
+            raise ValueError(
+                f"load_mode must be one of: {', '.join(self.LOAD_MODES)}"
+            )
+
+        if load_mode == "lazy" and product_store != "dict":
+            raise ValueError("load_mode='lazy' only supports product_store='dict'")
+
+        self._product_store = product_store
+        self._load_mode = load_mode
+        self._products: MutableMapping[int, Product] = {}
+        self._low_stock: Dict[int, Product] = {}
+        self._price_index = SortedIndex()
+        self._stock_index = SortedIndex()
+        # casefolded names for type-ahead, built on first use
+        self._name_index: Optional[SortedIndex] = None
+        # catalogue version the in-memory products are current with
+        self._catalogue_version = 0
+        # perishable lots by ID and by product, with a heap of their expiry
+        # dates; loaded on first use, then re-read per product once stale
+        self._lots: Optional[Dict[int, StockLot]] = None
+        self._product_lots: Dict[int, Set[int]] = {}
+        self._stale_lot_products: Set[int] = set()
+        self._expiry_heap = ExpiryHeap()
+        self._sales_writer = sales_writer
+
+        if database is not None:
+            self._check_database_free(database)
+            use_database(database)
+            initialize_database()
+
         self._load_products()
 
+        self._database = str(get_pool().db_path)
+        self._pid = os.getpid()
+        StoreManager._open_managers.add(self)
+
+
+    @classmethod
+    def _check_database_free(cls, database: DatabaseConfig) -> None:
+        """
+        Refuse to repoint the shared pool while an open manager uses it;
+        its repository calls would silently go to the new database.
+        """
+        target = str(database.db_path)
+
+        def open_elsewhere() -> List[str]:
+            return [
+                manager._database
+                for manager in list(cls._open_managers)
+                if manager._pid == os.getpid() and manager._database != target
+            ]
+
+        if open_elsewhere():
+            # products hold their manager's listener, so a dropped manager
+            # stays in the set until the cycle collector runs
+            gc.collect()
+
+        others = open_elsewhere()
+
+        if others:
+            raise RuntimeError(
+                f"Another StoreManager is open on {others[0]}; "
+                f"close() it before opening {target} in this process"
+            )
+
 
     def _load_products(self) -> None:
         """
         Load all products from DB into memory for fast lookup.
         """
-        products = ProductRepository.get_all_products()
-        self._products = {product.id: product for product in products}
+        if self._load_mode == "lazy":
+            self._catalogue_version = ProductRepository.get_catalogue_version()
+            self._products = LazyProductStore(listener=self._on_product_change)
+            return
+
+        rows = self._fetch_product_rows()
+
+        if self._product_store == "columnar":
+            self._products = ColumnarProductStore(
+                rows, listener=self._on_product_change
+            )
+        else:
+            self._products = {}
+            for row in rows:
+                product = Product.from_storage(*row)
+                product.set_change_listener(self._on_product_change)
+                self._products[product.id] = product
+
+        self._low_stock = {
+            product_id: self._products[product_id]
+            for product_id, _, _, stock_quantity, threshold in rows
+            if self._below_threshold(stock_quantity, threshold)
+        }
+        self._price_index.build((row[0], row[2]) for row in rows)
+        self._stock_index.build((row[0], row[3]) for row in rows)
+
+
+    def _fetch_product_rows(self) -> List[Tuple[int, str, float, int, Optional[int]]]:
+        """
+        Read the catalogue rows, from the snapshot file when it is current,
+        and record the catalogue version they belong to.
+        """
+        snapshot_path = get_snapshot_path() if self._load_mode == "snapshot" else None
+
+        if snapshot_path is not None:
+            version = ProductRepository.get_catalogue_version()
+            rows = read_snapshot(snapshot_path, version)
+            if rows is not None:
+                self._catalogue_version = version
+                return rows
+
+        version, rows = ProductRepository.get_catalogue_snapshot()
+        self._catalogue_version = version
+
+        if snapshot_path is not None:
+            write_snapshot(snapshot_path, version, rows)
+
+        return rows
+
+
+    def _save_snapshot(self) -> None:
+        """
+        Write the snapshot file at the current catalogue version.
+        """
+        snapshot_path = get_snapshot_path()
+
+        if snapshot_path is not None:
+            version, rows = ProductRepository.get_catalogue_snapshot()
+            write_snapshot(snapshot_path, version, rows)
+
+
+    def refresh(self) -> int:
+        """
+        Bring the in-memory catalogue up to date with changes made by other
+        processes since it was loaded or last refreshed.
+        Only the changed product rows are read; when nothing changed this is
+        a single one-row lookup. Returns the number of products changed.
+        """
+        self._settle_queued_sales()
+
+        version, rows = ProductRepository.get_changes_since(self._catalogue_version)
+
+        for product_id, name, price, stock_quantity, low_stock_threshold in rows:
+            if self._lots is not None:
+                # lots only change along with their product's stock
+                self._stale_lot_products.add(product_id)
+
+            if self._load_mode == "lazy":
+                product = self._products.peek(product_id)
+            else:
+                product = self._products.get(product_id)
+
+            if name is None:
+                if product is not None:
+                    self._untrack_product(product)
+            elif product is not None:
+                product.refresh_from_storage(
+                    name, price, stock_quantity, low_stock_threshold
+                )
+            elif self._load_mode != "lazy":
+                self._track_product(Product.from_storage(
+                    product_id, name, price, stock_quantity, low_stock_threshold
+                ))
+
+        self._catalogue_version = version
+
+        return len(rows)
+
+
+    def _track_product(self, product: Product) -> None:
+        """
+        Add a product to the in-memory indexes and keep them
+        updated on every price or stock change.
+        """
+        product.set_change_listener(self._on_product_change)
+        self._on_product_change(product)
+
+
+    def _untrack_product(self, product: Product) -> None:
+        """
+        Remove a product from the in-memory indexes.
+        """
+        product.set_change_listener(None)
+        self._products.pop(product.id, None)
+        self._low_stock.pop(product.id, None)
+        self._price_index.discard(product.id)
+        self._stock_index.discard(product.id)
+        if product.id in self._product_lots:
+            self._stale_lot_products.add(product.id)
+        if self._name_index is not None:
+            self._name_index.discard(product.id)
+
+
+    def _on_product_change(self, product: Product) -> None:
+        """
+        Write the change back to the catalogue and keep the low-stock
+        and sorted indexes in step with it.
+        """
+        self._products[product.id] = product
+
+        if self._load_mode == "lazy":
+            return
+
+        if self.is_low_stock(product):
+            self._low_stock[product.id] = product
+        else:
+            self._low_stock.pop(product.id, None)
+
+        self._price_index.set(product.id, product.price)
+        self._stock_index.set(product.id, product.stock_quantity)
+        if product.id in self._product_lots:
+            self._stale_lot_products.add(product.id)
+        if self._name_index is not None:
+            self._name_index.set(product.id, product.name.casefold())
+
+
+    def _adopt_all(self, products: List[Product]) -> List[Product]:
+        """
+        Swap freshly queried products for their cached instances (lazy mode).
+        """
+        return [self._products.adopt(product) for product in products]
 
 
     def get_product_by_id(self, product_id: int) -> Optional[Product]:
@@ -34,32 +346,177 @@ class StoreManager:
         return self._products.get(product_id)
 
 
+    def is_low_stock(self, product: Product) -> bool:
+        """
+        Check a product against its own threshold, or the store default.
+        """
+        return self._below_threshold(
+            product.stock_quantity, product.low_stock_threshold
+        )
+
+
+    def _below_threshold(
+        self, stock_quantity: int, low_stock_threshold: Optional[int]
+    ) -> bool:
+        if low_stock_threshold is None:
+            low_stock_threshold = self.LOW_STOCK_THRESHOLD
+
+        return stock_quantity < low_stock_threshold
+
+
     def get_low_stock_products(self) -> List[Product]:
         """
         Identify products with low stock.
+        Reads the maintained low-stock index, so the cost depends only
+        on how many products are low.
+        """
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.get_low_stock_products(self.LOW_STOCK_THRESHOLD)
+            )
+
+        return [self._low_stock[product_id] for product_id in sorted(self._low_stock)]
+
+
+    def get_sorted_products_by_price(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Product]:
         """
+        Return products sorted by price (ascending by default).
+        Reads the maintained price index; `offset` and `limit` select a page.
+        """
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.get_sorted_products("price", offset, limit, descending)
+            )
+
         return [
-            product
-            for product in self._products.values()
-            if product.stock_quantity < self.LOW_STOCK_THRESHOLD
+            self._products[product_id]
+            for product_id in self._price_index.ids(offset, limit, descending)
         ]
 
 
-    def get_sorted_products_by_price(self) -> List[Product]:
+    def get_sorted_products_by_stock(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> List[Product]:
         """
-        Return products sorted by price (ascending).
+        Return products sorted by stock quantity (ascending by default).
+        Reads the maintained stock index; `offset` and `limit` select a page.
         """
-        return sorted(self._products.values(), key=lambda p: p.price)
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.get_sorted_products(
+                    "stock_quantity", offset, limit, descending
+                )
+            )
+
+        return [
+            self._products[product_id]
+            for product_id in self._stock_index.ids(offset, limit, descending)
+        ]
 
 
-    def get_sorted_products_by_stock(self) -> List[Product]:
+    def get_products_by_price_range(
+        self, min_price: float, max_price: float
+    ) -> List[Product]:
         """
-        Return products sorted by stock quantity (ascending).
+        Return products priced between min_price and max_price (inclusive),
+        cheapest first.
         """
-        return sorted(self._products.values(), key=lambda p: p.stock_quantity)
+        if min_price > max_price:
+            raise ValueError("min_price cannot be greater than max_price")
 
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.get_products_in_range("price", min_price, max_price)
+            )
+
+        return [
+            self._products[product_id]
+            for product_id in self._price_index.ids_between(min_price, max_price)
+        ]
+
+
+    def get_products_by_stock_range(
+        self, min_stock: int, max_stock: int
+    ) -> List[Product]:
+        """
+        Return products with stock between min_stock and max_stock (inclusive),
+        lowest stock first.
+        """
+        if min_stock > max_stock:
+            raise ValueError("min_stock cannot be greater than max_stock")
+
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.get_products_in_range(
+                    "stock_quantity", min_stock, max_stock
+                )
+            )
+
+        return [
+            self._products[product_id]
+            for product_id in self._stock_index.ids_between(min_stock, max_stock)
+        ]
+
+
+    def search_products(self, text: str, limit: int = SEARCH_LIMIT) -> List[Product]:
+        """
+        Find products whose names contain every word of `text` as a word
+        prefix, in ID order. Served by the full-text index.
+        """
+        products = ProductRepository.search_products(text, limit)
+
+        if self._load_mode == "lazy":
+            return self._adopt_all(products)
+
+        return [
+            self._products[product.id]
+            for product in products
+            if product.id in self._products
+        ]
+
+
+    def suggest_products(self, prefix: str, limit: int = SEARCH_LIMIT) -> List[Product]:
+        """
+        Type-ahead: products whose names start with `prefix`, ignoring case,
+        in name order. Reads an in-memory name index built on first use,
+        so each keystroke costs O(log n + limit).
+        """
+        prefix = prefix.lstrip().casefold()
+        if not prefix:
+            return []
+
+        if self._load_mode == "lazy":
+            return self._adopt_all(
+                ProductRepository.search_products(prefix, limit, name_prefix=True)
+            )
+
+        if self._name_index is None:
+            self._name_index = SortedIndex(
+                (product_id, product.name.casefold())
+                for product_id, product in self._products.items()
+            )
+
+        # every name starting with the prefix sorts below prefix + max char
+        matches = self._name_index.ids_between(prefix, prefix + chr(0x10FFFF))
 
-    def add_product(self, name: str, price: float, stock_quantity: int) -> Product:
+        return [self._products[product_id] for product_id in islice(matches, limit)]
+
+
+    def add_product(
+        self,
+        name: str,
+        price: float,
+        stock_quantity: int,
+        low_stock_threshold: Optional[int] = None,
+    ) -> Product:
         """
         Add a new product to inventory.
         """
@@ -72,10 +529,16 @@ class StoreManager:
         if not isinstance(stock_quantity, int) or stock_quantity < 0:
             raise ValueError("Stock quantity must be a non-negative integer")
 
+        if low_stock_threshold is not None and (
+            not isinstance(low_stock_threshold, int) or low_stock_threshold < 0
+        ):
+            raise ValueError("Low-stock threshold must be a non-negative integer")
+
         product_id = ProductRepository.add_product(
             name=name,
             price=price,
             stock_quantity=stock_quantity,
+            low_stock_threshold=low_stock_threshold,
         )
 
         product = Product(
@@ -83,50 +546,181 @@ class StoreManager:
             name=name,
             price=price,
             stock_quantity=stock_quantity,
+            low_stock_threshold=low_stock_threshold,
         )
 
-        self._products[product_id] = product
+        self._track_product(product)
 
         return product
 
 
+    def import_products(
+        self,
+        path: Union[str, Path],
+        file_format: Optional[str] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        rejects_path: Union[str, Path, None] = None,
+    ) -> ImportReport:
+        """
+        Bulk-load products from a CSV or JSON Lines file.
+        The file is streamed and valid rows are inserted `chunk_size` at a
+        time, one transaction per chunk. Invalid rows are skipped, counted
+        and, when `rejects_path` is given, written there as JSON Lines.
+        """
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+
+        file_format = detect_format(path, file_format)
+        report = ImportReport()
+        started = time.perf_counter()
+        rejects = open_rejects(rejects_path) if rejects_path is not None else None
+        chunk: List[Tuple[str, float, int, Optional[int]]] = []
+
+        try:
+            for line_number, record, error in read_records(path, file_format):
+                if error is None:
+                    try:
+                        chunk.append(parse_product(record))
+                    except ValueError as e:
+                        error = str(e)
+
+                if error is not None:
+                    report.reject(line_number, error)
+                    if rejects is not None:
+                        write_reject(rejects, line_number, error, record)
+                    continue
+
+                if len(chunk) >= chunk_size:
+                    self._import_chunk(chunk)
+                    report.imported += len(chunk)
+                    chunk = []
+
+            if chunk:
+                self._import_chunk(chunk)
+                report.imported += len(chunk)
+        finally:
+            if rejects is not None:
+                rejects.close()
+
+        report.elapsed = time.perf_counter() - started
+
+        return report
+
+
+    def _import_chunk(self, chunk: List[Tuple[str, float, int, Optional[int]]]) -> None:
+        """
+        Insert one chunk of validated products and index them.
+        """
+        product_ids = ProductRepository.add_products(chunk)
+
+        for product_id, values in zip(product_ids, chunk):
+            self._track_product(Product.from_storage(product_id, *values))
+
+
+    def export_products(
+        self, path: Union[str, Path], file_format: Optional[str] = None
+    ) -> int:
+        """
+        Stream the whole catalogue from the database to a CSV or JSON Lines
+        file. Returns the number of products written.
+        """
+        file_format = detect_format(path, file_format)
+
+        return write_products(path, file_format, ProductRepository.iter_products())
+
+
     def update_product(
         self,
         product_id: int,
         name: Optional[str] = None,
         price: Optional[float] = None,
         stock_quantity: Optional[int] = None,
+        low_stock_threshold: Optional[int] = None,
+        clear_threshold: bool = False,
     ) -> Product:
         """
         Update an existing product.
+        Pass clear_threshold=True to drop its own low-stock threshold and
+        fall back to the store default.
         """
+        self._settle_queued_sales()
+
         product = self.get_product_by_id(product_id)
 
         if product is None:
             raise ValueError(f"Product with ID {product_id} not found")
 
-        if name is None and price is None and stock_quantity is None:
+        if (
+            name is None
+            and price is None
+            and stock_quantity is None
+            and low_stock_threshold is None
+            and not clear_threshold
+        ):
             raise ValueError("At least one field must be provided for update")
 
+        if clear_threshold and low_stock_threshold is not None:
+            raise ValueError("Cannot both set and clear the low-stock threshold")
+
         if name is not None:
             if not isinstance(name, str) or not name.strip():
                 raise ValueError("Product name must be a non-empty string")
             product.name = name
+            # names are plain attributes, so the indexes are told directly
+            self._on_product_change(product)
 
         if price is not None:
             product.price = price
 
+        expected_stock = product.stock_quantity
+
         if stock_quantity is not None:
             if not isinstance(stock_quantity, int) or stock_quantity < 0:
                 raise ValueError("Stock quantity must be a non-negative integer")
             product.set_stock(stock_quantity)
 
-        ProductRepository.update_product(
-            product_id=product.id,
-            name=product.name,
-            price=product.price,
-            stock_quantity=product.stock_quantity,
-        )
+        if low_stock_threshold is not None:
+            product.low_stock_threshold = low_stock_threshold
+
+        if clear_threshold:
+            product.low_stock_threshold = None
+
+        try:
+            with transaction():
+                # only the given fields are written, so a rename or price
+                # change cannot overwrite stock sold by another process
+                if (
+                    name is not None
+                    or price is not None
+                    or low_stock_threshold is not None
+                    or clear_threshold
+                ):
+                    ProductRepository.update_product(
+                        product_id=product.id,
+                        name=name,
+                        price=price,
+                        low_stock_threshold=low_stock_threshold,
+                        clear_threshold=clear_threshold,
+                    )
+                if stock_quantity is not None:
+                    ProductRepository.set_stock(
+                        product.id, stock_quantity, expected_stock
+                    )
+                    # a stock count below the lots means perishables went missing
+                    StockLotRepository.fit_lots_to_stock(product.id)
+        except StockConflictError:
+            # nothing was written; show the caller what the database holds
+            stored = ProductRepository.get_product_by_id(product.id)
+            if stored is None:
+                self._untrack_product(product)
+                raise ValueError(f"Product with ID {product_id} not found")
+            product.refresh_from_storage(
+                stored.name,
+                stored.price,
+                stored.stock_quantity,
+                stored.low_stock_threshold,
+            )
+            raise
 
         return product
 
@@ -135,6 +729,8 @@ class StoreManager:
         """
         Delete a product.
         """
+        self._settle_queued_sales()
+
         product = self.get_product_by_id(product_id)
 
         if product is None:
@@ -142,25 +738,149 @@ class StoreManager:
 
         ProductRepository.delete_product(product_id)
 
-        del self._products[product_id]
+        self._untrack_product(product)
 
     
     def increase_product_stock(self, product_id: int, quantity: int) -> Product:
         """
         Increase stock of an existing product.
         """
+        self._settle_queued_sales()
+
         product = self.get_product_by_id(product_id)
 
         if product is None:
             raise ValueError(f"Product with ID {product_id} not found")
 
-        product.increase_stock(quantity)
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise ValueError("Quantity must be a positive integer")
+
+        new_stock = ProductRepository.increase_stock(product_id, quantity)
 
-        ProductRepository.update_stock(product_id, product.stock_quantity)
+        if new_stock is None:
+            self._untrack_product(product)
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        product.set_stock(new_stock)
 
         return product
 
 
+    def receive_lot(
+        self,
+        product_id: int,
+        lot_code: str,
+        quantity: int,
+        expiry_date: date,
+    ) -> StockLot:
+        """
+        Add a delivery of perishable stock: the product's stock goes up by
+        `quantity` and the lot records when that stock expires. Receiving
+        more of an existing lot code adds to it.
+        """
+        self._settle_queued_sales()
+
+        product = self.get_product_by_id(product_id)
+
+        if product is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        lot = StockLot(None, product_id, lot_code, quantity, expiry_date)
+
+        with transaction():
+            new_stock = ProductRepository.increase_stock(product_id, quantity)
+            if new_stock is None:
+                self._untrack_product(product)
+                raise ValueError(f"Product with ID {product_id} not found")
+            lot.id = StockLotRepository.add_lot(
+                product_id, lot.lot_code, quantity, expiry_date
+            )
+
+        product.set_stock(new_stock)
+        if self._lots is not None:
+            self._stale_lot_products.add(product_id)
+
+        return lot
+
+
+    def get_product_lots(self, product_id: int) -> List[StockLot]:
+        """
+        Return a product's lots in the order sales use them up:
+        earliest expiry first.
+        """
+        self._settle_queued_sales()
+
+        return StockLotRepository.get_lots_for_product(product_id)
+
+
+    def get_expiring_lots(self, days: int) -> List[StockLot]:
+        """
+        Return lots expiring within `days` days, including lots already
+        past their date, earliest first.
+        Lots are held in memory with a min-heap of their expiry dates, so
+        only the lots due are visited, however many there are.
+        """
+        if not isinstance(days, int) or days < 0:
+            raise ValueError("days must be a non-negative integer")
+
+        self._settle_queued_sales()
+
+        last_day = date.today() + timedelta(days=days)
+
+        if self._load_mode == "lazy":
+            return StockLotRepository.get_lots_expiring_by(last_day)
+
+        self._sync_lots()
+
+        return [
+            self._lots[lot_id]
+            for lot_id in self._expiry_heap.due(last_day.toordinal())
+        ]
+
+
+    def _sync_lots(self) -> None:
+        """
+        Load every lot on first use; afterwards re-read only the lots of
+        products whose stock changed since, as every lot change (sale,
+        delivery, stock count, delete) comes with one.
+        """
+        if self._lots is None:
+            self._lots = {}
+            self._stale_lot_products.clear()
+            lots = StockLotRepository.get_all_lots()
+            for lot in lots:
+                self._lots[lot.id] = lot
+                self._product_lots.setdefault(lot.product_id, set()).add(lot.id)
+            # keyed by day number: ints compare much faster than dates
+            self._expiry_heap = ExpiryHeap(
+                (lot.expiry_date.toordinal(), lot.id) for lot in lots
+            )
+            return
+
+        if not self._stale_lot_products:
+            return
+
+        stale, self._stale_lot_products = self._stale_lot_products, set()
+        current: Dict[int, Dict[int, StockLot]] = {}
+        for lot in StockLotRepository.get_lots_for_products(stale):
+            current.setdefault(lot.product_id, {})[lot.id] = lot
+
+        for product_id in stale:
+            lots = current.get(product_id, {})
+            known = self._product_lots.pop(product_id, set())
+
+            self._expiry_heap.discard(known - lots.keys())
+            for lot_id in known - lots.keys():
+                del self._lots[lot_id]
+
+            for lot_id, lot in lots.items():
+                if lot_id not in known:
+                    self._expiry_heap.push(lot.expiry_date.toordinal(), lot_id)
+                self._lots[lot_id] = lot
+
+            if lots:
+                self._product_lots[product_id] = set(lots)
+
 
     def preview_sale(self, product_id: int, quantity: int) -> float:
         """
@@ -185,13 +905,434 @@ class StoreManager:
     def process_sale(self, product_id: int, quantity: int) -> None:
         """
         Process a sale transaction.
+        Stock update and sales record are committed together. Stock is taken
+        off relative to the database value, so tills in other processes
+        cannot overwrite each other; the cached stock is then synced to it.
         """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise ValueError("Quantity must be a positive integer")
 
         product = self.get_product_by_id(product_id)
-        product.reduce_stock(quantity)
 
-        ProductRepository.update_stock(product_id, product.stock_quantity)
-        SalesRepository.record_sale(product_id, quantity)
+        if product is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        self._commit_sales(
+            {product_id: product},
+            {product_id: quantity},
+            [(product_id, quantity, product.price)],
+        )
+
+
+    def process_basket(self, lines: List[Tuple[int, int]]) -> None:
+        """
+        Process a multi-line sale as one transaction.
+        Every line is validated first; if any line fails, nothing is sold.
+        """
+        products, totals = self._validate_basket(lines)
+
+        self._commit_sales(
+            products,
+            totals,
+            [
+                (product_id, quantity, products[product_id].price)
+                for product_id, quantity in lines
+            ],
+        )
+
+
+    def process_sales(
+        self, baskets: List[List[Tuple[int, int]]]
+    ) -> List[Optional[Exception]]:
+        """
+        Process many independent baskets in a single commit.
+        Each basket succeeds or fails on its own; the result for each is
+        None or the exception process_basket would have raised for it.
+        An error committing the whole group is raised instead.
+        """
+        self._settle_queued_sales()
+
+        results: List[Optional[Exception]] = []
+        valid: List[Tuple[int, Dict[int, Product], Basket]] = []
+
+        for lines in baskets:
+            try:
+                products, totals = self._validate_basket(lines)
+            except ValueError as e:
+                results.append(e)
+                continue
+
+            sales = [
+                (product_id, quantity, products[product_id].price)
+                for product_id, quantity in lines
+            ]
+            valid.append((len(results), products, (totals, sales)))
+            results.append(None)
+
+        written = write_baskets([basket for _, _, basket in valid])
+
+        for (index, products, _), outcome in zip(valid, written):
+            if isinstance(outcome, StockConflictError):
+                results[index] = self._stock_conflict(products, outcome)
+                continue
+            for product_id, stock in outcome.items():
+                products[product_id].set_stock(stock)
+
+        return results
+
+
+    def _validate_basket(
+        self, lines: List[Tuple[int, int]]
+    ) -> Tuple[Dict[int, Product], Dict[int, int]]:
+        """
+        Check every line of a basket and return its products together
+        with the total quantity asked of each.
+        """
+        if not lines:
+            raise ValueError("Basket must contain at least one line")
+
+        products: Dict[int, Product] = {}
+        totals: Dict[int, int] = {}
+
+        for product_id, quantity in lines:
+            if not isinstance(quantity, int) or quantity <= 0:
+                raise ValueError("Quantity must be a positive integer")
+
+            product = products.get(product_id) or self.get_product_by_id(product_id)
+
+            if product is None:
+                raise ValueError(f"Product with ID {product_id} not found")
+
+            products[product_id] = product
+            totals[product_id] = totals.get(product_id, 0) + quantity
+
+        return products, totals
+
+
+    def _commit_sales(
+        self,
+        products: Dict[int, Product],
+        totals: Dict[int, int],
+        sales: List[Tuple[int, int, Optional[float]]],
+    ) -> None:
+        """
+        Take the net quantities off stock and log the sales in one transaction.
+        The database decides whether enough stock is left; if another process
+        got there first, the cached stock is refreshed and nothing is sold.
+        """
+        if self._sales_writer is not None:
+            self._queue_sales(products, totals, sales)
+            return
+
+        try:
+            with transaction():
+                stock_levels = ProductRepository.decrease_stocks(totals.items())
+                StockLotRepository.consume_lots(totals.items())
+                SalesRepository.record_sales(sales)
+        except StockConflictError as e:
+            raise self._stock_conflict(products, e) from e
+
+        for product_id, stock in stock_levels.items():
+            products[product_id].set_stock(stock)
+
+
+    def _queue_sales(
+        self,
+        products: Dict[int, Product],
+        totals: Dict[int, int],
+        sales: List[Tuple[int, int, Optional[float]]],
+    ) -> None:
+        """
+        Take the stock off in memory and hand the writes to the sales writer.
+        The cached stock, already net of every queued sale, decides whether
+        enough is left. With strict durability this waits for the commit.
+        """
+        self._settle_failed_sales()
+
+        for product_id, quantity in totals.items():
+            product = products[product_id]
+            if product.stock_quantity < quantity:
+                raise InsufficientStockError(
+                    f"Insufficient stock for product '{product.name}'"
+                )
+
+        for product_id, quantity in totals.items():
+            products[product_id].reduce_stock(quantity)
+
+        ticket = self._sales_writer.submit((totals, sales))
+
+        if self._sales_writer.durability == "relaxed":
+            return
+
+        error = ticket.wait()
+        if error is None:
+            return
+
+        if isinstance(error, StockConflictError):
+            raise self._stock_conflict(products, error) from error
+
+        for product_id, quantity in totals.items():
+            products[product_id].increase_stock(quantity)
+        raise error
+
+
+    def _settle_queued_sales(self) -> None:
+        """
+        Commit any sales still queued for group commit, so database stock
+        about to be read or overwritten includes them.
+        """
+        if self._sales_writer is not None:
+            self._sales_writer.flush()
+
+
+    def _settle_failed_sales(self) -> List[Tuple[Basket, Exception]]:
+        """
+        Resync the cached stock of products whose queued sales could not be
+        committed after being acknowledged. Returns those sales.
+        """
+        if self._sales_writer is None:
+            return []
+
+        failures = self._sales_writer.take_failures()
+        if not failures:
+            return []
+
+        product_ids = {
+            product_id for ticket in failures for product_id in ticket.basket[0]
+        }
+        self._refresh_stock(
+            product
+            for product in map(self.get_product_by_id, product_ids)
+            if product is not None
+        )
+
+        return [(ticket.basket, ticket.error) for ticket in failures]
+
+
+    def flush_sales(self) -> List[Tuple[Basket, Exception]]:
+        """
+        Commit every queued sale now.
+        Returns the sales that were acknowledged without waiting but could
+        not be committed; their stock is resynced from the database.
+        """
+        self._settle_queued_sales()
+        return self._settle_failed_sales()
+
+
+    def close(self) -> List[Tuple[Basket, Exception]]:
+        """
+        Commit every queued sale and stop the sales writer.
+        With load_mode="snapshot", the snapshot file is then rewritten.
+        Returns the sales that could not be committed, as flush_sales does.
+        """
+        failures = self.flush_sales()
+
+        if self._sales_writer is not None:
+            self._sales_writer.close()
+            self._sales_writer = None
+
+        if self._load_mode == "snapshot":
+            # every sale bumps the catalogue version, so the file read or
+            # written at startup is stale by now; the next start reads this one
+            self._save_snapshot()
+
+        StoreManager._open_managers.discard(self)
+
+        return failures
+
+
+    def _stock_conflict(
+        self, products: Dict[int, Product], conflict: StockConflictError
+    ) -> Exception:
+        """
+        Refresh the cached stock behind a conflict and return the error
+        to report for it.
+        """
+        missing = self._refresh_stock(
+            products[product_id] for product_id in conflict.product_ids
+        )
+        product = products[conflict.product_ids[0]]
+
+        if product.id in missing:
+            return ValueError(f"Product with ID {product.id} not found")
+
+        return InsufficientStockError(
+            f"Insufficient stock for product '{product.name}'"
+        )
+
+
+    def _refresh_stock(self, products: Iterable[Product]) -> List[int]:
+        """
+        Reload the stock of cached products from the database.
+        Products deleted elsewhere are dropped; their IDs are returned.
+        """
+        self._settle_queued_sales()
+
+        products = list(products)
+        stock_levels = ProductRepository.get_stock_levels(
+            product.id for product in products
+        )
+        missing = []
+
+        for product in products:
+            stock = stock_levels.get(product.id)
+            if stock is None:
+                self._untrack_product(product)
+                missing.append(product.id)
+            else:
+                product.set_stock(stock)
+
+        return missing
+
+
+    def import_sales(
+        self,
+        path: Union[str, Path],
+        file_format: Optional[str] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        rejects_path: Union[str, Path, None] = None,
+    ) -> ImportReport:
+        """
+        Replay sales buffered by an offline terminal from a CSV or JSON Lines
+        file, keeping their original timestamps.
+        Sales are written `chunk_size` at a time; each chunk decrements the
+        stock of every product it touches once, by its net quantity, in the
+        same transaction. Lines for unknown products or that would overdraw
+        stock are rejected and, when `rejects_path` is given, written there.
+        Lines without a unit_price are charged the current price.
+        """
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+
+        self._settle_queued_sales()
+
+        file_format = detect_format(path, file_format)
+        report = ImportReport()
+        started = time.perf_counter()
+        rejects = open_rejects(rejects_path) if rejects_path is not None else None
+
+        def reject(line_number: int, error: str, record) -> None:
+            report.reject(line_number, error)
+            if rejects is not None:
+                write_reject(rejects, line_number, error, record)
+
+        # (line_number, record, sale) for the lines of the current chunk
+        chunk: List[Tuple[int, dict, Tuple[int, int, Optional[float], datetime]]] = []
+        # units taken from each product by the sales in the current chunk
+        reserved: Dict[int, int] = {}
+        products: Dict[int, Product] = {}
+
+        try:
+            for line_number, record, error in read_records(path, file_format):
+                if error is None:
+                    try:
+                        product_id, quantity, unit_price, timestamp = parse_sale(record)
+                    except ValueError as e:
+                        error = str(e)
+
+                if error is None:
+                    product = products.get(product_id) or self.get_product_by_id(product_id)
+
+                    if product is None:
+                        error = f"Product with ID {product_id} not found"
+                    else:
+                        error = self._reserve_stock(product, quantity, reserved)
+
+                if error is not None:
+                    reject(line_number, error, record)
+                    continue
+
+                products[product_id] = product
+                chunk.append((
+                    line_number,
+                    record,
+                    (
+                        product_id,
+                        quantity,
+                        product.price if unit_price is None else unit_price,
+                        timestamp,
+                    ),
+                ))
+
+                if len(chunk) >= chunk_size:
+                    report.imported += self._ingest_sales_chunk(
+                        chunk, reserved, products, reject
+                    )
+                    chunk, reserved, products = [], {}, {}
+
+            if chunk:
+                report.imported += self._ingest_sales_chunk(
+                    chunk, reserved, products, reject
+                )
+        finally:
+            if rejects is not None:
+                rejects.close()
+
+        report.elapsed = time.perf_counter() - started
+
+        return report
+
+
+    @staticmethod
+    def _reserve_stock(
+        product: Product, quantity: int, reserved: Dict[int, int]
+    ) -> Optional[str]:
+        """
+        Count `quantity` against the product's stock for the current chunk.
+        Returns an error message instead if that would overdraw it.
+        """
+        already = reserved.get(product.id, 0)
+
+        if product.stock_quantity - already < quantity:
+            return f"Insufficient stock for product '{product.name}'"
+
+        reserved[product.id] = already + quantity
+        return None
+
+
+    def _ingest_sales_chunk(
+        self,
+        chunk: List[Tuple[int, dict, Tuple[int, int, Optional[float], datetime]]],
+        reserved: Dict[int, int],
+        products: Dict[int, Product],
+        reject: Callable[[int, str, dict], None],
+    ) -> int:
+        """
+        Commit one chunk of replayed sales with the net stock decrements.
+        If another process sold some of the stock meanwhile, the affected
+        products are refreshed, lines they can no longer cover are rejected
+        and the rest of the chunk is retried. Returns the sales written.
+        """
+        while chunk:
+            try:
+                with transaction():
+                    stock_levels = ProductRepository.decrease_stocks(reserved.items())
+                    StockLotRepository.consume_lots(reserved.items())
+                    SalesRepository.record_past_sales(sale for _, _, sale in chunk)
+            except StockConflictError as e:
+                missing = set(self._refresh_stock(
+                    products[product_id] for product_id in e.product_ids
+                ))
+            else:
+                for product_id, stock in stock_levels.items():
+                    products[product_id].set_stock(stock)
+                return len(chunk)
+
+            kept = []
+            reserved.clear()
+            for line_number, record, sale in chunk:
+                product = products[sale[0]]
+                if product.id in missing:
+                    error = f"Product with ID {product.id} not found"
+                else:
+                    error = self._reserve_stock(product, sale[1], reserved)
+                if error is None:
+                    kept.append((line_number, record, sale))
+                else:
+                    reject(line_number, error, record)
+            chunk = kept
+
+        return 0
 
 
     def get_all_sales(self) -> List[Sale]:
@@ -211,3 +1352,119 @@ class StoreManager:
 
         return SalesRepository.get_sales_by_product(product_id)
 
+
+    def get_sales_page(
+        self,
+        after_sale_id: Optional[int] = None,
+        limit: int = 50,
+        product_id: Optional[int] = None,
+    ) -> List[Sale]:
+        """
+        Return one page of sales records, newest first.
+        """
+        if product_id is not None and self.get_product_by_id(product_id) is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        return SalesRepository.get_sales_page(
+            after_sale_id=after_sale_id,
+            limit=limit,
+            product_id=product_id,
+        )
+
+
+    def iter_sales(self, product_id: Optional[int] = None) -> Iterator[Sale]:
+        """
+        Stream sales records, newest first, in constant memory.
+        """
+        if product_id is not None and self.get_product_by_id(product_id) is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        return SalesRepository.iter_sales(product_id=product_id)
+
+
+    def get_sales_summary(
+        self,
+        period: str,
+        start: datetime,
+        end: datetime,
+        product_id: Optional[int] = None,
+        utc_offset_minutes: int = 0,
+    ) -> List[SalesSummary]:
+        """
+        Return units sold and revenue per product per hour, day or week.
+        """
+        if product_id is not None and self.get_product_by_id(product_id) is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        return SalesRepository.summarize_sales(
+            period,
+            start,
+            end,
+            product_id=product_id,
+            utc_offset_minutes=utc_offset_minutes,
+        )
+
+
+    def get_revenue_by_period(
+        self,
+        period: str,
+        start: datetime,
+        end: datetime,
+        utc_offset_minutes: int = 0,
+    ) -> List[SalesSummary]:
+        """
+        Return total units sold and revenue per hour, day or week
+        across all products.
+        """
+        return SalesRepository.summarize_sales(
+            period,
+            start,
+            end,
+            by_product=False,
+            utc_offset_minutes=utc_offset_minutes,
+        )
+
+
+    def get_units_sold_on(self, product_id: int, day: date) -> int:
+        """
+        Return units of a product sold on a (UTC) day, read from the rollup.
+        """
+        if self.get_product_by_id(product_id) is None:
+            raise ValueError(f"Product with ID {product_id} not found")
+
+        rollups = SalesRepository.get_daily_rollups(day, day, product_id=product_id)
+
+        return rollups[0].units_sold if rollups else 0
+
+
+    def get_daily_rollups(
+        self,
+        start_date: date,
+        end_date: date,
+        product_id: Optional[int] = None,
+    ) -> List[SalesSummary]:
+        """
+        Return precomputed per product per day totals.
+        """
+        if end_date < start_date:
+            raise ValueError("end_date cannot be before start_date")
+
+        return SalesRepository.get_daily_rollups(
+            start_date, end_date, product_id=product_id
+        )
+
+
+    def rebuild_sales_rollups(self) -> int:
+        """
+        Recompute the daily rollups from the sales log.
+        """
+        return SalesRepository.rebuild_daily_rollups()
+
+
+    def check_sales_rollups(
+        self,
+    ) -> List[Tuple[Optional[SalesSummary], Optional[SalesSummary]]]:
+        """
+        Return (expected, actual) pairs where the rollups disagree with the log.
+        """
+        return SalesRepository.check_daily_rollups()
@@ -0,0 +1,71 @@
+from heapq import heapify, heappop, heappush
+from typing import Any, Iterable, List, Set, Tuple
+
+
+class ExpiryHeap:
+    """
+    Min-heap of (key, item_id) pairs answering "which items are due by X".
+
+    A query only visits heap entries whose key is <= X, plus their direct
+    children, so it costs O(k) for k due items however large the heap is.
+    Removed items are dropped lazily: they are skipped until they reach the
+    top, and the heap is rebuilt once they make up half of it.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Any, int]] = ()) -> None:
+        self._heap: List[Tuple[Any, int]] = list(items)
+        self._removed: Set[int] = set()
+        heapify(self._heap)
+
+
+    def __len__(self) -> int:
+        return len(self._heap) - len(self._removed)
+
+
+    def push(self, key: Any, item_id: int) -> None:
+        heappush(self._heap, (key, item_id))
+
+
+    def due(self, bound: Any) -> List[int]:
+        """
+        Return ids of items with key <= bound, in (key, id) order.
+        """
+        heap, removed = self._heap, self._removed
+        size = len(heap)
+        found: List[Tuple[Any, int]] = []
+        pending = [0] if heap else []
+
+        while pending:
+            index = pending.pop()
+            entry = heap[index]
+            if entry[0] > bound:
+                continue
+
+            if entry[1] not in removed:
+                found.append(entry)
+
+            child = 2 * index + 1
+            if child < size:
+                pending.append(child)
+                if child + 1 < size:
+                    pending.append(child + 1)
+
+        found.sort()
+
+        return [item_id for _, item_id in found]
+
+
+    def discard(self, item_ids: Iterable[int]) -> None:
+        """
+        Remove items; ids not in the heap must not be passed.
+        """
+        heap, removed = self._heap, self._removed
+        removed.update(item_ids)
+
+        while heap and heap[0][1] in removed:
+            removed.discard(heappop(heap)[1])
+
+        if 2 * len(removed) > len(heap):
+            self._heap = [entry for entry in heap if entry[1] not in removed]
+            heapify(self._heap)
+            removed.clear()
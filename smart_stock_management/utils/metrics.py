@@ -0,0 +1,218 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# slow calls kept, oldest dropped first
+SLOW_LOG_SIZE = 100
+
+METRIC_PREFIX = "smart_stock"
+
+
+class LatencyHistogram:
+    """
+    Call count, error count and latency distribution of one operation.
+    """
+
+    __slots__ = ("counts", "total", "maximum", "errors")
+
+    def __init__(self) -> None:
+        # counts[i] holds observations in (bucket i-1, bucket i]; the last slot is +Inf
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.maximum = 0.0
+        self.errors = 0
+
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts)
+
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        if failed:
+            self.errors += 1
+
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding the given quantile, in seconds.
+        Falls back to the maximum for the +Inf bucket.
+        """
+        target = fraction * self.calls
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                if index == len(LATENCY_BUCKETS):
+                    return self.maximum
+                return min(LATENCY_BUCKETS[index], self.maximum)
+
+        return 0.0
+
+
+class SlowCall(NamedTuple):
+    timestamp: float
+    operation: str
+    seconds: float
+    statements: Tuple[str, ...]
+    statement_count: int
+
+
+class MetricsRegistry:
+    """
+    Latency histograms keyed by (layer, operation) plus a bounded log of
+    slow database calls. Safe to update from several threads.
+    """
+
+    def __init__(self, slow_log_size: int = SLOW_LOG_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._slow_calls: Deque[SlowCall] = deque(maxlen=slow_log_size)
+        self._slow_total = 0
+        self.started = time.time()
+
+
+    def observe(self, layer: str, operation: str, seconds: float, failed: bool = False) -> None:
+        key = (layer, operation)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(seconds, failed)
+
+
+    def record_slow_call(
+        self, operation: str, seconds: float, statements: List[str], statement_count: int
+    ) -> None:
+        entry = SlowCall(time.time(), operation, seconds, tuple(statements), statement_count)
+        with self._lock:
+            self._slow_calls.append(entry)
+            self._slow_total += 1
+
+
+    def histograms(self) -> List[Tuple[str, str, LatencyHistogram]]:
+        """
+        Return (layer, operation, histogram) sorted by total time, largest first.
+        """
+        with self._lock:
+            items = [(layer, operation, histogram) for (layer, operation), histogram in self._histograms.items()]
+        items.sort(key=lambda item: item[2].total, reverse=True)
+
+        return items
+
+
+    def slow_calls(self) -> List[SlowCall]:
+        """
+        Return the logged slow calls, slowest first.
+        """
+        with self._lock:
+            calls = list(self._slow_calls)
+
+        return sorted(calls, key=lambda call: call.seconds, reverse=True)
+
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._slow_calls.clear()
+            self._slow_total = 0
+            self.started = time.time()
+
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            items = sorted(
+                (key, histogram.counts[:], histogram.total, histogram.errors)
+                for key, histogram in self._histograms.items()
+            )
+            slow_total = self._slow_total
+
+        name = f"{METRIC_PREFIX}_call_duration_seconds"
+        lines = [
+            f"# HELP {name} Latency of repository, connection and service calls.",
+            f"# TYPE {name} histogram",
+        ]
+
+        for (layer, operation), counts, total, _ in items:
+            labels = _labels(layer=layer, operation=operation)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {total!r}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        errors = f"{METRIC_PREFIX}_call_errors_total"
+        lines.append(f"# HELP {errors} Calls that raised an exception.")
+        lines.append(f"# TYPE {errors} counter")
+        for (layer, operation), _, _, error_count in items:
+            lines.append(f"{errors}{{{_labels(layer=layer, operation=operation)}}} {error_count}")
+
+        slow = f"{METRIC_PREFIX}_slow_calls_total"
+        lines.append(f"# HELP {slow} Database calls slower than the slow-query threshold.")
+        lines.append(f"# TYPE {slow} counter")
+        lines.append(f"{slow} {slow_total}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 0.001:
+        return f"{seconds * 1_000_000:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1_000:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def format_report(
+    histograms: Iterable[Tuple[str, str, LatencyHistogram]], limit: Optional[int] = None
+) -> List[str]:
+    """
+    Format histograms as aligned table rows for the console.
+    """
+    rows = [
+        f"{'operation':<44} {'calls':>8} {'errors':>6} {'mean':>9} "
+        f"{'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'total':>9}"
+    ]
+
+    for index, (_, operation, histogram) in enumerate(histograms):
+        if limit is not None and index >= limit:
+            break
+        calls = histogram.calls
+        rows.append(
+            f"{operation:<44} {calls:>8} {histogram.errors:>6} "
+            f"{format_seconds(histogram.total / calls if calls else 0):>9} "
+            f"{format_seconds(histogram.quantile(0.5)):>9} "
+            f"{format_seconds(histogram.quantile(0.95)):>9} "
+            f"{format_seconds(histogram.quantile(0.99)):>9} "
+            f"{format_seconds(histogram.maximum):>9} "
+            f"{format_seconds(histogram.total):>9}"
+        )
+
+    return rows
@@ -0,0 +1,144 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class SortedIndex:
+    """
+    Secondary index keeping item ids ordered by a key.
+
+    Entries are (key, item_id) pairs held in sorted chunks, so an insert or
+    removal costs O(log n + CHUNK_SIZE) instead of re-sorting everything.
+    Ties on the key are broken by item id.
+    """
+
+    CHUNK_SIZE = 1_000
+
+    def __init__(self, items: Iterable[Tuple[int, Any]] = ()) -> None:
+        self._chunks: List[List[Tuple[Any, int]]] = []
+        self._maxes: List[Tuple[Any, int]] = []
+        self._keys: Dict[int, Any] = {}
+        self.build(items)
+
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+    def build(self, items: Iterable[Tuple[int, Any]]) -> None:
+        """
+        Replace the index contents from (item_id, key) pairs with one sort.
+        """
+        self._keys = dict(items)
+        entries = sorted((key, item_id) for item_id, key in self._keys.items())
+
+        self._chunks = [
+            entries[start:start + self.CHUNK_SIZE]
+            for start in range(0, len(entries), self.CHUNK_SIZE)
+        ]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+
+    def set(self, item_id: int, key: Any) -> None:
+        """
+        Insert an item, or move it if its key changed.
+        """
+        previous = self._keys.get(item_id)
+
+        if item_id in self._keys:
+            if previous == key:
+                return
+            self._remove((previous, item_id))
+
+        self._keys[item_id] = key
+        self._insert((key, item_id))
+
+
+    def discard(self, item_id: int) -> None:
+        """
+        Remove an item if present.
+        """
+        if item_id in self._keys:
+            self._remove((self._keys.pop(item_id), item_id))
+
+
+    def ids(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        descending: bool = False,
+    ) -> Iterator[int]:
+        """
+        Return item ids in key order, skipping `offset` and stopping after `limit`.
+        Whole chunks before the offset are skipped without being read.
+        """
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        chunks = self._chunks[::-1] if descending else self._chunks
+        first = 0
+
+        while first < len(chunks) and offset >= len(chunks[first]):
+            offset -= len(chunks[first])
+            first += 1
+
+        entries = chain.from_iterable(
+            reversed(chunk) if descending else chunk for chunk in chunks[first:]
+        )
+        stop = None if limit is None else offset + max(limit, 0)
+
+        return map(itemgetter(1), islice(entries, offset, stop))
+
+
+    def ids_between(self, low: Any, high: Any) -> Iterator[int]:
+        """
+        Yield ids of items with low <= key <= high, in key order.
+        """
+        position = bisect_left(self._maxes, (low,))
+
+        for chunk_index in range(position, len(self._chunks)):
+            chunk = self._chunks[chunk_index]
+            start = bisect_left(chunk, (low,)) if chunk_index == position else 0
+
+            for key, item_id in chunk[start:]:
+                if key > high:
+                    return
+                yield item_id
+
+
+    def _insert(self, entry: Tuple[Any, int]) -> None:
+        if not self._chunks:
+            self._chunks.append([entry])
+            self._maxes.append(entry)
+            return
+
+        position = bisect_left(self._maxes, entry)
+        if position == len(self._chunks):
+            position -= 1
+
+        chunk = self._chunks[position]
+        insort(chunk, entry)
+        self._maxes[position] = chunk[-1]
+
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            self._chunks[position:position + 1] = [
+                chunk[:self.CHUNK_SIZE],
+                chunk[self.CHUNK_SIZE:],
+            ]
+            self._maxes[position:position + 1] = [
+                chunk[self.CHUNK_SIZE - 1],
+                chunk[-1],
+            ]
+
+
+    def _remove(self, entry: Tuple[Any, int]) -> None:
+        position = bisect_left(self._maxes, entry)
+        chunk = self._chunks[position]
+        del chunk[bisect_right(chunk, entry) - 1]
+
+        if chunk:
+            self._maxes[position] = chunk[-1]
+        else:
+            del self._chunks[position]
+            del self._maxes[position]
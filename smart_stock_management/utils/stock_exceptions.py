@@ -1,2 +1,22 @@
+from typing import Optional
+
+
 class InsufficientStockError(Exception):
     pass
+
+
+class StockConflictError(InsufficientStockError):
+    """
+    The database no longer holds enough stock for a write, or the stock
+    changed under an absolute set, usually because another process sold
+    it first. Nothing was changed.
+    """
+
+    def __init__(
+        self, product_ids: list[int], message: Optional[str] = None
+    ) -> None:
+        super().__init__(
+            message
+            or f"Insufficient stock in the database for product IDs {product_ids}"
+        )
+        self.product_ids = product_ids